@@ -0,0 +1,47 @@
+"""4_metadata_jsonb
+
+Revision ID: 5c1f0e7a9d3b
+Revises: fbb20702b424
+Create Date: 2026-10-19 10:12:41.503918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5c1f0e7a9d3b'
+down_revision = 'fbb20702b424'
+branch_labels = None
+depends_on = None
+
+METADATA_COLUMNS = ('private_metadata', 'public_metadata')
+TABLES = ('user', 'wallet', 'transaction')
+INDEXED_TABLES = ('wallet', 'transaction')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        for column in METADATA_COLUMNS:
+            op.alter_column(
+                table, column, type_=postgresql.JSONB(astext_type=sa.Text()), existing_nullable=False,
+                postgresql_using=f'{column}::jsonb',
+            )
+    for table in INDEXED_TABLES:
+        for column in METADATA_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}', table, [column], unique=False,
+                postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+            )
+
+
+def downgrade() -> None:
+    for table in INDEXED_TABLES:
+        for column in METADATA_COLUMNS:
+            op.drop_index(f'ix_{table}_{column}', table_name=table)
+    for table in TABLES:
+        for column in METADATA_COLUMNS:
+            op.alter_column(
+                table, column, type_=sa.JSON(), existing_nullable=False,
+                postgresql_using=f'{column}::json',
+            )
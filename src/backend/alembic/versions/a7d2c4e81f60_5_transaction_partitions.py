@@ -0,0 +1,121 @@
+"""5_transaction_partitions
+
+Revision ID: a7d2c4e81f60
+Revises: 5c1f0e7a9d3b
+Create Date: 2026-10-19 11:02:17.318204
+
+Rebuild `transaction` as a table partitioned by month of `created_at`, see
+app.contrib.transaction.partitions. Rows are copied, so the upgrade holds
+an exclusive lock of the table for the time of the copy. Downgrade copies
+the attached partitions only, detached ones stay in the archive schema.
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2c4e81f60'
+down_revision = '5c1f0e7a9d3b'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    'id, created_at, updated_at, private_metadata, public_metadata, to_wallet_id, from_wallet_id, '
+    'currency, total_amount, transaction_type, status'
+)
+METADATA_COLUMNS = ('private_metadata', 'public_metadata')
+# Months after the current one, partitions of later months are created by the app
+PARTITIONS_AHEAD = 3
+
+
+def columns(created_at_nullable: bool) -> list:
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                  nullable=created_at_nullable),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('private_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('public_metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('to_wallet_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('from_wallet_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('total_amount', sa.DECIMAL(precision=12, scale=2), nullable=False),
+        sa.Column('transaction_type', sa.String(length=13), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.ForeignKeyConstraint(('from_wallet_id',), ['wallet.id'], name='fx_tr_from_wl_id', ondelete='RESTRICT'),
+        sa.ForeignKeyConstraint(('to_wallet_id',), ['wallet.id'], name='fx_tr_to_wl_id', ondelete='RESTRICT'),
+    ]
+
+
+def create_indexes() -> None:
+    op.create_index(op.f('ix_transaction_id'), 'transaction', ['id'], unique=False)
+    for column in METADATA_COLUMNS:
+        op.create_index(
+            f'ix_transaction_{column}', 'transaction', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+        )
+
+
+def move_aside(new_name: str) -> None:
+    """Rename the current table and free the names of its indexes and primary key"""
+    op.drop_index(op.f('ix_transaction_id'), table_name='transaction')
+    for column in METADATA_COLUMNS:
+        op.drop_index(f'ix_transaction_{column}', table_name='transaction')
+    op.execute('ALTER TABLE public."transaction" RENAME CONSTRAINT transaction_pkey TO '
+               f'{new_name}_pkey')
+    op.rename_table('transaction', new_name)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.month - 1 + months
+    return date(month.year + index // 12, index % 12 + 1, 1)
+
+
+def create_partitions(start: date) -> None:
+    """Default partition and the monthly ones from `start`, bounds are UTC"""
+    op.execute('CREATE TABLE public."transaction_default" PARTITION OF public."transaction" DEFAULT')
+    month = start
+    last = add_months(datetime.now(timezone.utc).date().replace(day=1), PARTITIONS_AHEAD)
+    while month <= last:
+        op.execute(
+            f'''CREATE TABLE public."transaction_y{month.year:04d}m{month.month:02d}" '''
+            f'''PARTITION OF public."transaction" FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') '''
+            f'''TO ('{add_months(month, 1).isoformat()} 00:00:00+00')'''
+        )
+        month = add_months(month, 1)
+
+
+def upgrade() -> None:
+    op.execute('UPDATE public."transaction" SET created_at = now() WHERE created_at IS NULL')
+    move_aside('transaction_unpartitioned')
+
+    op.create_table(
+        'transaction', *columns(created_at_nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at', name='transaction_pkey'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    create_indexes()
+
+    bind = op.get_bind()
+    first_created_at = bind.execute(sa.text(
+        'SELECT min(created_at) AT TIME ZONE \'UTC\' FROM public."transaction_unpartitioned"'
+    )).scalar()
+    create_partitions((first_created_at or datetime.now(timezone.utc)).date().replace(day=1))
+
+    op.execute(f'INSERT INTO public."transaction" ({COLUMNS}) SELECT {COLUMNS} FROM public."transaction_unpartitioned"')
+    op.drop_table('transaction_unpartitioned')
+
+
+def downgrade() -> None:
+    move_aside('transaction_partitioned')
+
+    op.create_table(
+        'transaction', *columns(created_at_nullable=True),
+        sa.PrimaryKeyConstraint('id', name='transaction_pkey'),
+    )
+    create_indexes()
+
+    op.execute(f'INSERT INTO public."transaction" ({COLUMNS}) SELECT {COLUMNS} FROM public."transaction_partitioned"')
+    op.drop_table('transaction_partitioned')
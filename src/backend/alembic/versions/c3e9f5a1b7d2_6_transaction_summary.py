@@ -0,0 +1,58 @@
+"""6_transaction_summary
+
+Revision ID: c3e9f5a1b7d2
+Revises: a7d2c4e81f60
+Create Date: 2026-10-19 13:40:52.771036
+
+Summary is filled from the completed transactions still in Postgres,
+months already moved to cold storage are not counted.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c3e9f5a1b7d2'
+down_revision = 'a7d2c4e81f60'
+branch_labels = None
+depends_on = None
+
+BACKFILL = '''
+    INSERT INTO public."transaction_summary"
+        (wallet_id, period, currency, transaction_type, direction, count, total_amount)
+    SELECT {wallet_column}, date_trunc('month', created_at AT TIME ZONE 'UTC')::date, currency, transaction_type,
+        '{direction}', count(*), sum(total_amount)
+    FROM public."transaction"
+    WHERE status = 'completed' AND {wallet_column} IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+'''
+
+
+def upgrade() -> None:
+    op.create_table('transaction_summary',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                              nullable=True),
+                    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+                    sa.Column('wallet_id', postgresql.UUID(as_uuid=True), nullable=False),
+                    sa.Column('period', sa.Date(), nullable=False),
+                    sa.Column('currency', sa.String(length=3), nullable=False),
+                    sa.Column('transaction_type', sa.String(length=13), nullable=False),
+                    sa.Column('direction', sa.String(length=7), nullable=False),
+                    sa.Column('count', sa.Integer(), nullable=False),
+                    sa.Column('total_amount', sa.DECIMAL(precision=20, scale=2), nullable=False),
+                    sa.ForeignKeyConstraint(('wallet_id',), ['wallet.id'], name='fx_tr_sm_wl_id',
+                                            ondelete='CASCADE'),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('wallet_id', 'period', 'currency', 'transaction_type', 'direction',
+                                        name='ux_tr_sm_key'),
+                    )
+    op.create_index(op.f('ix_transaction_summary_id'), 'transaction_summary', ['id'], unique=False)
+
+    op.execute(BACKFILL.format(wallet_column='to_wallet_id', direction='inflow'))
+    op.execute(BACKFILL.format(wallet_column='from_wallet_id', direction='outflow'))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transaction_summary_id'), table_name='transaction_summary')
+    op.drop_table('transaction_summary')
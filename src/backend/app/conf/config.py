@@ -1,11 +1,52 @@
 import secrets
 
-from typing import Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
 from pathlib import Path
 from pydantic import AnyHttpUrl, BaseSettings, EmailStr, validator, RedisDsn, PostgresDsn
+from pydantic.env_settings import EnvSettingsSource, SettingsSourceCallable
 from datetime import timedelta
 
 
+@lru_cache(maxsize=None)
+def read_env_files(env_file: Any, env_file_encoding: Optional[str], case_sensitive: bool) -> Dict[str, Optional[str]]:
+    """
+    Parse `.env` once per process, shared by all settings classes
+    :param env_file:
+    :param env_file_encoding:
+    :param case_sensitive:
+    :return:
+    """
+    return EnvSettingsSource(env_file, env_file_encoding)._read_env_files(case_sensitive)
+
+
+class SharedEnvSettingsSource(EnvSettingsSource):
+    def _read_env_files(self, case_sensitive: bool) -> Dict[str, Optional[str]]:
+        env_file = tuple(self.env_file) if isinstance(self.env_file, (list, tuple)) else self.env_file
+        return read_env_files(env_file, self.env_file_encoding, case_sensitive)
+
+
+class EnvConfig:
+    case_sensitive = True
+    env_file = '.env'
+    env_file_encoding = 'utf-8'
+
+    @classmethod
+    def customise_sources(
+            cls,
+            init_settings: SettingsSourceCallable,
+            env_settings: EnvSettingsSource,
+            file_secret_settings: SettingsSourceCallable,
+    ) -> tuple:
+        shared_env_settings = SharedEnvSettingsSource(
+            env_settings.env_file,
+            env_settings.env_file_encoding,
+            env_settings.env_nested_delimiter,
+            env_settings.env_prefix_len,
+        )
+        return init_settings, shared_env_settings, file_secret_settings
+
+
 class Settings(BaseSettings):
     # Dirs
     BASE_DIR: Optional[str] = Path(__file__).resolve().parent.parent.parent.as_posix()
@@ -47,6 +88,36 @@ class Settings(BaseSettings):
             return None
         return v
 
+    SENTRY_ENVIRONMENT: Optional[str] = None
+    # Trace sampling rates, see app.core.tracing
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.05
+    SENTRY_TASK_TRACES_SAMPLE_RATE: float = 0.05
+    SENTRY_ERROR_TRACES_SAMPLE_RATE: float = 1.0
+    SENTRY_SLOW_TRACES_SAMPLE_RATE: float = 0.5
+    # Seconds after which a request counts as slow
+    SENTRY_SLOW_REQUEST_THRESHOLD: float = 1.0
+    # Seconds a failed or slow route is sampled at the higher rate
+    SENTRY_OUTLIER_TTL: int = 300
+    SENTRY_TRACES_IGNORED_PATHS: List[str] = ['/static', '/favicon.ico', '/metrics']
+
+    # Prometheus metrics, served on /metrics and by the worker exporter
+    METRICS_ENABLED: bool = True
+    METRICS_WORKER_PORT: Optional[int] = 9808
+
+    # Response compression, see app.core.compression
+    COMPRESSION_ENABLED: bool = True
+    # Bodies smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Preference order, encodings without their library installed are skipped
+    COMPRESSION_ENCODINGS: List[str] = ['zstd', 'br', 'gzip']
+
+    # Query count and DB time per request, sent as Server-Timing header
+    DB_QUERY_STATS_ENABLED: bool = True
+    # Seconds after which a query is logged as slow
+    SLOW_QUERY_THRESHOLD: float = 0.2
+    # Share of slow queries logged with their EXPLAIN plan
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1
+
     DATABASE_HOST: str
     DATABASE_PORT: str
     DATABASE_USER: str
@@ -90,6 +161,38 @@ class Settings(BaseSettings):
             return v
         return f'redis://{values.get("REDIS_HOST")}:{values.get("REDIS_PORT")}/0'
 
+    # Token bucket limits by rule, see app.core.ratelimit. Rules are named
+    # after their routes, a missing rule is not limited
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, str] = {
+        'account-token': '10/minute',
+        'sign-up': '5/minute',
+        'transaction-replenish-wallet': '30/minute',
+        'transaction-withdraw-wallet': '30/minute',
+        'transaction-transfer-money': '30/minute',
+    }
+    # Share of the remaining tokens a worker may spend without asking Redis,
+    # and seconds it may do so
+    RATE_LIMIT_LOCAL_SHARE: float = 0.1
+    RATE_LIMIT_LOCAL_TTL: float = 1.0
+
+    # Seconds between keep-alive comments on the transaction event stream
+    TRANSACTION_EVENTS_HEARTBEAT: int = 15
+    # Seconds wallet responses stay in the Redis response cache
+    WALLET_CACHE_TTL: int = 300
+    # Monthly partitions of the transaction table, see app.contrib.transaction.partitions
+    TRANSACTION_PARTITIONS_AHEAD: int = 3
+    # Months kept attached before `detach` moves them to the archive schema
+    TRANSACTION_RETENTION_MONTHS: int = 12
+    TRANSACTION_ARCHIVE_SCHEMA: str = 'archive'
+    # Cold storage files of old months, see app.contrib.transaction.archive
+    TRANSACTION_ARCHIVE_DIR: str = 'archive/transaction'  # Relative to BASE_DIR unless absolute
+    TRANSACTION_ARCHIVE_FORMAT: str = 'ndjson'  # ndjson or parquet
+    TRANSACTION_ARCHIVE_CHUNK_SIZE: int = 5000
+    TRANSACTION_ARCHIVE_DELETE_BATCH: int = 1000
+    # Days of history the transaction list covers when no period is given
+    TRANSACTION_LIST_PERIOD_DAYS: int = 90
+
     SMTP_TLS: Optional[bool] = True
     SMTP_PORT: Optional[int] = 587
     SMTP_HOST: Optional[str] = 'smtp.server.example'
@@ -109,10 +212,15 @@ class Settings(BaseSettings):
     LANGUAGE_CODE: Optional[str] = 'ru'
     LANGUAGE_CODE_LENGTH: Optional[int] = 5
     LANGUAGES: tuple = ('en', 'ru',)
+    # Request locale sources in priority order: query, cookie, header
+    LANGUAGE_SOURCES: tuple = ('query',)
 
     LOCALE: Dict[str, Any] = {
         'DIR': 'app/locale'
     }
+    # Watch catalogs and reload changed translations without restart
+    LOCALE_RELOAD: Optional[bool] = False
+    LOCALE_RELOAD_INTERVAL: Optional[float] = 5.0
     TIME_ZONE: Optional[str] = 'Asia/Ashgabat'
     USE_TZ: Optional[bool] = True
 
@@ -121,10 +229,8 @@ class Settings(BaseSettings):
     DEFAULT_CURRENCY_CODE_LENGTH: Optional[int] = 3
     DEFAULT_CURRENCY_CODE: Optional[str] = 'USD'
 
-    class Config:
-        case_sensitive = True
-        env_file = '.env'
-        env_file_encoding = 'utf-8'
+    class Config(EnvConfig):
+        pass
 
 
 class JWTSettings(BaseSettings):
@@ -155,10 +261,8 @@ class JWTSettings(BaseSettings):
     JWT_AUDIENCE_ADMIN: Optional[str] = 'admin'
     JWT_ISSUER: Optional[str] = 'backend'
 
-    class Config:
-        case_sensitive = True
-        env_file = '.env'
-        env_file_encoding = 'utf-8'
+    class Config(EnvConfig):
+        pass
 
 
 class StructureSettings(BaseSettings):
@@ -178,12 +282,46 @@ class StructureSettings(BaseSettings):
 
     TEMP_PATH: Optional[str] = 'temp/'
 
-    class Config:
-        case_sensitive = True
-        env_file = '.env'
-        env_file_encoding = 'utf-8'
+    class Config(EnvConfig):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+@lru_cache(maxsize=None)
+def get_jwt_settings() -> JWTSettings:
+    return JWTSettings()
+
+
+@lru_cache(maxsize=None)
+def get_structure_settings() -> StructureSettings:
+    return StructureSettings()
+
+
+class LazySettings:
+    """Proxy which builds the settings object on first attribute access"""
+
+    __slots__ = ('_factory',)
+
+    def __init__(self, factory: Callable[[], BaseSettings]):
+        object.__setattr__(self, '_factory', factory)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._factory(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._factory(), name)
+
+    def __repr__(self) -> str:
+        return f'<LazySettings: {self._factory.__name__}>'
 
 
-settings = Settings()
-jwt_settings = JWTSettings()
-structure_settings = StructureSettings()
+settings: Settings = LazySettings(get_settings)  # type: ignore
+jwt_settings: JWTSettings = LazySettings(get_jwt_settings)  # type: ignore
+structure_settings: StructureSettings = LazySettings(get_structure_settings)  # type: ignore
@@ -6,7 +6,7 @@ from starlette.status import HTTP_201_CREATED
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.translation import gettext as _
-from app.routers.dependency import get_current_user, get_async_db
+from app.routers.dependency import get_current_user, get_async_db, rate_limit
 from app.utils.security import lazy_jwt_settings
 from app.core.schema import IResponseBase
 from app.contrib.account.schema import SignUp
@@ -32,7 +32,12 @@ async def me(
     return user
 
 
-@api.post('/token/', response_model=Token)
+@api.post(
+    '/token/',
+    name='account-token',
+    response_model=Token,
+    dependencies=[Depends(rate_limit('account-token'))],
+)
 async def get_token(
         data: OAuth2PasswordRequestForm = Depends(),
         async_db: AsyncSession = Depends(get_async_db),
@@ -76,6 +81,7 @@ async def get_token(
     name='sign-up',
     response_model=IResponseBase[UserVisible],
     status_code=HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit('sign-up'))],
 )
 async def sign_up(
         obj_in: SignUp,
@@ -3,7 +3,7 @@ from sqlalchemy import select
 from fastapi.encoders import jsonable_encoder
 
 from app.utils.security import lazy_jwt_settings
-from app.db.repository import CRUDBase, CRUDBaseSync
+from app.db.repository import CRUDWithMetadataBase, CRUDWithMetadataBaseSync
 from .schema import (UserBase, UserCreate)
 from .models import User
 
@@ -25,7 +25,7 @@ def convert_user_data(obj_in: Union[dict, UserBase]) -> dict:
     return data
 
 
-class CRUDUserSync(CRUDBaseSync[User]):
+class CRUDUserSync(CRUDWithMetadataBaseSync[User]):
     def create(self, db: "Session", obj_in: Union[dict, UserCreate], **kwargs) -> User:
         data_in = convert_user_data(obj_in)
         data = jsonable_encoder(data_in)
@@ -36,7 +36,7 @@ class CRUDUserSync(CRUDBaseSync[User]):
         return new_db_obj
 
 
-class CRUDUser(CRUDBase[User]):
+class CRUDUser(CRUDWithMetadataBase[User]):
     @staticmethod
     async def get_by_email(async_db: "AsyncSession", *, email: str) -> Optional[User]:
         result = await async_db.execute(select(User).filter(User.email == email))
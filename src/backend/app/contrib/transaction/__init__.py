@@ -23,3 +23,12 @@ class TransactionStatusChoices(TextChoices):
 TransactionStatusChoices.PROCESSING.label = _('processing')
 TransactionStatusChoices.COMPLETED.label = _('completed')
 TransactionStatusChoices.REJECTED.label = _('rejected')
+
+
+class TransactionDirectionChoices(TextChoices):
+    INFLOW = 'inflow'
+    OUTFLOW = 'outflow'
+
+
+TransactionDirectionChoices.INFLOW.label = _('inflow')
+TransactionDirectionChoices.OUTFLOW.label = _('outflow')
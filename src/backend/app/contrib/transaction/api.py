@@ -1,22 +1,35 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Literal, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from pydantic.error_wrappers import ErrorWrapper
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.orm import load_only
 
-from app.routers.dependency import get_async_db, get_current_user, get_commons, get_active_user
+from app.routers.dependency import (
+    get_async_db, get_current_user, get_commons, get_active_user, get_user_key, rate_limit,
+)
+from app.core.cache import http_date, not_modified_response, version_etag
 from app.core.schema import CommonsModel, IPaginationDataBase, IResponseBase
 from app.contrib.account.models import User
 from app.utils.translation import gettext as _
 from app.contrib.wallet.repository import wallet_repo
 from app.contrib.transaction import TransactionTypeChoices
+from app.conf.config import settings
+from app.utils.ids import uuid7_time
 
+from .events import stream_transaction_events
+from .export import export_transaction_history
 from .fetch import fetch_transaction_info_list
-from .repository import transaction_repo
-from .schema import TransactionVisible, TransactionReplenishWallet, TransactionWithdrawWallet, TransactionTransferMoney
+from .repository import transaction_repo, transaction_summary_repo
+from .schema import (
+    TransactionVisible, TransactionReplenishWallet, TransactionWithdrawWallet, TransactionTransferMoney,
+    TransactionSummaryVisible,
+)
 from .tasks import transaction_replenish_wallet_task, transaction_withdraw_wallet_task, transaction_transfer_money_task
 
 api = APIRouter()
@@ -26,8 +39,20 @@ api = APIRouter()
 async def get_transaction_list(
         async_db: AsyncSession = Depends(get_async_db),
         user: User = Depends(get_current_user),
-        commons: CommonsModel = Depends(get_commons)
+        commons: CommonsModel = Depends(get_commons),
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
 ) -> dict:
+    """
+    Transactions of the user wallets created in the period, the last
+    `TRANSACTION_LIST_PERIOD_DAYS` days by default. The bound keeps the
+    query to the partitions of the period.
+    """
+    if created_to is None:
+        created_to = datetime.now(timezone.utc)
+    if created_from is None:
+        created_from = created_to - timedelta(days=settings.TRANSACTION_LIST_PERIOD_DAYS)
+    params = {'user_id': user.id, 'created_from': created_from, 'created_to': created_to}
     # query = text('select tr."id" as id  from public."transaction" as tr')
     sql_text = '''
         select tr."id" as id,
@@ -38,18 +63,20 @@ async def get_transaction_list(
             tr."status",
             tr."transaction_type"
         from public."transaction" tr 
-        where   tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
-         or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+        where   (tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+         or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id))
+         and tr."created_at" >= :created_from and tr."created_at" < :created_to
     '''
-    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text, params={'user_id': user.id})
+    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text, params=params)
     transaction_info_list = fetch_transaction_info_list(transactions=result)
     sql_text_count = '''
             select count(tr."id")
             from public."transaction" tr 
-            where   tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
-             or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+            where   (tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+             or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id))
+             and tr."created_at" >= :created_from and tr."created_at" < :created_to
         '''
-    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text_count, params={'user_id': user.id})
+    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text_count, params=params)
     count = result.fetchone()
     return {
         'rows': transaction_info_list,
@@ -59,9 +86,40 @@ async def get_transaction_list(
     }
 
 
+@api.get('/summary/', name='transaction-summary', response_model=List[TransactionSummaryVisible])
+async def get_transaction_summary(
+        period: Literal['month', 'year'] = 'month',
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        wallet_id: Optional[UUID] = None,
+        async_db: AsyncSession = Depends(get_async_db),
+        user: User = Depends(get_current_user),
+) -> list:
+    """
+    Inflow and outflow of completed transactions per wallet, currency, type
+    and month or year. `period_from` and `period_to` select whole months.
+    """
+    rows = await transaction_summary_repo.get_summary(
+        async_db, user_id=user.id, period=period, period_from=period_from, period_to=period_to,
+        wallet_id=wallet_id,
+    )
+    return [
+        {
+            'wallet_id': row.wallet_id,
+            'period': row.period,
+            'transaction_type': row.transaction_type,
+            'direction': row.direction,
+            'count': row.transaction_count,
+            'total': {'amount': row.total_amount, 'currency': row.currency},
+        }
+        for row in rows
+    ]
+
+
 @api.post('/replenish-wallet/', name='transaction-replenish-wallet',
           response_model=IResponseBase[TransactionVisible],
-          status_code=status.HTTP_201_CREATED)
+          status_code=status.HTTP_201_CREATED,
+          dependencies=[Depends(rate_limit('transaction-replenish-wallet', key=get_user_key))])
 async def transaction_replenish_wallet(
         obj_in: TransactionReplenishWallet,
         user: User = Depends(get_active_user),
@@ -87,7 +145,8 @@ async def transaction_replenish_wallet(
 @api.post(
     '/withdraw-wallet/', name='transaction-withdraw-wallet',
     response_model=IResponseBase[TransactionVisible],
-    status_code=status.HTTP_201_CREATED)
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit('transaction-withdraw-wallet', key=get_user_key))])
 async def transaction_withdraw_wallet(
         obj_in: TransactionWithdrawWallet,
 
@@ -120,7 +179,8 @@ async def transaction_withdraw_wallet(
 @api.post(
     '/transfer-money/', name='transaction-transfer-money',
     response_model=IResponseBase[TransactionVisible],
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit('transaction-transfer-money', key=get_user_key))],
 )
 async def transaction_transfer_money(
         obj_in: TransactionTransferMoney,
@@ -159,31 +219,104 @@ async def transaction_transfer_money(
     }
 
 
+@api.get('/events/', name='transaction-events', response_class=StreamingResponse)
+async def transaction_events(
+        request: Request,
+        user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream transaction status changes of the user wallets as server-sent events
+    """
+    return StreamingResponse(
+        stream_transaction_events(request, request.app.aioredis_instance, user_id=user.id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@api.get('/export/', name='transaction-export', response_class=StreamingResponse)
+async def export_transactions(
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        include_archived: bool = False,
+        user: User = Depends(get_current_user),
+        async_db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """
+    Transaction history of the user wallets as NDJSON, the last
+    `TRANSACTION_LIST_PERIOD_DAYS` days by default. Months moved to cold
+    storage are included with `include_archived`.
+    """
+    if created_to is None:
+        created_to = datetime.now(timezone.utc)
+    if created_from is None:
+        created_from = created_to - timedelta(days=settings.TRANSACTION_LIST_PERIOD_DAYS)
+    return StreamingResponse(
+        export_transaction_history(
+            async_db, user_id=user.id, created_from=created_from, created_to=created_to,
+            include_archived=include_archived,
+        ),
+        media_type='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="transactions.ndjson"'},
+    )
+
+
 @api.get('/{obj_id}/detail/', name='transaction-detail', response_model=TransactionVisible)
 async def get_single_transaction(
+        request: Request,
+        response: Response,
         obj_id: UUID,
         user: User = Depends(get_current_user),
         async_db: AsyncSession = Depends(get_async_db)
 
-) -> dict:
-    sql_text = '''
+) -> Union[dict, Response]:
+    where = '''
+        from public."transaction" tr 
+        where   (tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+         or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id))
+         and tr."id"=:transaction_id
+    '''
+    params = {'user_id': user.id, 'transaction_id': obj_id}
+    created_at = uuid7_time(obj_id)
+    if created_at is not None:
+        # The id carries the creation time, only its partition is read
+        where += ' and tr."created_at" >= :created_from and tr."created_at" < :created_to'
+        params.update(created_from=created_at, created_to=created_at + timedelta(milliseconds=1))
+
+    if request.headers.get('if-none-match') or request.headers.get('if-modified-since'):
+        # Compare the version alone before reading and rendering the row
+        result = await transaction_repo.execute_raw_sql(
+            async_db, sql_text=f'select tr."updated_at", tr."created_at" {where}', params=params,
+        )
+        version = result.fetchone()
+        if version is None:
+            transaction_repo.does_not_exist()
+        not_modified = not_modified_response(request, obj_id, version.updated_at or version.created_at)
+        if not_modified is not None:
+            return not_modified
+
+    sql_text = f'''
         select tr."id" as id,
             tr."from_wallet_id", 
             tr."to_wallet_id",
             tr."currency",
             tr."total_amount",
             tr."status",
-            tr."transaction_type"
-        from public."transaction" tr 
-        where   (tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
-         or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id))
-         and tr."id"=:transaction_id
+            tr."transaction_type",
+            tr."created_at",
+            tr."updated_at"
+        {where}
     '''
-    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text,
-                                                    params={'user_id': user.id, 'transaction_id': obj_id})
+    result = await transaction_repo.execute_raw_sql(async_db, sql_text=sql_text, params=params)
     db_obj = result.fetchone()
     if db_obj is None:
         transaction_repo.does_not_exist()
+    modified_at = db_obj.updated_at or db_obj.created_at
+    response.headers.update({
+        'ETag': version_etag(db_obj.id, modified_at),
+        'Last-Modified': http_date(modified_at),
+        'Cache-Control': 'private, no-cache',
+    })
     return {
         'id': db_obj.id,
         'total': {
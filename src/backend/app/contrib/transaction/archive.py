@@ -0,0 +1,493 @@
+"""
+Cold storage of old transactions.
+
+`archive_month` moves the transactions of one UTC month out of Postgres.
+The rows are streamed in chunks to `<TRANSACTION_ARCHIVE_DIR>/<YYYY-MM>.ndjson.gz`,
+or to `.parquet` with pyarrow installed. The file is then read back and
+checked against the row count, amount sum and sha256 recorded in
+`<YYYY-MM>.json`, and only after that the rows found in the file are deleted
+in batches. The emptied partition of the month is dropped, a partition
+detached to the archive schema by `partitions detach` is dropped whole when
+its row count matches the manifest.
+
+A month with a manifest is served from its file by `iter_archived`, so a
+run interrupted after the manifest resumes with the deletion.
+
+    python -m app.contrib.transaction.archive run --retention 12 --format parquet
+    python -m app.contrib.transaction.archive run --month 2025-01 --dry-run
+    python -m app.contrib.transaction.archive verify 2025-01
+    python -m app.contrib.transaction.archive list
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import typing as t
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.conf.config import settings
+
+from .partitions import (
+    DEFAULT_PARTITION,
+    DETACH_LOCK_TIMEOUT,
+    TABLE,
+    add_months,
+    current_month,
+    list_partitions,
+    partition_month,
+    partition_name,
+)
+
+COLUMNS = (
+    'id', 'created_at', 'updated_at', 'private_metadata', 'public_metadata', 'to_wallet_id',
+    'from_wallet_id', 'currency', 'total_amount', 'transaction_type', 'status',
+)
+SUFFIXES = {'ndjson': '.ndjson.gz', 'parquet': '.parquet'}
+READ_CHUNK_SIZE = 10_000
+
+
+class ArchiveError(Exception):
+    pass
+
+
+@dataclass
+class Manifest:
+    month: str
+    format: str
+    file: str
+    rows: int
+    total_amount: str
+    sha256: str
+    archived_at: str
+
+    @classmethod
+    def load(cls, path: Path) -> 'Manifest':
+        return cls(**orjson.loads(path.read_bytes()))
+
+    def dump(self, path: Path) -> None:
+        partial = path.with_name(f'{path.name}.partial')
+        partial.write_bytes(orjson.dumps(asdict(self), option=orjson.OPT_INDENT_2))
+        os.replace(partial, path)
+
+
+def archive_dir() -> Path:
+    path = Path(settings.TRANSACTION_ARCHIVE_DIR)
+    if not path.is_absolute():
+        path = Path(settings.BASE_DIR) / path
+    return path
+
+
+def month_key(month: date) -> str:
+    return f'{month.year:04d}-{month.month:02d}'
+
+
+def parse_month(value: str) -> date:
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def month_bounds(month: date) -> t.Tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end = add_months(month, 1)
+    return start, datetime(end.year, end.month, 1, tzinfo=timezone.utc)
+
+
+def manifest_path(month: date) -> Path:
+    return archive_dir() / f'{month_key(month)}.json'
+
+
+def get_manifest(month: date) -> t.Optional[Manifest]:
+    path = manifest_path(month)
+    if not path.exists():
+        return None
+    return Manifest.load(path)
+
+
+def archived_months() -> t.List[date]:
+    path = archive_dir()
+    if not path.is_dir():
+        return []
+    return sorted(parse_month(manifest.stem) for manifest in path.glob('????-??.json'))
+
+
+def _isoformat(value: t.Union[datetime, str, None]) -> t.Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _metadata(value: t.Union[dict, str, None]) -> dict:
+    if isinstance(value, str):
+        return orjson.loads(value)
+    return value or {}
+
+
+def serialize_row(values: t.Mapping[str, t.Any]) -> dict:
+    """
+    JSON representation of a transaction row, the same for database rows
+    and rows read back from either archive format
+    :param values:
+    :return:
+    """
+    return {
+        'id': str(values['id']),
+        'created_at': _isoformat(values['created_at']),
+        'updated_at': _isoformat(values['updated_at']),
+        'private_metadata': _metadata(values['private_metadata']),
+        'public_metadata': _metadata(values['public_metadata']),
+        'to_wallet_id': str(values['to_wallet_id']) if values['to_wallet_id'] else None,
+        'from_wallet_id': str(values['from_wallet_id']) if values['from_wallet_id'] else None,
+        'currency': values['currency'],
+        'total_amount': str(values['total_amount']),
+        'transaction_type': str(values['transaction_type']),
+        'status': str(values['status']),
+    }
+
+
+class NdjsonWriter:
+    def __init__(self, path: Path):
+        self.file = gzip.open(path, 'wb')
+
+    def write(self, rows: t.Sequence[t.Mapping[str, t.Any]]) -> None:
+        self.file.write(b''.join(orjson.dumps(serialize_row(row)) + b'\n' for row in rows))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ArchiveError('Parquet archives need pyarrow, install the parquet extra') from e
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetWriter:
+    def __init__(self, path: Path):
+        pa, pq = _import_pyarrow()
+        self.pa = pa
+        timestamp = pa.timestamp('us', tz='UTC')
+        self.schema = pa.schema([
+            ('id', pa.string()),
+            ('created_at', timestamp),
+            ('updated_at', timestamp),
+            ('private_metadata', pa.string()),
+            ('public_metadata', pa.string()),
+            ('to_wallet_id', pa.string()),
+            ('from_wallet_id', pa.string()),
+            ('currency', pa.string()),
+            ('total_amount', pa.decimal128(settings.DEFAULT_MAX_DIGITS, settings.DEFAULT_DECIMAL_PLACES)),
+            ('transaction_type', pa.string()),
+            ('status', pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, rows: t.Sequence[t.Mapping[str, t.Any]]) -> None:
+        columns: t.Dict[str, list] = {name: [] for name in COLUMNS}
+        for row in rows:
+            serialized = serialize_row(row)
+            for name in COLUMNS:
+                columns[name].append(serialized[name])
+            # Typed columns keep their database values
+            columns['created_at'][-1] = row['created_at']
+            columns['updated_at'][-1] = row['updated_at']
+            columns['total_amount'][-1] = row['total_amount']
+            columns['private_metadata'][-1] = orjson.dumps(serialized['private_metadata']).decode()
+            columns['public_metadata'][-1] = orjson.dumps(serialized['public_metadata']).decode()
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {'ndjson': NdjsonWriter, 'parquet': ParquetWriter}
+
+
+def read_file(path: Path, fmt: str) -> t.Iterator[dict]:
+    """
+    Serialized rows of an archive file
+    :param path:
+    :param fmt: ndjson or parquet
+    :return:
+    """
+    if fmt == 'ndjson':
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                yield serialize_row(orjson.loads(line))
+        return
+    _, pq = _import_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=READ_CHUNK_SIZE):
+        for row in batch.to_pylist():
+            yield serialize_row(row)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify_month(month: date) -> Manifest:
+    """
+    Check the archive file of the month against its manifest
+    @raise ArchiveError
+    """
+    manifest = get_manifest(month)
+    if manifest is None:
+        raise ArchiveError(f'{month_key(month)} is not archived')
+    path = archive_dir() / manifest.file
+    if not path.exists():
+        raise ArchiveError(f'{path} is missing')
+    if file_sha256(path) != manifest.sha256:
+        raise ArchiveError(f'{path}: checksum does not match the manifest')
+    rows, total_amount = 0, Decimal(0)
+    for row in read_file(path, manifest.format):
+        rows += 1
+        total_amount += Decimal(row['total_amount'])
+    if rows != manifest.rows or total_amount != Decimal(manifest.total_amount):
+        raise ArchiveError(
+            f'{path}: {rows} rows of {total_amount} in the file, {manifest.rows} of {manifest.total_amount} expected'
+        )
+    return manifest
+
+
+def detached_table(conn: Connection, month: date) -> t.Optional[str]:
+    """Partition of the month moved to the archive schema, if any"""
+    name = f'"{settings.TRANSACTION_ARCHIVE_SCHEMA}"."{partition_name(month)}"'
+    if conn.execute(text('SELECT to_regclass(:name)'), {'name': name}).scalar() is None:
+        return None
+    return name
+
+
+def write_month(conn: Connection, month: date, *, fmt: str, chunk_size: int) -> Manifest:
+    """
+    Stream the rows of the month into its archive file and write the manifest.
+    Run in a REPEATABLE READ transaction, so the totals match the rows written.
+    :param conn:
+    :param month:
+    :param fmt: ndjson or parquet
+    :param chunk_size: rows fetched and written at once
+    :return:
+    """
+    source = detached_table(conn, month) or f'public."{TABLE}"'
+    start, end = month_bounds(month)
+    params = {'start': start, 'end': end}
+    where = 'created_at >= :start AND created_at < :end'
+    expected = conn.execute(text(
+        f'SELECT count(*) AS rows, coalesce(sum(total_amount), 0) AS total_amount FROM {source} WHERE {where}'
+    ), params).one()
+
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    file_name = f'{month_key(month)}{SUFFIXES[fmt]}'
+    partial = directory / f'{file_name}.partial'
+    writer = WRITERS[fmt](partial)
+    try:
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(text(
+            f'SELECT {", ".join(COLUMNS)} FROM {source} WHERE {where} ORDER BY created_at, id'
+        ), params)
+        for chunk in result.mappings().partitions(chunk_size):
+            writer.write(chunk)
+    finally:
+        writer.close()
+    os.replace(partial, directory / file_name)
+
+    manifest = Manifest(
+        month=month_key(month),
+        format=fmt,
+        file=file_name,
+        rows=expected.rows,
+        total_amount=str(expected.total_amount),
+        sha256=file_sha256(directory / file_name),
+        archived_at=datetime.now(timezone.utc).isoformat(),
+    )
+    manifest.dump(manifest_path(month))
+    return manifest
+
+
+def delete_month(engine: Engine, month: date, manifest: Manifest, *, batch_size: int) -> int:
+    """
+    Delete the rows of the month found in its archive file, each batch in its
+    own transaction so locks and WAL stay small, then drop the emptied
+    partition. Rows missing from the file, created after the manifest was
+    written, are never deleted and keep their partition.
+    :param engine:
+    :param month:
+    :param manifest: verified manifest of the month
+    :param batch_size:
+    :return: number of rows deleted
+    @raise ArchiveError
+    """
+    with engine.begin() as conn:
+        detached = detached_table(conn, month)
+        if detached is not None:
+            rows = conn.execute(text(f'SELECT count(*) FROM {detached}')).scalar()
+            if rows != manifest.rows:
+                raise ArchiveError(f'{detached}: {rows} rows, {manifest.rows} archived, table kept')
+            conn.execute(text(f'DROP TABLE {detached}'))
+            return 0
+
+    start, end = month_bounds(month)
+    params = {'start': start, 'end': end}
+    where = 'created_at >= :start AND created_at < :end'
+    ids = (row['id'] for row in read_file(archive_dir() / manifest.file, manifest.format))
+    deleted = 0
+    for batch in iter(lambda: list(islice(ids, batch_size)), []):
+        with engine.begin() as conn:
+            result = conn.execute(text(
+                f'DELETE FROM public."{TABLE}" WHERE {where} AND id = ANY(CAST(:ids AS uuid[]))'
+            ), {**params, 'ids': batch})
+        deleted += result.rowcount
+
+    with engine.begin() as conn:
+        remaining = conn.execute(text(f'SELECT count(*) FROM public."{TABLE}" WHERE {where}'), params).scalar()
+        if remaining:
+            raise ArchiveError(
+                f'{month_key(month)}: {deleted} of {manifest.rows} archived rows deleted, '
+                f'{remaining} rows missing from the archive kept'
+            )
+        name = partition_name(month)
+        if any(partition.name == name for partition in list_partitions(conn)):
+            conn.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+            conn.execute(text(f'DROP TABLE public."{name}"'))
+    return deleted
+
+
+def archive_month(
+        engine: Engine,
+        month: date,
+        *,
+        fmt: t.Optional[str] = None,
+        chunk_size: t.Optional[int] = None,
+        batch_size: t.Optional[int] = None,
+) -> Manifest:
+    """
+    Write, verify and delete the transactions of the month. An existing
+    manifest is verified and the deletion resumed, rows created since it
+    was written are kept and raise.
+    @raise ArchiveError
+    """
+    fmt = fmt or settings.TRANSACTION_ARCHIVE_FORMAT
+    if fmt not in WRITERS:
+        raise ArchiveError(f'Unknown archive format {fmt}')
+    if month >= current_month():
+        raise ArchiveError(f'{month_key(month)} is not over yet')
+
+    if get_manifest(month) is None:
+        with engine.connect() as conn:
+            with conn.execution_options(isolation_level='REPEATABLE READ').begin():
+                write_month(conn, month, fmt=fmt, chunk_size=chunk_size or settings.TRANSACTION_ARCHIVE_CHUNK_SIZE)
+    manifest = verify_month(month)
+    delete_month(engine, month, manifest, batch_size=batch_size or settings.TRANSACTION_ARCHIVE_DELETE_BATCH)
+    return manifest
+
+
+def months_to_archive(conn: Connection, cutoff: date) -> t.List[date]:
+    """
+    Months before `cutoff` still holding rows: attached and detached monthly
+    partitions and months present in the default partition
+    :param conn:
+    :param cutoff: first month kept in Postgres
+    :return:
+    """
+    months = {
+        partition.month for partition in list_partitions(conn)
+        if partition.month is not None and partition.month < cutoff
+    }
+    detached = conn.execute(text(
+        'SELECT table_name FROM information_schema.tables WHERE table_schema = :schema'
+    ), {'schema': settings.TRANSACTION_ARCHIVE_SCHEMA})
+    months.update(
+        month for month in (partition_month(row.table_name) for row in detached)
+        if month is not None and month < cutoff
+    )
+    default_months = conn.execute(text(f'''
+        SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date AS month
+        FROM public."{DEFAULT_PARTITION}" WHERE created_at < :cutoff
+    '''), {'cutoff': month_bounds(cutoff)[0]})
+    months.update(row.month for row in default_months)
+    return sorted(months)
+
+
+def iter_archived(
+        month: date,
+        *,
+        wallet_ids: t.Collection[str],
+        start: datetime,
+        end: datetime,
+) -> t.Iterator[dict]:
+    """
+    Archived rows of the month touching the wallets, created in [start, end)
+    :param month:
+    :param wallet_ids: wallet ids as strings
+    :param start:
+    :param end:
+    :return:
+    """
+    manifest = get_manifest(month)
+    if manifest is None:
+        return
+    for row in read_file(archive_dir() / manifest.file, manifest.format):
+        if not start <= datetime.fromisoformat(row['created_at']) < end:
+            continue
+        if row['to_wallet_id'] in wallet_ids or row['from_wallet_id'] in wallet_ids:
+            yield row
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='archive months before the retention period')
+    run.add_argument('--month', type=parse_month, action='append', dest='months', help='YYYY-MM, may be repeated')
+    run.add_argument('--retention', type=int, help='months kept in Postgres, the current one included')
+    run.add_argument('--format', choices=tuple(WRITERS), dest='fmt')
+    run.add_argument('--chunk-size', type=int)
+    run.add_argument('--batch-size', type=int)
+    run.add_argument('--dry-run', action='store_true', help='only print the months')
+    verify = commands.add_parser('verify', help='check archive files against their manifests')
+    verify.add_argument('months', type=parse_month, nargs='*', help='YYYY-MM, all archived months by default')
+    commands.add_parser('list', help='show archived months')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for month in archived_months():
+            manifest = get_manifest(month)
+            print(f'{manifest.month} {manifest.format} {manifest.rows} rows {manifest.total_amount}')
+        return
+    if args.command == 'verify':
+        for month in args.months or archived_months():
+            verify_month(month)
+            print(f'{month_key(month)} ok')
+        return
+
+    from app.db.session import get_engine
+
+    engine = get_engine()
+    months = args.months
+    if not months:
+        retention = args.retention or settings.TRANSACTION_RETENTION_MONTHS
+        with engine.connect() as conn:
+            months = months_to_archive(conn, add_months(current_month(), 1 - retention))
+    for month in months:
+        if args.dry_run:
+            print(f'would archive {month_key(month)}')
+            continue
+        manifest = archive_month(
+            engine, month, fmt=args.fmt, chunk_size=args.chunk_size, batch_size=args.batch_size,
+        )
+        print(f'archived {manifest.month}: {manifest.rows} rows to {manifest.file}')
+
+
+if __name__ == '__main__':
+    main()
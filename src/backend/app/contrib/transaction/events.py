@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, AsyncGenerator, Iterable, Optional, Union
+from uuid import UUID
+
+import orjson
+
+from app.conf.config import settings
+from app.core.cache import CACHE_ERRORS
+
+if TYPE_CHECKING:
+    from aioredis import Redis as AIORedis
+    from redis import Redis
+    from starlette.requests import Request
+    from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'transaction:user:'
+
+
+def get_user_channel(user_id: Union[UUID, str]) -> str:
+    return f'{CHANNEL_PREFIX}{user_id}'
+
+
+def dump_transaction_event(transaction: "Transaction") -> bytes:
+    return orjson.dumps({
+        'id': str(transaction.id),
+        'status': str(transaction.status),
+        'transactionType': str(transaction.transaction_type),
+        'toWalletId': str(transaction.to_wallet_id) if transaction.to_wallet_id else None,
+        'fromWalletId': str(transaction.from_wallet_id) if transaction.from_wallet_id else None,
+    })
+
+
+def publish_transaction_status(
+        redis: "Redis",
+        transaction: "Transaction",
+        user_ids: Iterable[Union[UUID, str, None]],
+) -> None:
+    """
+    Publish transaction status to the channel of every given wallet owner,
+    called after the commit, so Redis errors are only logged
+    :param redis: sync redis client
+    :param transaction:
+    :param user_ids:
+    :return:
+    """
+    message = dump_transaction_event(transaction)
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            for user_id in {user_id for user_id in user_ids if user_id}:
+                pipe.publish(get_user_channel(user_id), message)
+            pipe.execute()
+    except CACHE_ERRORS as e:
+        logger.warning('Transaction status publish failed: %s', e)
+
+
+async def stream_transaction_events(
+        request: "Request",
+        redis: "AIORedis",
+        user_id: Union[UUID, str],
+        heartbeat: Optional[int] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Yield server-sent events for the user channel until client disconnects
+    :param request:
+    :param redis: shared async redis client
+    :param user_id:
+    :param heartbeat: seconds between keep-alive comments
+    :return:
+    """
+    if heartbeat is None:
+        heartbeat = settings.TRANSACTION_EVENTS_HEARTBEAT
+    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(get_user_channel(user_id))
+    try:
+        loop = asyncio.get_running_loop()
+        last_sent = loop.time()
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(timeout=1.0)
+            if message is not None:
+                data = message['data']
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                last_sent = loop.time()
+                yield f'event: transaction\ndata: {data}\n\n'
+            elif loop.time() - last_sent >= heartbeat:
+                last_sent = loop.time()
+                yield ': keep-alive\n\n'
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.close()
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from itertools import islice
+from typing import TYPE_CHECKING, AsyncGenerator, Dict, Set
+from uuid import UUID
+
+import orjson
+from sqlalchemy import text
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from .archive import READ_CHUNK_SIZE, archived_months, iter_archived, month_bounds, serialize_row
+from .partitions import add_months
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_COLUMNS = (
+    'id, created_at, updated_at, private_metadata, public_metadata, to_wallet_id, from_wallet_id, '
+    'currency, total_amount, transaction_type, status'
+)
+
+
+def export_row(row: Dict) -> bytes:
+    """NDJSON line of a serialized transaction, private metadata left out"""
+    return orjson.dumps({
+        'id': row['id'],
+        'createdAt': row['created_at'],
+        'status': row['status'],
+        'transactionType': row['transaction_type'],
+        'total': {'amount': row['total_amount'], 'currency': row['currency']},
+        'fromWalletId': row['from_wallet_id'],
+        'toWalletId': row['to_wallet_id'],
+        'metadata': row['public_metadata'],
+    }) + b'\n'
+
+
+async def export_transaction_history(
+        async_db: "AsyncSession",
+        *,
+        user_id: UUID,
+        created_from: datetime,
+        created_to: datetime,
+        include_archived: bool = False,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Transactions of the user wallets created in [created_from, created_to) as
+    NDJSON, oldest first. Each month is read from its partition, or from the
+    cold storage file when it is archived and `include_archived` is set.
+    :param async_db:
+    :param user_id:
+    :param created_from:
+    :param created_to:
+    :param include_archived:
+    :return:
+    """
+    # Query values without offset are taken as UTC
+    created_from, created_to = (
+        value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (created_from, created_to)
+    )
+    result = await async_db.execute(
+        text('select w."id" from public."wallet" w where w."user_id"=:user_id'), {'user_id': user_id},
+    )
+    wallet_ids: Set[str] = {str(row.id) for row in result}
+    if not wallet_ids:
+        return
+    archived = set(await run_in_threadpool(archived_months))
+
+    month = created_from.astimezone(timezone.utc).date().replace(day=1)
+    while True:
+        month_start, month_end = month_bounds(month)
+        if month_start >= created_to:
+            break
+        start, end = max(month_start, created_from), min(month_end, created_to)
+        if month in archived:
+            if include_archived:
+                rows = iter_archived(month, wallet_ids=wallet_ids, start=start, end=end)
+                # Chunks of the file are read in the threadpool, never the whole month at once
+                chunks = iter(lambda: list(islice(rows, READ_CHUNK_SIZE)), [])
+                async for chunk in iterate_in_threadpool(chunks):
+                    for row in chunk:
+                        yield export_row(row)
+        else:
+            result = await async_db.stream(text(f'''
+                select {EXPORT_COLUMNS}
+                from public."transaction" tr
+                where   (tr."to_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id)
+                 or     tr."from_wallet_id" in (select w."id" from public."wallet" w where w."user_id"=:user_id))
+                 and tr."created_at" >= :created_from and tr."created_at" < :created_to
+                order by tr."created_at", tr."id"
+            '''), {'user_id': user_id, 'created_from': start, 'created_to': end})
+            async for row in result.mappings():
+                yield export_row(serialize_row(row))
+        month = add_months(month, 1)
@@ -1,19 +1,31 @@
 import sqlalchemy as sa
+from datetime import datetime, timezone
 from decimal import Decimal
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy_utils import ChoiceType
 from sqlalchemy.ext.hybrid import hybrid_property
 
+from app.utils.ids import uuid7, uuid7_time
 from app.utils.prices import Money
 from app.conf.config import settings
-from app.db.models import UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base
-from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.db.models import UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base, metadata_indexes
+from app.contrib.transaction import TransactionDirectionChoices, TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction.partitions import create_initial_partitions
+
+
+def created_at_from_id(context) -> datetime:
+    # The id carries the creation time, so lookups by id can be limited to its partition
+    return uuid7_time(context.get_current_parameters()['id']) or datetime.now(timezone.utc)
 
 
 class Transaction(UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base):
     __tablename__: str = 'transaction'
 
+    id = sa.Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid7, nullable=False)
+    # Partition key, part of the primary key as Postgres requires
+    created_at = sa.Column(sa.DateTime(timezone=True), primary_key=True, default=created_at_from_id, nullable=False)
+
     to_wallet_id = sa.Column(
         UUID(as_uuid=True),
         sa.ForeignKey('wallet.id', ondelete='RESTRICT', name='fx_tr_to_wl_id'),
@@ -41,6 +53,49 @@ class Transaction(UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMix
     to_wallet = relationship('Wallet', foreign_keys=[to_wallet_id], lazy='noload')
     from_wallet = relationship('Wallet', foreign_keys=[from_wallet_id], lazy='noload')
 
+    __table_args__ = (
+        *metadata_indexes('transaction'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    @hybrid_property
+    def total(self):
+        return Money(amount=Decimal(self.total_amount), currency=self.currency)
+
+
+sa.event.listen(Transaction.__table__, 'after_create', create_initial_partitions)
+
+
+class TransactionSummary(CreationModificationDateMixin, Base):
+    """
+    Completed transactions per wallet, month, currency, type and direction,
+    kept up to date by the ledger tasks
+    """
+    __tablename__: str = 'transaction_summary'
+
+    wallet_id = sa.Column(
+        UUID(as_uuid=True),
+        sa.ForeignKey('wallet.id', ondelete='CASCADE', name='fx_tr_sm_wl_id'),
+        nullable=False
+    )
+    # First day of the UTC month
+    period = sa.Column(sa.Date, nullable=False)
+    currency = sa.Column(sa.String(settings.DEFAULT_CURRENCY_CODE_LENGTH), nullable=False)
+    transaction_type = sa.Column(
+        ChoiceType(choices=TransactionTypeChoices, impl=sa.String(13)), nullable=False,
+    )
+    direction = sa.Column(
+        ChoiceType(choices=TransactionDirectionChoices, impl=sa.String(7)), nullable=False,
+    )
+    count = sa.Column(sa.Integer, nullable=False, default=0)
+    total_amount = sa.Column(sa.DECIMAL(precision=20, scale=2), nullable=False, default=0)
+
+    __table_args__ = (
+        sa.UniqueConstraint(
+            'wallet_id', 'period', 'currency', 'transaction_type', 'direction', name='ux_tr_sm_key',
+        ),
+    )
+
     @hybrid_property
     def total(self):
         return Money(amount=Decimal(self.total_amount), currency=self.currency)
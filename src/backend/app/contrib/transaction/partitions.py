@@ -0,0 +1,224 @@
+"""
+Monthly range partitions of the `transaction` table.
+
+The table is partitioned by `created_at`, one partition per UTC month named
+`transaction_yYYYYmMM`, and `transaction_default` catches rows outside of
+them. Partitions are created `TRANSACTION_PARTITIONS_AHEAD` months in
+advance on schema creation, by `prestart.sh` and daily by the celery beat.
+`detach` moves partitions older than `TRANSACTION_RETENTION_MONTHS` out of
+the table into `TRANSACTION_ARCHIVE_SCHEMA`, queries no longer read them.
+
+    python -m app.contrib.transaction.partitions list
+    python -m app.contrib.transaction.partitions ensure --ahead 3
+    python -m app.contrib.transaction.partitions detach --retention 12 --dry-run
+
+Detaching takes an exclusive lock of the table for a moment, Postgres 13
+has no `DETACH PARTITION ... CONCURRENTLY`. `lock_timeout` keeps it from
+queueing behind long transactions, run it again if it times out.
+"""
+import argparse
+import re
+import typing as t
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.conf.config import settings
+
+TABLE = 'transaction'
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME_PATTERN = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+DETACH_LOCK_TIMEOUT = '5s'
+
+
+@dataclass
+class Partition:
+    name: str
+    schema: str
+    # None for the default partition
+    month: t.Optional[date]
+
+
+def current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.month - 1 + months
+    return date(month.year + index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{TABLE}_y{month.year:04d}m{month.month:02d}'
+
+
+def partition_month(name: str) -> t.Optional[date]:
+    match = PARTITION_NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def list_partitions(conn: Connection) -> t.List[Partition]:
+    rows = conn.execute(text('''
+        select c.relname as name, n.nspname as schema
+        from pg_inherits i
+        join pg_class c on c.oid = i.inhrelid
+        join pg_namespace n on n.oid = c.relnamespace
+        where i.inhparent = cast(:table as regclass)
+        order by c.relname
+    '''), {'table': f'public."{TABLE}"'})
+    return [Partition(name=row.name, schema=row.schema, month=partition_month(row.name)) for row in rows]
+
+
+def month_bounds(month: date) -> t.Tuple[str, str]:
+    """UTC bounds of the month, so they do not depend on the session time zone"""
+    return f'{month.isoformat()} 00:00:00+00', f'{add_months(month, 1).isoformat()} 00:00:00+00'
+
+
+def month_condition(month: date) -> str:
+    lower, upper = month_bounds(month)
+    return f"\"created_at\" >= '{lower}' and \"created_at\" < '{upper}'"
+
+
+def default_has_rows(conn: Connection, month: date) -> bool:
+    return conn.execute(text(
+        f'''select exists (select 1 from public."{DEFAULT_PARTITION}" where {month_condition(month)})'''
+    )).scalar()
+
+
+def create_partition(conn: Connection, month: date, *, has_default: bool = False) -> str:
+    """
+    Create partition of the month. Postgres refuses to create it while the
+    default partition holds rows of the month, such rows are moved: the
+    default is detached, the partition created, the rows inserted into it
+    and the default attached again. The table is locked meanwhile, the
+    move is meant for the few rows written before a late `ensure`.
+    :param conn:
+    :param month:
+    :param has_default: the default partition exists
+    :return: name of the partition
+    """
+    name = partition_name(month)
+    lower, upper = month_bounds(month)
+    create = (
+        f'''CREATE TABLE IF NOT EXISTS public."{name}" PARTITION OF public."{TABLE}" '''
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+    if not has_default or not default_has_rows(conn, month):
+        conn.execute(text(create))
+        return name
+
+    conn.execute(text(f'ALTER TABLE public."{TABLE}" DETACH PARTITION public."{DEFAULT_PARTITION}"'))
+    conn.execute(text(create))
+    condition = month_condition(month)
+    conn.execute(text(f'''INSERT INTO public."{name}" SELECT * FROM public."{DEFAULT_PARTITION}" WHERE {condition}'''))
+    conn.execute(text(f'''DELETE FROM public."{DEFAULT_PARTITION}" WHERE {condition}'''))
+    conn.execute(text(f'ALTER TABLE public."{TABLE}" ATTACH PARTITION public."{DEFAULT_PARTITION}" DEFAULT'))
+    return name
+
+
+def ensure_partitions(
+        conn: Connection,
+        *,
+        start: t.Optional[date] = None,
+        ahead: t.Optional[int] = None,
+) -> t.List[str]:
+    """
+    Create the default partition and the monthly ones from `start` until
+    `ahead` months after the current one
+    :param conn:
+    :param start: first month, the current one by default
+    :param ahead:
+    :return: names of the partitions created
+    """
+    if ahead is None:
+        ahead = settings.TRANSACTION_PARTITIONS_AHEAD
+    existing = {partition.name for partition in list_partitions(conn)}
+    created = []
+    has_default = DEFAULT_PARTITION in existing
+    if not has_default:
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS public."{DEFAULT_PARTITION}" PARTITION OF public."{TABLE}" DEFAULT'))
+        created.append(DEFAULT_PARTITION)
+
+    month = start or current_month()
+    last = add_months(current_month(), ahead)
+    while month <= last:
+        if partition_name(month) not in existing:
+            created.append(create_partition(conn, month, has_default=has_default))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(
+        conn: Connection,
+        *,
+        retention: t.Optional[int] = None,
+        schema: t.Optional[str] = None,
+        dry_run: bool = False,
+) -> t.List[str]:
+    """
+    Detach monthly partitions older than `retention` months and move them
+    to the archive schema
+    :param conn:
+    :param retention: months kept attached, the current one included
+    :param schema:
+    :param dry_run: only return the partitions which would be detached
+    :return: names of the detached partitions
+    """
+    if retention is None:
+        retention = settings.TRANSACTION_RETENTION_MONTHS
+    schema = schema or settings.TRANSACTION_ARCHIVE_SCHEMA
+    oldest_kept = add_months(current_month(), 1 - retention)
+    names = [
+        partition.name for partition in list_partitions(conn)
+        if partition.month is not None and partition.month < oldest_kept
+    ]
+    if dry_run or not names:
+        return names
+
+    conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+    conn.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+    for name in names:
+        conn.execute(text(f'ALTER TABLE public."{TABLE}" DETACH PARTITION public."{name}"'))
+        conn.execute(text(f'ALTER TABLE public."{name}" SET SCHEMA "{schema}"'))
+    return names
+
+
+def create_initial_partitions(target, connection: Connection, **kwargs) -> None:
+    """`after_create` listener of the table, so `create_all` gives a usable table"""
+    if connection.dialect.name == 'postgresql':
+        ensure_partitions(connection)
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='show attached partitions')
+    ensure = commands.add_parser('ensure', help='create missing partitions')
+    ensure.add_argument('--ahead', type=int, help='months after the current one')
+    detach = commands.add_parser('detach', help='move old partitions to the archive schema')
+    detach.add_argument('--retention', type=int, help='months kept attached')
+    detach.add_argument('--schema', help='archive schema')
+    detach.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    from app.db.session import get_engine
+
+    with get_engine().begin() as conn:
+        if args.command == 'list':
+            for partition in list_partitions(conn):
+                print(f'{partition.schema}.{partition.name}')
+        elif args.command == 'ensure':
+            for name in ensure_partitions(conn, ahead=args.ahead):
+                print(f'created {name}')
+        else:
+            names = detach_partitions(conn, retention=args.retention, schema=args.schema, dry_run=args.dry_run)
+            for name in names:
+                print(f'{"would detach" if args.dry_run else "detached"} {name}')
+
+
+if __name__ == '__main__':
+    main()
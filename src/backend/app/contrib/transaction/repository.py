@@ -1,15 +1,186 @@
-from app.db.repository import CRUDBase, CRUDBaseSync
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+from uuid import UUID
 
-from .models import Transaction
+from sqlalchemy import Date, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine.row import Row
 
+from app.db.repository import CRUDBase, CRUDBaseSync, CRUDWithMetadataBase, CRUDWithMetadataBaseSync
+from app.contrib.transaction import TransactionDirectionChoices
+from app.contrib.wallet.models import Wallet
+from app.utils.ids import uuid7_time
 
-class CRUDTransactionSync(CRUDBaseSync[Transaction]):
-    pass
+from .models import Transaction, TransactionSummary
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
 
-class CRUDTransaction(CRUDBase[Transaction]):
-    pass
+
+def id_expressions(obj_id: Union[UUID, str]) -> Tuple:
+    """
+    Filter by id, bounded by the creation time the id carries so only its
+    partition is read. Ids created before partitioning carry no time.
+    :param obj_id:
+    :return:
+    """
+    created_at = uuid7_time(obj_id)
+    if created_at is None:
+        return Transaction.id == obj_id,
+    return (
+        Transaction.id == obj_id,
+        Transaction.created_at >= created_at,
+        Transaction.created_at < created_at + timedelta(milliseconds=1),
+    )
+
+
+class CRUDTransactionSync(CRUDWithMetadataBaseSync[Transaction]):
+
+    def _id_expressions(self, obj_id: Union[UUID, str]) -> Tuple:
+        return id_expressions(obj_id)
+
+    def get(self, db: "Session", obj_id: Union[UUID, str], options: Optional[Iterable] = ()) -> Transaction:
+        return self.get_by_params(db, options=options, expressions=id_expressions(obj_id))
+
+    def first_by_id(
+            self, db: "Session", obj_id: Union[UUID, str], options: Optional[Iterable] = (),
+    ) -> Optional[Transaction]:
+        return self.first(db, params={}, options=options, expressions=id_expressions(obj_id))
+
+
+class CRUDTransaction(CRUDWithMetadataBase[Transaction]):
+
+    def _id_expressions(self, obj_id: Union[UUID, str]) -> Tuple:
+        return id_expressions(obj_id)
+
+    async def get(
+            self, async_db: "AsyncSession", obj_id: Union[UUID, str], options: Optional[Iterable] = (),
+    ) -> Transaction:
+        return await self.get_by_params(async_db, options=options, expressions=id_expressions(obj_id))
+
+    async def first_by_id(
+            self, async_db: "AsyncSession", obj_id: Union[UUID, str], options: Optional[Iterable] = (),
+    ) -> Optional[Transaction]:
+        return await self.first(async_db, params={}, options=options, expressions=id_expressions(obj_id))
+
+
+SUMMARY_PERIODS = frozenset(('month', 'year'))
+
+
+def summary_period(created_at: datetime) -> date:
+    return created_at.astimezone(timezone.utc).date().replace(day=1)
+
+
+class CRUDTransactionSummarySync(CRUDBaseSync[TransactionSummary]):
+
+    def add(
+            self,
+            db: "Session",
+            *,
+            wallet_id: UUID,
+            period: date,
+            currency: str,
+            transaction_type: str,
+            direction: str,
+            amount: Decimal,
+    ) -> None:
+        """
+        Count one transaction in the summary row, created on first use. Not
+        committed, so it lands together with the balance change of the caller.
+        :param db:
+        :param wallet_id:
+        :param period: first day of the month
+        :param currency:
+        :param transaction_type:
+        :param direction:
+        :param amount:
+        :return:
+        """
+        table = self.model.__table__
+        statement = insert(table).values(
+            wallet_id=wallet_id, period=period, currency=currency, transaction_type=transaction_type,
+            direction=direction, count=1, total_amount=amount,
+        )
+        db.execute(statement.on_conflict_do_update(
+            constraint='ux_tr_sm_key',
+            set_={
+                'count': table.c.count + 1,
+                'total_amount': table.c.total_amount + statement.excluded.total_amount,
+                'updated_at': func.now(),
+            },
+        ))
+
+    def record(self, db: "Session", transaction: Transaction) -> None:
+        """
+        Count completed transaction as inflow of the receiving and outflow of
+        the sending wallet
+        :param db:
+        :param transaction:
+        :return:
+        """
+        for wallet_id, direction in (
+                (transaction.to_wallet_id, TransactionDirectionChoices.INFLOW),
+                (transaction.from_wallet_id, TransactionDirectionChoices.OUTFLOW),
+        ):
+            if wallet_id:
+                self.add(
+                    db, wallet_id=wallet_id, period=summary_period(transaction.created_at),
+                    currency=transaction.currency, transaction_type=transaction.transaction_type,
+                    direction=direction, amount=transaction.total_amount,
+                )
+
+
+class CRUDTransactionSummary(CRUDBase[TransactionSummary]):
+
+    async def get_summary(
+            self,
+            async_db: "AsyncSession",
+            *,
+            user_id: UUID,
+            period: str = 'month',
+            period_from: Optional[date] = None,
+            period_to: Optional[date] = None,
+            wallet_id: Optional[UUID] = None,
+    ) -> List[Row]:
+        """
+        Summary rows of the user wallets grouped by wallet, currency, type,
+        direction and month or year
+        :param async_db:
+        :param user_id:
+        :param period: month or year
+        :param period_from: first month included
+        :param period_to: last month included
+        :param wallet_id:
+        :return:
+        """
+        if period not in SUMMARY_PERIODS:
+            raise ValueError(f'Invalid summary period {period!r}')
+        model = self.model
+        # A literal unit, a bound one makes the select and group by expressions differ
+        period_column = cast(func.date_trunc(literal_column(f"'{period}'"), model.period), Date).label('period')
+        expressions = [Wallet.user_id == user_id]
+        if wallet_id is not None:
+            expressions.append(model.wallet_id == wallet_id)
+        if period_from is not None:
+            expressions.append(model.period >= period_from.replace(day=1))
+        if period_to is not None:
+            expressions.append(model.period <= period_to.replace(day=1))
+        group_by = (model.wallet_id, period_column, model.currency, model.transaction_type, model.direction)
+        result = await async_db.execute(
+            select(
+                *group_by,
+                func.sum(model.count).label('transaction_count'),
+                func.sum(model.total_amount).label('total_amount'),
+            ).join(Wallet, Wallet.id == model.wallet_id).filter(*expressions).group_by(*group_by).order_by(
+                period_column, model.wallet_id, model.transaction_type, model.direction,
+            )
+        )
+        return result.fetchall()
 
 
 transaction_repo = CRUDTransaction(Transaction)
 transaction_repo_sync = CRUDTransactionSync(Transaction)
+transaction_summary_repo = CRUDTransactionSummary(TransactionSummary)
+transaction_summary_repo_sync = CRUDTransactionSummarySync(TransactionSummary)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, Field
@@ -6,7 +6,7 @@ from uuid import UUID
 from typing import Optional
 from dataclasses import dataclass
 
-from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction import TransactionDirectionChoices, TransactionStatusChoices, TransactionTypeChoices
 from app.core.schema import MoneyBase
 from app.utils.prices import Money
 
@@ -25,6 +25,18 @@ class TransactionVisible(BaseModel):
         allow_population_by_field_name = True
 
 
+class TransactionSummaryVisible(BaseModel):
+    wallet_id: UUID = Field(..., alias='walletId')
+    period: date
+    transaction_type: TransactionTypeChoices = Field(..., alias='transactionType')
+    direction: TransactionDirectionChoices
+    count: int
+    total: MoneyBase
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class TransactionReplenishWallet(BaseModel):
     wallet_id: UUID = Field(..., alias='walletId')
     amount: Decimal
@@ -2,9 +2,13 @@ from uuid import UUID
 from sqlalchemy import text
 
 from app.core.celery_app import celery_app, DatabaseTask
+from app.core.metrics import observe_transaction_status
+from app.contrib.wallet.cache import wallet_cache
 from app.contrib.wallet.repository import wallet_repo_sync
 from app.contrib.transaction import TransactionStatusChoices
-from .repository import transaction_repo_sync
+from .events import publish_transaction_status
+from .partitions import ensure_partitions
+from .repository import transaction_repo_sync, transaction_summary_repo_sync
 
 
 @celery_app.task(
@@ -18,9 +22,10 @@ from .repository import transaction_repo_sync
     ))
 def transaction_replenish_wallet_task(self: DatabaseTask, transaction_id: UUID):
     session = next(self.get_session())
-    transaction = transaction_repo_sync.first(session, params={'id': transaction_id}, )
+    transaction = transaction_repo_sync.first_by_id(session, obj_id=transaction_id)
     if not transaction:
         raise Exception('Transaction doest not exist - %(transaction_id)s' % {'transaction_id': transaction_id})
+    previous_status = transaction.status
     wallet = wallet_repo_sync.get(session, obj_id=transaction.to_wallet_id)
     amount = wallet.total_amount + transaction.total_amount
 
@@ -28,7 +33,11 @@ def transaction_replenish_wallet_task(self: DatabaseTask, transaction_id: UUID):
     transaction.status = TransactionStatusChoices.COMPLETED
     session.add(wallet)
     session.add(transaction)
+    transaction_summary_repo_sync.record(session, transaction)
     session.commit()
+    observe_transaction_status(previous_status, transaction.status)
+    wallet_cache.invalidate(self.redis, (wallet.user_id,))
+    publish_transaction_status(self.redis, transaction, user_ids=(wallet.user_id,))
     return 'Transaction successfully completed'
 
 
@@ -44,20 +53,27 @@ def transaction_replenish_wallet_task(self: DatabaseTask, transaction_id: UUID):
 def transaction_withdraw_wallet_task(self: DatabaseTask, transaction_id: UUID):
     session = next(self.get_session())
 
-    transaction = transaction_repo_sync.first(session, params={'id': transaction_id}, )
+    transaction = transaction_repo_sync.first_by_id(session, obj_id=transaction_id)
     if not transaction:
         raise Exception('Transaction doest not exist - %(transaction_id)s' % {'transaction_id': transaction_id})
+    previous_status = transaction.status
     wallet = wallet_repo_sync.get(session, obj_id=transaction.from_wallet_id)
     if wallet.total_amount < transaction.total_amount:
         transaction.status = TransactionStatusChoices.REJECTED
         session.add(transaction)
         session.commit()
+        observe_transaction_status(previous_status, transaction.status)
+        publish_transaction_status(self.redis, transaction, user_ids=(wallet.user_id,))
         return 'Transaction rejected'
     wallet.total_amount = wallet.total_amount - transaction.total_amount
     transaction.status = TransactionStatusChoices.COMPLETED
     session.add(wallet)
     session.add(transaction)
+    transaction_summary_repo_sync.record(session, transaction)
     session.commit()
+    observe_transaction_status(previous_status, transaction.status)
+    wallet_cache.invalidate(self.redis, (wallet.user_id,))
+    publish_transaction_status(self.redis, transaction, user_ids=(wallet.user_id,))
     return 'Transaction successfully completed'
 
 
@@ -72,20 +88,25 @@ def transaction_withdraw_wallet_task(self: DatabaseTask, transaction_id: UUID):
     ))
 def transaction_transfer_money_task(self: DatabaseTask, transaction_id: UUID):
     session = next(self.get_session())
-    transaction = transaction_repo_sync.first(session, params={'id': transaction_id}, )
+    transaction = transaction_repo_sync.first_by_id(session, obj_id=transaction_id)
     if not transaction:
         raise Exception('Transaction doest not exist - %(transaction_id)s' % {'transaction_id': transaction_id})
+    previous_status = transaction.status
     from_wallet = wallet_repo_sync.get(session, obj_id=transaction.from_wallet_id)
     if from_wallet.total_amount < transaction.total_amount:
         transaction.status = TransactionStatusChoices.REJECTED
         session.add(transaction)
         session.commit()
+        observe_transaction_status(previous_status, transaction.status)
+        publish_transaction_status(self.redis, transaction, user_ids=(from_wallet.user_id,))
         return 'Transaction rejected'
     to_wallet = wallet_repo_sync.get(session, obj_id=transaction.to_wallet_id)
     if from_wallet.currency != to_wallet.currency:
         transaction.status = TransactionStatusChoices.REJECTED
         session.add(transaction)
         session.commit()
+        observe_transaction_status(previous_status, transaction.status)
+        publish_transaction_status(self.redis, transaction, user_ids=(from_wallet.user_id, to_wallet.user_id))
         return 'Transaction rejected'
 
     from_wallet.total_amount = from_wallet.total_amount - transaction.total_amount
@@ -94,5 +115,17 @@ def transaction_transfer_money_task(self: DatabaseTask, transaction_id: UUID):
     session.add(from_wallet)
     session.add(to_wallet)
     session.add(transaction)
+    transaction_summary_repo_sync.record(session, transaction)
     session.commit()
+    observe_transaction_status(previous_status, transaction.status)
+    wallet_cache.invalidate(self.redis, (from_wallet.user_id, to_wallet.user_id))
+    publish_transaction_status(self.redis, transaction, user_ids=(from_wallet.user_id, to_wallet.user_id))
     return 'Transaction successfully completed'
+
+
+@celery_app.task(base=DatabaseTask, bind=True)
+def transaction_ensure_partitions_task(self: DatabaseTask):
+    session = next(self.get_session())
+    created = ensure_partitions(session.connection())
+    session.commit()
+    return 'Partitions created: %(names)s' % {'names': ', '.join(created) or '-'}
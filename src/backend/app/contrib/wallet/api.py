@@ -1,7 +1,8 @@
 from uuid import UUID
 
 from starlette import status
-from fastapi import Depends, APIRouter
+from starlette.responses import Response
+from fastapi import Depends, APIRouter, Request
 from pydantic.error_wrappers import ErrorWrapper
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,9 +12,11 @@ from app.contrib.wallet.models import Wallet
 from app.contrib.wallet.repository import wallet_repo
 from app.contrib.wallet.schema import WalletVisible
 from app.routers.dependency import get_current_user, get_async_db, get_commons
+from app.core.cache import Versioned
 from app.core.schema import CommonsModel, IPaginationDataBase
 from app.utils.translation import gettext as _
 
+from .cache import wallet_cache
 from .schema import WalletCreate
 
 api = APIRouter()
@@ -21,25 +24,30 @@ api = APIRouter()
 
 @api.get('/', name='wallet-list', response_model=IPaginationDataBase[WalletVisible])
 async def get_wallet_list(
+        request: Request,
         async_db: AsyncSession = Depends(get_async_db),
         user: User = Depends(get_current_user),
         commons: CommonsModel = Depends(get_commons),
-) -> dict:
-    object_list = await wallet_repo.get_all(
-        async_db, q={'user_id': user.id}, limit=commons.limit,
-        offset=commons.offset
-    )
-    count = await wallet_repo.count(async_db, params={'user_id': user.id})
-    return {
-        'count': count,
-        'rows': object_list,
-        'page': commons.page,
-        'limit': commons.limit,
-    }
+) -> Response:
+    async def render() -> IPaginationDataBase[WalletVisible]:
+        object_list = await wallet_repo.get_all(
+            async_db, q={'user_id': user.id}, limit=commons.limit,
+            offset=commons.offset
+        )
+        count = await wallet_repo.count(async_db, params={'user_id': user.id})
+        return IPaginationDataBase[WalletVisible](
+            count=count,
+            rows=[WalletVisible.from_orm(obj) for obj in object_list],
+            page=commons.page,
+            limit=commons.limit,
+        )
+
+    return await wallet_cache.response(request, request.app.cache_redis, user_id=user.id, render=render)
 
 
 @api.post('/create/', name='wallet-create', response_model=WalletVisible, status_code=status.HTTP_201_CREATED)
 async def create_wallet(
+        request: Request,
         obj_in: WalletCreate,
         user: User = Depends(get_current_user),
         async_db: AsyncSession = Depends(get_async_db),
@@ -52,13 +60,20 @@ async def create_wallet(
             [ErrorWrapper(ValueError(_('Currency wallet already exist')), ("body", 'currency',))])
 
     wallet = await wallet_repo.create(async_db, obj_in=params)
+    await wallet_cache.ainvalidate(request.app.cache_redis, (user.id,))
     return wallet
 
 
 @api.get('/{obj_id}/detail/', name='wallet-detail', response_model=WalletVisible)
 async def get_single_wallet(
+        request: Request,
         obj_id: UUID,
         async_db: AsyncSession = Depends(get_async_db),
         user: User = Depends(get_current_user),
-) -> Wallet:
-    return await wallet_repo.get_by_params(async_db, params={'id': obj_id, 'user_id': user.id})
+) -> Response:
+    async def render() -> Versioned:
+        wallet = await wallet_repo.get_by_params(async_db, params={'id': obj_id, 'user_id': user.id})
+        # The cached entry keeps the version, conditional polls get 304 without a query
+        return Versioned(WalletVisible.from_orm(wallet), wallet.id, wallet.updated_at or wallet.created_at)
+
+    return await wallet_cache.response(request, request.app.cache_redis, user_id=user.id, render=render)
@@ -0,0 +1,5 @@
+from app.conf.config import settings
+from app.core.cache import ResponseCache
+
+# Wallet list and detail of a user, dropped when a wallet is created or a transaction of it completes
+wallet_cache = ResponseCache('cache:wallet', ttl=settings.WALLET_CACHE_TTL)
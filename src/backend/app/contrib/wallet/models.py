@@ -6,7 +6,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 
 from app.utils.prices import Money
 from app.conf.config import settings
-from app.db.models import UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base
+from app.db.models import UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base, metadata_indexes
 
 
 class Wallet(UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, Base):
@@ -26,6 +26,7 @@ class Wallet(UUIDMixin, CreationModificationDateMixin, ModelWithMetadataMixin, B
     user = relationship('User', lazy='noload')
     __table_args__ = (
         sa.UniqueConstraint('user_id', 'currency', name='ux_user_id_currency'),
+        *metadata_indexes('wallet'),
     )
 
     @hybrid_property
@@ -1,13 +1,13 @@
-from app.db.repository import CRUDBase, CRUDBaseSync
+from app.db.repository import CRUDWithMetadataBase, CRUDWithMetadataBaseSync
 
 from .models import Wallet
 
 
-class CRUDWalletSync(CRUDBaseSync[Wallet]):
+class CRUDWalletSync(CRUDWithMetadataBaseSync[Wallet]):
     pass
 
 
-class CRUDWallet(CRUDBase[Wallet]):
+class CRUDWallet(CRUDWithMetadataBase[Wallet]):
     pass
 
 
@@ -4,11 +4,15 @@ from fastapi import FastAPI as BaseFastAPI
 
 class FastAPI(BaseFastAPI):
     aioredis_instance: AIORedis
+    # Returns bytes, for the response cache
+    cache_redis: AIORedis
 
     async def configure(
             self,
 
             aioredis_instance: AIORedis,
+            cache_redis: AIORedis,
 
     ):
         self.aioredis_instance = aioredis_instance
+        self.cache_redis = cache_redis
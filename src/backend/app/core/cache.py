@@ -0,0 +1,214 @@
+"""
+Redis cache of serialized responses, per user.
+
+Entries of a user live in one hash, `<namespace>:<user_id>`, keyed by the
+route and query, each value holds the ETag, Last-Modified and orjson body. A
+counter `<namespace>:<user_id>:gen` is bumped on invalidation together with
+deleting the hash. An entry is only stored while the counter still has the
+value read before the response was computed, so a response built from data
+older than the last invalidation is never cached.
+"""
+import hashlib
+import logging
+import typing as t
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+import orjson
+from aioredis.exceptions import RedisError as AIORedisError
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.metrics import observe_cache
+
+if t.TYPE_CHECKING:
+    from aioredis import Redis as AIORedis
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_ERRORS = (RedisError, AIORedisError, OSError)
+# Store only if the generation did not change since the lookup
+STORE_SCRIPT = '''
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+'''
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def version_etag(obj_id: t.Any, updated_at: datetime) -> str:
+    """Strong ETag of an object version, known without rendering the object"""
+    return make_etag(f'{obj_id}:{updated_at.isoformat()}'.encode())
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: t.Optional[str] = None) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when there is none
+    :param request:
+    :param etag:
+    :param last_modified: HTTP date
+    :return:
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison, as for GET requests
+        return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional_response(
+        request: Request,
+        body: t.Optional[bytes],
+        etag: str,
+        last_modified: t.Optional[str] = None,
+) -> Response:
+    """
+    304 when the client has this version, JSON `body` otherwise. `body` may be
+    None only when the version is known to match.
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = last_modified
+    if body is None or is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def not_modified_response(
+        request: Request, obj_id: t.Any, updated_at: datetime,
+) -> t.Optional[Response]:
+    """
+    304 response when the request is conditional and matches the version,
+    checked before the object is loaded and rendered
+    """
+    if not (request.headers.get('if-none-match') or request.headers.get('if-modified-since')):
+        return None
+    etag, last_modified = version_etag(obj_id, updated_at), http_date(updated_at)
+    if is_not_modified(request, etag, last_modified):
+        return conditional_response(request, None, etag, last_modified)
+    return None
+
+
+@dataclass
+class Versioned:
+    """Rendered content with the version it was rendered from"""
+    content: t.Any
+    obj_id: t.Any
+    updated_at: datetime
+
+
+@dataclass
+class ResponseCache:
+    namespace: str
+    ttl: int = 300
+
+    def _keys(self, user_id) -> t.Tuple[str, str]:
+        key = f'{self.namespace}:{user_id}'
+        return key, f'{key}:gen'
+
+    @staticmethod
+    def _field(request: Request) -> str:
+        query = '&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))
+        return f'{request.url.path}?{query}'
+
+    async def response(
+            self,
+            request: Request,
+            redis: "AIORedis",
+            *,
+            user_id,
+            render: t.Callable[[], t.Awaitable[t.Any]],
+    ) -> Response:
+        """
+        Cached response of the request, `render` builds the content on a
+        miss. Redis errors fall back to rendering.
+        :param request:
+        :param redis: async client without decoded responses
+        :param user_id:
+        :param render: returns the response content, a pydantic model or plain
+            data, wrapped in `Versioned` for an ETag of the object version
+        :return:
+        """
+        key, generation_key = self._keys(user_id)
+        field = self._field(request)
+        generation = None
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                generation, cached = await pipe.get(generation_key).hget(key, field).execute()
+        except CACHE_ERRORS as e:
+            logger.warning('Response cache lookup failed: %s', e)
+            cached = None
+        entry = cached.split(b'\n', 2) if cached is not None else ()
+        # Entries in another layout are treated as misses and replaced
+        observe_cache(self.namespace, len(entry) == 3)
+        if len(entry) == 3:
+            etag, last_modified, body = entry
+            return conditional_response(request, body, etag.decode(), last_modified.decode() or None)
+
+        rendered = await render()
+        if isinstance(rendered, Versioned):
+            body = orjson.dumps(jsonable_encoder(rendered.content))
+            etag, last_modified = version_etag(rendered.obj_id, rendered.updated_at), http_date(rendered.updated_at)
+        else:
+            body = orjson.dumps(jsonable_encoder(rendered))
+            etag, last_modified = make_etag(body), ''
+        try:
+            await redis.eval(
+                STORE_SCRIPT, 2, key, generation_key,
+                generation or b'0', field, b'\n'.join((etag.encode(), last_modified.encode(), body)), self.ttl,
+            )
+        except CACHE_ERRORS as e:
+            logger.warning('Response cache store failed: %s', e)
+        return conditional_response(request, body, etag, last_modified or None)
+
+    def invalidate(self, redis: "Redis", user_ids: t.Iterable[t.Any]) -> None:
+        """
+        Drop cached responses of the users, call after the commit
+        :param redis: sync client
+        :param user_ids:
+        :return:
+        """
+        try:
+            with redis.pipeline(transaction=True) as pipe:
+                self._invalidate(pipe, user_ids)
+                pipe.execute()
+        except CACHE_ERRORS as e:
+            logger.warning('Response cache invalidation failed: %s', e)
+
+    async def ainvalidate(self, redis: "AIORedis", user_ids: t.Iterable[t.Any]) -> None:
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                self._invalidate(pipe, user_ids)
+                await pipe.execute()
+        except CACHE_ERRORS as e:
+            logger.warning('Response cache invalidation failed: %s', e)
+
+    def _invalidate(self, pipe, user_ids: t.Iterable[t.Any]) -> None:
+        for user_id in {user_id for user_id in user_ids if user_id}:
+            key, generation_key = self._keys(user_id)
+            pipe.incr(generation_key)
+            # Outlives the entries, so a late store still sees the new generation
+            pipe.expire(generation_key, self.ttl * 2)
+            pipe.delete(key)
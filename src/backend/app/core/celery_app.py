@@ -1,5 +1,12 @@
+import os
+
+from redis import Redis
 from celery import Celery, Task
+from celery.schedules import crontab
+from celery.signals import celeryd_init, worker_process_shutdown
 from app.conf.config import settings
+from app.core.metrics import connect_task_metrics, mark_process_dead, start_worker_exporter
+from app.core.tracing import init_sentry
 from app.db.session import SessionLocal
 
 celery_app = Celery("worker", broker=settings.REDIS_URL)
@@ -8,9 +15,40 @@ celery_app.autodiscover_tasks([
     'app.contrib.transaction.tasks',
 ])
 
+celery_app.conf.beat_schedule = {
+    # Monthly partitions of the transaction table are created ahead of time
+    'transaction-ensure-partitions': {
+        'task': 'app.contrib.transaction.tasks.transaction_ensure_partitions_task',
+        'schedule': crontab(hour=0, minute=15),
+    },
+}
+
+
+if settings.METRICS_ENABLED:
+    connect_task_metrics()
+
+
+@celeryd_init.connect
+def init_worker(**kwargs):
+    init_sentry()
+    if settings.METRICS_ENABLED and settings.METRICS_WORKER_PORT:
+        start_worker_exporter(settings.METRICS_WORKER_PORT)
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    mark_process_dead(os.getpid())
+
 
 class DatabaseTask(Task):
     # _session = None
+    _redis = None
+
+    @property
+    def redis(self) -> Redis:
+        if DatabaseTask._redis is None:
+            DatabaseTask._redis = Redis.from_url(settings.REDIS_URL)
+        return DatabaseTask._redis
 
     @staticmethod
     def get_session():
@@ -0,0 +1,229 @@
+"""
+Response compression negotiated by Accept-Encoding.
+
+zstd and br are used when `zstandard` and `brotli` are installed (the
+compression extra), gzip always. On-the-fly compression uses fast levels,
+pre-compressed static files (see app.core.staticfiles) the highest ones.
+Bodies under `COMPRESSION_MINIMUM_SIZE` are sent as they are, since the
+framing costs more than it saves there.
+"""
+import typing as t
+import zlib
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.conf.config import settings, structure_settings
+
+COMPRESSIBLE_TYPES = frozenset((
+    'application/json',
+    'application/javascript',
+    'application/manifest+json',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+    'image/vnd.microsoft.icon',
+    'image/x-icon',
+))
+
+
+class Compressor(t.Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # wbits 31 writes the gzip header and trailer
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        import brotli
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        import zstandard
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+@dataclass(frozen=True)
+class Encoding:
+    name: str
+    # Suffix of pre-compressed files
+    suffix: str
+    compressor: t.Callable[[int], Compressor]
+    level: int
+    max_level: int
+
+    def compress(self, data: bytes, level: t.Optional[int] = None) -> bytes:
+        compressor = self.compressor(self.level if level is None else level)
+        return compressor.compress(data) + compressor.finish()
+
+
+def _is_installed(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+ENCODINGS: t.Dict[str, Encoding] = {
+    encoding.name: encoding for encoding, module in (
+        (Encoding('zstd', '.zst', ZstdCompressor, level=3, max_level=19), 'zstandard'),
+        (Encoding('br', '.br', BrotliCompressor, level=4, max_level=11), 'brotli'),
+        (Encoding('gzip', '.gz', GzipCompressor, level=6, max_level=9), 'zlib'),
+    ) if _is_installed(module)
+}
+
+
+def get_encodings(names: t.Iterable[str]) -> t.List[Encoding]:
+    """Installed encodings of `names`, in that order"""
+    return [ENCODINGS[name] for name in names if name in ENCODINGS]
+
+
+def negotiate(accept_encoding: str, encodings: t.Sequence[Encoding]) -> t.Optional[Encoding]:
+    """
+    Encoding with the highest q-value in Accept-Encoding, ties go to the
+    earlier of `encodings`
+    :param accept_encoding:
+    :param encodings: in preference order
+    :return: None for identity
+    """
+    weights: t.Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    default = weights.get('*', 0.0)
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding.name, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(';')[0].strip().lower()
+    if media_type == 'text/event-stream':
+        # Events must reach the client as they are sent
+        return False
+    return (
+        media_type.startswith('text/')
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(('+json', '+xml'))
+    )
+
+
+@dataclass
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware which compresses responses with the encoding the
+    client prefers. Static files are served pre-compressed by their mount
+    and are skipped.
+    """
+    app: ASGIApp
+    minimum_size: int = field(default_factory=lambda: settings.COMPRESSION_MINIMUM_SIZE)
+    encodings: t.Sequence[str] = field(default_factory=lambda: settings.COMPRESSION_ENCODINGS)
+    exclude_paths: t.Sequence[str] = field(default_factory=lambda: [structure_settings.STATIC_URL])
+
+    def __post_init__(self):
+        self._encodings = get_encodings(self.encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'].startswith(tuple(self.exclude_paths)):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''), self._encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: t.Optional[Message] = None
+        compressor: t.Optional[Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message['headers'])
+                if (
+                        start_message['status'] in (204, 206, 304)
+                        or 'content-encoding' in headers
+                        or not is_compressible(headers.get('content-type', ''))
+                        or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = encoding.compressor(encoding.level)
+                headers['Content-Encoding'] = encoding.name
+                headers.add_vary_header('Accept-Encoding')
+                etag = headers.get('etag')
+                if etag and not etag.startswith('W/'):
+                    # The encoded bytes differ, the version stays the same
+                    headers['ETag'] = f'W/{etag}'
+                if more_body:
+                    del headers['content-length']
+                    await send(start_message)
+                else:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers['Content-Length'] = str(len(body))
+                    await send(start_message)
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+
+            body = compressor.compress(body)
+            if not more_body:
+                body += compressor.finish()
+            if body or not more_body:
+                await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,15 +1,42 @@
 import enum
+import typing as t
+
+from app.utils.translation import get_locale_code, override_locale
 
 __all__ = {
     'Choices',
     'IntegerChoices',
     'TextChoices',
+    'render_choices_labels',
 }
 
 
 class ChoicesMeta(enum.EnumMeta):
     """A metaclass for creating a enum choices."""
 
+    registry: t.List['ChoicesMeta'] = []
+
+    def __new__(metacls, *args, **kwargs):
+        cls = super().__new__(metacls, *args, **kwargs)
+        # Rendered labels, locale code => {member: label}
+        cls._label_tables = {}
+        ChoicesMeta.registry.append(cls)
+        return cls
+
+    def render_labels(cls, locale_code: str) -> t.Dict[enum.Enum, str]:
+        """Render labels of every member, the locale must be active"""
+        table = {member: str(getattr(member, 'label', member.value)) for member in cls}
+        cls._label_tables[locale_code] = table
+        return table
+
+    def get_label(cls, member: enum.Enum) -> str:
+        """Return the member label in the active locale from the rendered table"""
+        locale_code = get_locale_code()
+        table = cls._label_tables.get(locale_code)
+        if table is None:
+            table = cls.render_labels(locale_code)
+        return table[member]
+
     def __contains__(cls, member):
         if not isinstance(member, enum.Enum):
             # Allow non-enums to match against member values.
@@ -60,3 +87,17 @@ class IntegerChoices(int, Choices):
 
     def __str__(self):
         return str(self.value)
+
+
+def render_choices_labels(locale_codes: t.Iterable[str]) -> None:
+    """
+    Pre-render labels of all choices for the given locales
+    :param locale_codes:
+    :return:
+    """
+    for cls in ChoicesMeta.registry:
+        cls._label_tables = {}
+    for locale_code in locale_codes:
+        with override_locale(locale_code):
+            for cls in ChoicesMeta.registry:
+                cls.render_labels(locale_code)
@@ -67,3 +67,16 @@ class DoesNotExist(HTTPException):
         if detail is None:
             detail = _('Requested page does not exist')
         super().__init__(detail=detail, status_code=status.HTTP_404_NOT_FOUND, *args, **kwargs)
+
+
+class TooManyRequests(HTTPException):
+    def __init__(
+            self,
+            retry_after: int,
+            detail: Optional[str] = None,
+    ) -> None:
+        if detail is None:
+            detail = _('Too many requests, try again later')
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail, headers={'Retry-After': str(retry_after)},
+        )
@@ -0,0 +1,182 @@
+"""
+Prometheus metrics of the API and the Celery worker.
+
+With `PROMETHEUS_MULTIPROC_DIR` set, every process writes its samples to
+that directory and a scrape aggregates all of them, so `/metrics` reports
+all gunicorn workers and the worker exporter all prefork children. The
+directory has to be empty when the server starts, see `gunicorn_conf` and
+`scripts/worker-start.sh`.
+"""
+import os
+import time
+import typing as t
+from dataclasses import dataclass
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ('method', 'route', 'status'),
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Open connections of the engine pools by state',
+    ('engine', 'state'), multiprocess_mode='livesum',
+)
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds', 'Task runtime', ('task', 'state'),
+    buckets=(.01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+TASK_QUEUE_LAG = Histogram(
+    'celery_task_queue_lag_seconds', 'Time between publishing and starting a task', ('task',),
+    buckets=(.01, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by result, hit ratio is hit / all', ('cache', 'result'),
+)
+TRANSACTION_STATUS_TRANSITIONS = Counter(
+    'transaction_status_transitions_total', 'Transaction status changes',
+    ('from_status', 'to_status'),
+)
+
+# Header added to task messages on publish, read back to measure queue lag
+PUBLISHED_AT_HEADER = 'published_at'
+
+
+def get_registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics(request: Request) -> Response:
+    return Response(generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def observe_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_transaction_status(from_status: str, to_status: str) -> None:
+    if from_status != to_status:
+        TRANSACTION_STATUS_TRANSITIONS.labels(str(from_status), str(to_status)).inc()
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Track pool connections of the engine, pass `sync_engine` of async engines
+    :param engine:
+    :param name:
+    :return:
+    """
+    opened = DB_POOL_CONNECTIONS.labels(name, 'open')
+    checked_out = DB_POOL_CONNECTIONS.labels(name, 'checked_out')
+
+    event.listen(engine.pool, 'connect', lambda *args: opened.inc())
+    event.listen(engine.pool, 'close', lambda *args: opened.dec())
+    event.listen(engine.pool, 'close_detached', lambda *args: opened.dec())
+    event.listen(engine.pool, 'checkout', lambda *args: checked_out.inc())
+    event.listen(engine.pool, 'checkin', lambda *args: checked_out.dec())
+
+
+@dataclass
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware which observes request latency labelled by the
+    route path, so requests to `/transaction/{obj_id}/` share one series.
+    """
+    app: ASGIApp
+
+    def __post_init__(self):
+        self._route_paths: t.Dict[t.Callable, str] = {}
+
+    def get_route_path(self, scope: Scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        try:
+            return self._route_paths[endpoint]
+        except KeyError:
+            pass
+        path = 'unmatched'
+        for route in scope['app'].router.routes:
+            if getattr(route, 'endpoint', None) is endpoint:
+                path = route.path
+                break
+        self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.labels(
+                scope['method'], self.get_route_path(scope), str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+def connect_task_metrics() -> None:
+    """Observe runtime and queue lag of every task through Celery signals"""
+    from celery.signals import before_task_publish, task_postrun, task_prerun
+
+    started: t.Dict[str, float] = {}
+
+    @before_task_publish.connect(weak=False)
+    def add_published_at(headers=None, **kwargs):
+        if headers is not None:
+            headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+    @task_prerun.connect(weak=False)
+    def start_timer(task_id=None, task=None, **kwargs):
+        started[task_id] = time.perf_counter()
+        published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+        if published_at is not None:
+            TASK_QUEUE_LAG.labels(task.name).observe(max(time.time() - float(published_at), 0))
+
+    @task_postrun.connect(weak=False)
+    def stop_timer(task_id=None, task=None, state=None, **kwargs):
+        started_at = started.pop(task_id, None)
+        if started_at is not None:
+            TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started_at)
+
+
+def start_worker_exporter(port: int) -> None:
+    """Serve metrics of the worker and its pool processes on `port`"""
+    start_http_server(port, registry=get_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
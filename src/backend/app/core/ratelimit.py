@@ -0,0 +1,167 @@
+"""
+Token bucket rate limiting in Redis.
+
+A bucket holds up to `count` tokens of a rate like `10/minute` and refills
+at `count` per period, a request takes one. The bucket of a rule and
+client, `ratelimit:<rule>:<key>`, is updated by one Lua script on the
+Redis clock, so all workers share it.
+
+While Redis reports plenty of tokens, a worker spends a share of them
+locally (`RATE_LIMIT_LOCAL_SHARE` of the remaining tokens, for at most
+`RATE_LIMIT_LOCAL_TTL` seconds) and charges them with its next call to
+Redis. A client far under its limit costs a round trip only now and then,
+near the limit every request goes to Redis. With N workers a client can
+exceed its limit by at most N local shares.
+
+Redis errors let requests through.
+"""
+import logging
+import math
+import time
+import typing as t
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.conf.config import settings
+from app.core.cache import CACHE_ERRORS
+from app.core.exceptions import ImproperlyConfigured
+
+if t.TYPE_CHECKING:
+    from aioredis import Redis as AIORedis
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+# Charges the tokens spent locally, then takes `cost` if there are enough
+TOKEN_BUCKET_SCRIPT = '''
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local debt = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - debt
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1000)
+return {allowed, math.floor(math.max(tokens, 0)), retry_after}
+'''
+
+
+@dataclass(frozen=True)
+class Rate:
+    count: int
+    period: int  # Seconds
+
+    @property
+    def per_ms(self) -> float:
+        return self.count / (self.period * 1000)
+
+
+@lru_cache(maxsize=None)
+def parse_rate(value: str) -> Rate:
+    """`10/minute`, `100/hours` and the like"""
+    count, _, period = value.partition('/')
+    try:
+        rate = Rate(count=int(count), period=PERIODS[period.strip().lower().removesuffix('s')])
+    except (KeyError, ValueError):
+        raise ImproperlyConfigured(f'Invalid rate {value!r}, expected <count>/<second|minute|hour|day>')
+    if rate.count < 1:
+        raise ImproperlyConfigured(f'Invalid rate {value!r}, the count must be positive')
+    return rate
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    remaining: int
+    # Seconds until the request would be allowed
+    retry_after: int = 0
+
+
+@dataclass
+class LocalAllowance:
+    budget: int
+    pending: int
+    expires: float
+
+
+class RateLimiter:
+    def __init__(
+            self,
+            prefix: str = 'ratelimit',
+            local_share: float = 0.1,
+            local_ttl: float = 1.0,
+            max_local_entries: int = 10000,
+            enabled: bool = True,
+    ):
+        self.prefix = prefix
+        self.local_share = local_share
+        self.local_ttl = local_ttl
+        self.max_local_entries = max_local_entries
+        self.enabled = enabled
+        self._local: t.Dict[str, LocalAllowance] = {}
+
+    async def hit(self, redis: "AIORedis", rule: str, key: str, rate: Rate, cost: int = 1) -> Decision:
+        """
+        Take `cost` tokens from the bucket of the client
+        :param redis:
+        :param rule: limit name
+        :param key: client, like `user:<id>` or `ip:<address>`
+        :param rate:
+        :param cost:
+        :return:
+        """
+        bucket_key = f'{self.prefix}:{rule}:{key}'
+        now = time.monotonic()
+        local = self._local.get(bucket_key)
+        if local is not None and local.expires > now and local.budget >= cost:
+            local.budget -= cost
+            local.pending += cost
+            return Decision(allowed=True, remaining=local.budget)
+
+        debt = 0
+        if local is not None:
+            # Taken now, so concurrent requests of the client do not charge it twice
+            debt, local.pending, local.budget = local.pending, 0, 0
+        try:
+            allowed, remaining, retry_after = await redis.eval(
+                TOKEN_BUCKET_SCRIPT, 1, bucket_key, rate.count, rate.per_ms, cost, debt,
+            )
+        except CACHE_ERRORS as e:
+            logger.warning('Rate limit check failed: %s', e)
+            if local is not None:
+                local.pending += debt
+            return Decision(allowed=True, remaining=rate.count)
+
+        if len(self._local) >= self.max_local_entries:
+            self._prune(now)
+        self._local[bucket_key] = LocalAllowance(
+            budget=math.floor(int(remaining) * self.local_share) if allowed else 0,
+            pending=0,
+            expires=now + self.local_ttl,
+        )
+        return Decision(
+            allowed=bool(allowed), remaining=int(remaining), retry_after=math.ceil(int(retry_after) / 1000),
+        )
+
+    def _prune(self, now: float) -> None:
+        for bucket_key in [k for k, local in self._local.items() if local.expires <= now]:
+            del self._local[bucket_key]
+
+
+rate_limiter = RateLimiter(
+    local_share=settings.RATE_LIMIT_LOCAL_SHARE,
+    local_ttl=settings.RATE_LIMIT_LOCAL_TTL,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -10,6 +10,13 @@ from .enums import Choices
 DataType = TypeVar("DataType")
 
 
+def encode_choice(x: Choices) -> dict:
+    return {
+        'value': x.value,
+        'label': type(x).get_label(x),
+    }
+
+
 class IResponseBase(GenericModel, Generic[DataType]):
     message: Optional[str] = None
     errors: Optional[Any] = None
@@ -17,10 +24,7 @@ class IResponseBase(GenericModel, Generic[DataType]):
 
     class Config:
         json_encoders = {
-            Choices: lambda x: {
-                'value': x.value,
-                'label': str(x.label),
-            }
+            Choices: encode_choice,
         }
 
 
@@ -38,10 +42,7 @@ class IPaginationBase(GenericModel, Generic[DataType]):
 
     class Config:
         json_encoders = {
-            Choices: lambda x: {
-                'value': x.value,
-                'label': str(x.label),
-            }
+            Choices: encode_choice,
         }
 
 
@@ -0,0 +1,121 @@
+"""
+Static files served pre-compressed.
+
+    python -m app.core.staticfiles
+    python -m app.core.staticfiles --dir static --force
+
+The command writes `.zst`, `.br` and `.gz` siblings of compressible files
+at the highest levels, the image build runs it after copying the files.
+It needs no environment settings. A sibling is kept only when it is
+smaller than the file. The mount serves the sibling the client accepts
+while it is not older than the file.
+"""
+import argparse
+import mimetypes
+import os
+import typing as t
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.conf.config import settings, structure_settings
+from app.core.compression import ENCODINGS, Encoding, get_encodings, is_compressible, negotiate
+
+# Compressed once, so smaller files than on the fly are worth it
+PRECOMPRESS_MINIMUM_SIZE = 256
+
+
+def compressed_variants(path: str, encodings: t.Sequence[Encoding]) -> t.List[t.Tuple[Encoding, str, os.stat_result]]:
+    """Up-to-date pre-compressed siblings of the file"""
+    mtime = os.stat(path).st_mtime
+    variants = []
+    for encoding in encodings:
+        try:
+            stat_result = os.stat(path + encoding.suffix)
+        except FileNotFoundError:
+            continue
+        if stat_result.st_mtime >= mtime:
+            variants.append((encoding, path + encoding.suffix, stat_result))
+    return variants
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, encodings: t.Sequence[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encodings = get_encodings(encodings or settings.COMPRESSION_ENCODINGS)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+
+        variants = await run_in_threadpool(compressed_variants, response.path, self.encodings)
+        if not variants:
+            return response
+        response.headers.add_vary_header('Accept-Encoding')
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get('accept-encoding', ''), [variant[0] for variant in variants])
+        if encoding is None:
+            return response
+
+        _, compressed_path, stat_result = next(variant for variant in variants if variant[0] is encoding)
+        compressed = FileResponse(
+            compressed_path, stat_result=stat_result, media_type=response.media_type,
+            headers={'Content-Encoding': encoding.name, 'Vary': 'Accept-Encoding'},
+        )
+        if self.is_not_modified(compressed.headers, request_headers):
+            return NotModifiedResponse(compressed.headers)
+        return compressed
+
+
+def precompress(directory: Path, minimum_size: int, force: bool = False) -> t.Iterator[t.Tuple[Path, Encoding, int]]:
+    """
+    Write compressed siblings of the compressible files in `directory`
+    :param directory:
+    :param minimum_size: smaller files are skipped
+    :param force: rewrite siblings which are up to date
+    :return: written files with the encoding and compressed size
+    """
+    suffixes = {encoding.suffix for encoding in ENCODINGS.values()}
+    for path in sorted(directory.rglob('*')):
+        if not path.is_file() or path.suffix in suffixes:
+            continue
+        content_type, _ = mimetypes.guess_type(path.name)
+        stat_result = path.stat()
+        if not content_type or not is_compressible(content_type) or stat_result.st_size < minimum_size:
+            continue
+        data = None
+        for encoding in ENCODINGS.values():
+            target = path.with_name(path.name + encoding.suffix)
+            if not force and target.exists() and target.stat().st_mtime >= stat_result.st_mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            compressed = encoding.compress(data, level=encoding.max_level)
+            if len(compressed) >= len(data):
+                target.unlink(missing_ok=True)
+                continue
+            target.write_bytes(compressed)
+            yield path, encoding, len(compressed)
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=structure_settings.STATIC_DIR)
+    parser.add_argument('--minimum-size', type=int, default=PRECOMPRESS_MINIMUM_SIZE)
+    parser.add_argument('--force', action='store_true', help='rewrite up-to-date files')
+    args = parser.parse_args(argv)
+
+    count = 0
+    for path, encoding, size in precompress(Path(args.dir), args.minimum_size, force=args.force):
+        print(f'{path}{encoding.suffix}: {path.stat().st_size} -> {size}')
+        count += 1
+    print(f'{count} files written, encodings: {", ".join(ENCODINGS)}')
+
+
+if __name__ == '__main__':
+    main()
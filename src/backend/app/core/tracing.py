@@ -0,0 +1,151 @@
+"""
+Sentry setup shared by the API and the Celery worker.
+
+Transactions are sampled by `traces_sampler` instead of a flat rate:
+
+* a sampling decision made upstream is kept, so a request and the
+  transaction tasks it enqueues end up in one trace
+* metrics, favicon and static paths are never traced
+* routes which recently answered with a server error or slower than
+  `SENTRY_SLOW_REQUEST_THRESHOLD` are sampled at the error / slow rates
+* everything else uses `SENTRY_TRACES_SAMPLE_RATE`, tasks started
+  outside of a request use `SENTRY_TASK_TRACES_SAMPLE_RATE`
+
+Whether a request is slow or fails is only known after it finished, so
+`TracingMiddleware` marks such routes and the following requests to them
+are sampled at the higher rate for `SENTRY_OUTLIER_TTL` seconds.
+"""
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+import sentry_sdk
+from sentry_sdk.integrations.celery import CeleryIntegration
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.conf.config import settings
+
+ERROR = 'error'
+SLOW = 'slow'
+
+
+class OutlierRoutes:
+    """Routes which recently answered slowly or with a server error"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # Routes define `__eq__` and are not hashable, they are keyed by id
+        self._routes: t.Dict[int, t.Tuple[BaseRoute, float, str]] = {}
+
+    def mark(self, route: BaseRoute, reason: str) -> None:
+        previous = self._routes.get(id(route))
+        if previous is not None and previous[2] == ERROR and reason == SLOW:
+            reason = ERROR
+        self._routes[id(route)] = (route, time.monotonic() + self.ttl, reason)
+
+    def match(self, scope: Scope) -> t.Optional[str]:
+        """Return the reason the route of `scope` is marked for, if any"""
+        if not self._routes:
+            return None
+        now = time.monotonic()
+        for key, (route, expires_at, reason) in list(self._routes.items()):
+            if expires_at < now:
+                self._routes.pop(key, None)
+            elif route.matches(scope)[0] == Match.FULL:
+                return reason
+        return None
+
+
+outlier_routes = OutlierRoutes(ttl=settings.SENTRY_OUTLIER_TTL)
+
+
+def get_route(scope: Scope) -> t.Optional[BaseRoute]:
+    endpoint = scope.get('endpoint')
+    app = scope.get('app')
+    if endpoint is None or app is None:
+        return None
+    for route in app.router.routes:
+        if getattr(route, 'endpoint', None) is endpoint:
+            return route
+    return None
+
+
+@dataclass
+class TracingMiddleware:
+    """
+    Pure ASGI middleware which marks routes of failed and slow requests in
+    `outlier_routes`. It only measures, so it is cheap enough for every request.
+    """
+    app: ASGIApp
+    slow_threshold: float = settings.SENTRY_SLOW_REQUEST_THRESHOLD
+    routes: OutlierRoutes = field(default=outlier_routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                # Event streams are long-lived by design, not slow
+                streaming = any(
+                    name == b'content-type' and value.startswith(b'text/event-stream')
+                    for name, value in message.get('headers', ())
+                )
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            if status_code >= 500 or (duration >= self.slow_threshold and not streaming):
+                route = get_route(scope)
+                if route is not None:
+                    self.routes.mark(route, ERROR if status_code >= 500 else SLOW)
+
+
+def is_ignored_path(path: str) -> bool:
+    return any(path.startswith(prefix) for prefix in settings.SENTRY_TRACES_IGNORED_PATHS)
+
+
+def traces_sampler(sampling_context: dict) -> float:
+    parent_sampled = sampling_context.get('parent_sampled')
+    if parent_sampled is not None:
+        return float(parent_sampled)
+
+    scope = sampling_context.get('asgi_scope')
+    if scope is not None:
+        if scope.get('type') != 'http' or is_ignored_path(scope.get('path', '')):
+            return 0.0
+        reason = outlier_routes.match(scope)
+        if reason == ERROR:
+            return settings.SENTRY_ERROR_TRACES_SAMPLE_RATE
+        if reason == SLOW:
+            return settings.SENTRY_SLOW_TRACES_SAMPLE_RATE
+        return settings.SENTRY_TRACES_SAMPLE_RATE
+
+    if 'celery_job' in sampling_context:
+        return settings.SENTRY_TASK_TRACES_SAMPLE_RATE
+    return settings.SENTRY_TRACES_SAMPLE_RATE
+
+
+def init_sentry() -> None:
+    """Initialize Sentry, a no-op without `SENTRY_DSN`"""
+    if not settings.SENTRY_DSN:
+        return
+    sentry_sdk.init(
+        dsn=settings.SENTRY_DSN,
+        environment=settings.SENTRY_ENVIRONMENT,
+        release=settings.VERSION,
+        traces_sampler=traces_sampler,
+        # Trace headers are added to the task messages, so the worker
+        # continues the trace of the request which enqueued the task
+        integrations=[CeleryIntegration(propagate_traces=True)],
+    )
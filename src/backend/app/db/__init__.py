@@ -2,4 +2,4 @@ from .models import PlainBase
 
 from app.contrib.account.models import User
 from app.contrib.wallet.models import Wallet
-from app.contrib.transaction.models import Transaction
+from app.contrib.transaction.models import Transaction, TransactionSummary
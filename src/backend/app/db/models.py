@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Tuple
 
 import sqlalchemy as sa
 import re
@@ -6,13 +6,16 @@ import re
 from uuid import uuid4
 from sqlalchemy.orm import declarative_mixin
 from sqlalchemy.ext.declarative import declared_attr, declarative_base
+from sqlalchemy.ext.mutable import MutableDict
 
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.hybrid import hybrid_method
 
 PlainBase = declarative_base()
 
+TABLE_NAME_PATTERN = re.compile(r'(?<!^)(?=[A-Z])')
+
 
 class Base(PlainBase):
     __name__: str
@@ -23,8 +26,7 @@ class Base(PlainBase):
     # Generate __tablename__ automatically
     @declared_attr
     def __tablename__(cls) -> str:
-        pattern = re.compile(r'(?<!^)(?=[A-Z])')
-        return pattern.sub('_', cls.__name__).lower()
+        return TABLE_NAME_PATTERN.sub('_', cls.__name__).lower()
 
 
 @declarative_mixin
@@ -38,10 +40,27 @@ class CreationModificationDateMixin:
     updated_at = sa.Column(sa.DateTime(timezone=True), onupdate=func.now(), )
 
 
+def metadata_indexes(table_name: str) -> Tuple[sa.Index, ...]:
+    """
+    GIN indexes serving containment (`@>`) lookups of the metadata columns,
+    add them to `__table_args__` of models queried by metadata
+    :param table_name:
+    :return:
+    """
+    return tuple(
+        sa.Index(
+            f'ix_{table_name}_{column}', column,
+            postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+        )
+        for column in ('private_metadata', 'public_metadata')
+    )
+
+
 @declarative_mixin
 class ModelWithMetadataMixin:
-    private_metadata = sa.Column(sa.JSON, default={}, nullable=False)
-    public_metadata = sa.Column(sa.JSON, default={}, nullable=False)
+    # Mutable, so the in-place changes below are flushed as well
+    private_metadata = sa.Column(MutableDict.as_mutable(JSONB), default={}, nullable=False)
+    public_metadata = sa.Column(MutableDict.as_mutable(JSONB), default={}, nullable=False)
 
     @hybrid_method
     def get_value_from_private_metadata(self, key: str, default: Any = None) -> Any:
@@ -0,0 +1,149 @@
+"""
+Per-request query statistics and slow-query logging.
+
+`instrument_queries` hooks the cursor events of an engine. Every executed
+statement is added to the `QueryStats` of the current context, which
+`QueryStatsMiddleware` sets per request and reports as a `Server-Timing`
+header and a log record. Statements slower than `SLOW_QUERY_THRESHOLD`
+are logged, a `SLOW_QUERY_EXPLAIN_RATE` share of them with their plan.
+"""
+import logging
+import random
+import time
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.conf.config import settings
+from app.utils.translation.context import ContextStorage
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'with')
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+class QueryStatsCtx(ContextStorage):
+    DEFAULT_VALUE = None
+    CONTEXT_KEY_NAME = "query_stats"
+
+
+_query_stats_ctx = QueryStatsCtx()
+
+
+def get_query_stats() -> t.Optional[QueryStats]:
+    return _query_stats_ctx.get()
+
+
+def explain(conn, statement: str, parameters) -> t.Optional[str]:
+    """
+    Return plan of the statement without executing it, on a new cursor so
+    the rows of the current one are left alone
+    :param conn:
+    :param statement:
+    :param parameters:
+    :return:
+    """
+    if not statement.lstrip()[:6].lower().startswith(EXPLAINABLE):
+        return None
+    explain_cursor = None
+    try:
+        explain_cursor = conn.connection.cursor()
+        # A failed EXPLAIN must not abort the transaction of the request
+        explain_cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            explain_cursor.execute(f'EXPLAIN {statement}', parameters)
+            plan = '\n'.join(str(row[0]) for row in explain_cursor.fetchall())
+        except Exception:
+            explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            raise
+        explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        return plan
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        if explain_cursor is not None:
+            explain_cursor.close()
+
+
+def instrument_queries(engine: Engine, name: str) -> None:
+    """
+    Count queries and log slow ones, pass `sync_engine` of async engines
+    :param engine:
+    :param name:
+    :return:
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_started_at'].pop()
+        stats = _query_stats_ctx.get()
+        if stats is not None:
+            stats.add(duration)
+        if duration < settings.SLOW_QUERY_THRESHOLD:
+            return
+
+        plan = None
+        if not executemany and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+            plan = explain(conn, statement, parameters)
+        logger.warning(
+            "Slow query on %s engine: %.1f ms", name, duration * 1000,
+            extra={'engine': name, 'duration_ms': duration * 1000, 'statement': statement, 'plan': plan},
+        )
+
+
+@dataclass
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware which collects query statistics of each request and
+    adds them to the response as `Server-Timing` header.
+    """
+    app: ASGIApp
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _query_stats_ctx.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start' and stats.count:
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _query_stats_ctx.reset(token)
+            if stats.count:
+                logger.debug(
+                    "%s %s: %d queries in %.1f ms", scope['method'], scope['path'], stats.count,
+                    stats.duration * 1000,
+                    extra={
+                        'method': scope['method'], 'path': scope['path'],
+                        'query_count': stats.count, 'query_duration_ms': stats.duration * 1000,
+                    },
+                )
@@ -1,10 +1,13 @@
 from typing import Generic, List, Optional, Type, TypeVar, Union, Any, Dict, TYPE_CHECKING, Iterable
 from uuid import UUID
-from sqlalchemy import func, text, select
+from sqlalchemy import func, text, select, update, literal, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.engine.row import Row
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql.dml import Update
 
 from app.core.exceptions import DoesNotExist
 from app.core.enums import Choices
@@ -396,3 +399,184 @@ class CRUDBase(Generic[ModelType]):
     async def execute_raw_sql(async_db: "AsyncSession", *, sql_text: str, params: Optional[dict]) -> List[Row]:
         query = text(sql_text)
         return await async_db.execute(query, params=params)
+
+
+class MetadataStatementsMixin(Generic[ModelType]):
+    """
+    Server-side queries of `ModelWithMetadataMixin` columns. The updates
+    run a single UPDATE, objects loaded before are not refreshed.
+    """
+    model: Type[ModelType]
+
+    def _metadata_column(self, private: bool) -> ColumnElement:
+        return self.model.private_metadata if private else self.model.public_metadata
+
+    def metadata_contains(self, items: dict, *, private: bool = False) -> ColumnElement:
+        """
+        Containment (`@>`) expression served by the GIN index of the column
+        :param items:
+        :param private:
+        :return:
+        """
+        return self._metadata_column(private).contains(items)
+
+    def _id_expressions(self, obj_id: Union[int, UUID]) -> tuple:
+        return self.model.id == obj_id,
+
+    def _update_metadata(self, obj_id: Union[int, UUID], private: bool, value: ColumnElement) -> Update:
+        column = self._metadata_column(private)
+        return update(self.model).where(*self._id_expressions(obj_id)).values(
+            {column: value}
+        ).execution_options(synchronize_session=False)
+
+    def _store_statement(self, obj_id: Union[int, UUID], items: dict, private: bool) -> Update:
+        column = self._metadata_column(private)
+        return self._update_metadata(obj_id, private, column.op('||')(literal(items, JSONB)))
+
+    def _set_statement(self, obj_id: Union[int, UUID], path: Iterable[str], value: Any, private: bool) -> Update:
+        column = self._metadata_column(private)
+        return self._update_metadata(obj_id, private, func.jsonb_set(
+            column, literal([str(key) for key in path], ARRAY(Text)), literal(value, JSONB), True,
+        ))
+
+    def _delete_statement(self, obj_id: Union[int, UUID], key: str, private: bool) -> Update:
+        column = self._metadata_column(private)
+        return self._update_metadata(obj_id, private, column.op('-')(literal(key, Text)))
+
+
+class CRUDWithMetadataBaseSync(MetadataStatementsMixin[ModelType], CRUDBaseSync[ModelType]):
+
+    def filter_by_metadata(
+            self,
+            db: "Session",
+            *,
+            items: dict,
+            private: bool = False,
+            expressions: Optional[Iterable] = (),
+            **kwargs,
+    ) -> List[ModelType]:
+        """
+        Retrieve items whose metadata contains all of `items`
+        :param db:
+        :param items:
+        :param private:
+        :param expressions:
+        :param kwargs: passed to get_all
+        :return:
+        """
+        return self.get_all(
+            db, expressions=(self.metadata_contains(items, private=private), *expressions), **kwargs,
+        )
+
+    def store_value_in_metadata(
+            self, db: "Session", *, obj_id: Union[int, UUID], items: dict, private: bool = False,
+    ) -> None:
+        """
+        Merge top level keys of `items` into the metadata
+        :param db:
+        :param obj_id:
+        :param items:
+        :param private:
+        :return:
+        """
+        db.execute(self._store_statement(obj_id, items, private))
+        db.commit()
+
+    def set_metadata_value(
+            self, db: "Session", *, obj_id: Union[int, UUID], path: Iterable[str], value: Any,
+            private: bool = False,
+    ) -> None:
+        """
+        Set value at the nested path of the metadata with `jsonb_set`
+        :param db:
+        :param obj_id:
+        :param path: keys from the top level down
+        :param value:
+        :param private:
+        :return:
+        """
+        db.execute(self._set_statement(obj_id, path, value, private))
+        db.commit()
+
+    def delete_value_from_metadata(
+            self, db: "Session", *, obj_id: Union[int, UUID], key: str, private: bool = False,
+    ) -> None:
+        """
+        Remove top level key from the metadata
+        :param db:
+        :param obj_id:
+        :param key:
+        :param private:
+        :return:
+        """
+        db.execute(self._delete_statement(obj_id, key, private))
+        db.commit()
+
+
+class CRUDWithMetadataBase(MetadataStatementsMixin[ModelType], CRUDBase[ModelType]):
+
+    async def filter_by_metadata(
+            self,
+            async_db: "AsyncSession",
+            *,
+            items: dict,
+            private: bool = False,
+            expressions: Optional[Iterable] = (),
+            **kwargs,
+    ) -> List[ModelType]:
+        """
+        Retrieve items whose metadata contains all of `items`
+        :param async_db:
+        :param items:
+        :param private:
+        :param expressions:
+        :param kwargs: passed to get_all
+        :return:
+        """
+        return await self.get_all(
+            async_db, expressions=(self.metadata_contains(items, private=private), *expressions), **kwargs,
+        )
+
+    async def store_value_in_metadata(
+            self, async_db: "AsyncSession", *, obj_id: Union[int, UUID], items: dict, private: bool = False,
+    ) -> None:
+        """
+        Merge top level keys of `items` into the metadata
+        :param async_db:
+        :param obj_id:
+        :param items:
+        :param private:
+        :return:
+        """
+        await async_db.execute(self._store_statement(obj_id, items, private))
+        await async_db.commit()
+
+    async def set_metadata_value(
+            self, async_db: "AsyncSession", *, obj_id: Union[int, UUID], path: Iterable[str], value: Any,
+            private: bool = False,
+    ) -> None:
+        """
+        Set value at the nested path of the metadata with `jsonb_set`
+        :param async_db:
+        :param obj_id:
+        :param path: keys from the top level down
+        :param value:
+        :param private:
+        :return:
+        """
+        await async_db.execute(self._set_statement(obj_id, path, value, private))
+        await async_db.commit()
+
+    async def delete_value_from_metadata(
+            self, async_db: "AsyncSession", *, obj_id: Union[int, UUID], key: str, private: bool = False,
+    ) -> None:
+        """
+        Remove top level key from the metadata
+        :param async_db:
+        :param obj_id:
+        :param key:
+        :param private:
+        :return:
+        """
+        await async_db.execute(self._delete_statement(obj_id, key, private))
+        await async_db.commit()
@@ -1,51 +1,105 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from functools import lru_cache
+from typing import Any, Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from app.conf.config import settings
+from app.core.metrics import instrument_engine
+from .profiling import instrument_queries
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, echo=False)
+    instrument_engine(engine.sync_engine, 'async')
+    instrument_queries(engine.sync_engine, 'async')
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    db_uri = settings.SQLALCHEMY_DATABASE_URI.replace('+asyncpg', '')
+    engine = create_engine(db_uri, pool_pre_ping=True, echo=False)
+    instrument_engine(engine, 'sync')
+    instrument_queries(engine, 'sync')
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_testing_engine() -> Engine:
+    test_db_uri = settings.SQLALCHEMY_TEST_DATABASE_URI.replace('+asyncpg', '')
+    return create_engine(test_db_uri, pool_pre_ping=True)
+
+
+@lru_cache(maxsize=None)
+def get_test_async_engine() -> AsyncEngine:
+    return create_async_engine(settings.SQLALCHEMY_TEST_DATABASE_URI, pool_pre_ping=True, echo=False)
 
-async_engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, echo=False)
 
-db_uri = settings.SQLALCHEMY_DATABASE_URI.replace('+asyncpg', '')
-engine = create_engine(db_uri, pool_pre_ping=True, echo=False)
+_engines = {
+    'engine': get_engine,
+    'async_engine': get_async_engine,
+    'testing_engine': get_testing_engine,
+    'test_async_engine': get_test_async_engine,
+}
 
 
-SessionLocal = sessionmaker(
+def __getattr__(name: str) -> Any:
+    # Engines used to be module attributes, keep them importable
+    if name in _engines:
+        return _engines[name]()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class LazySessionMaker(sessionmaker):
+    """
+    `sessionmaker` which creates its engine on the first session, so
+    importing this module neither builds engines nor connection pools.
+    """
+
+    def __init__(self, get_bind: Callable[[], Any], **kw):
+        super().__init__(**kw)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None:
+            self.kw['bind'] = self._get_bind()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(
+    get_engine,
     expire_on_commit=True,
     autocommit=False,
     autoflush=False,
     # twophase=True,
-    bind=engine
 )
 
-AsyncSessionLocal = sessionmaker(
+AsyncSessionLocal = LazySessionMaker(
+    get_async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
-    bind=async_engine,
     future=True,
 )
 
-test_db_uri = settings.SQLALCHEMY_TEST_DATABASE_URI.replace('+asyncpg', '')
-testing_engine = create_engine(test_db_uri, pool_pre_ping=True)
-
-test_async_engine = create_async_engine(
-    settings.SQLALCHEMY_TEST_DATABASE_URI, pool_pre_ping=True, echo=False,
-)
-TestingSessionLocal = sessionmaker(
+TestingSessionLocal = LazySessionMaker(
+    get_testing_engine,
     expire_on_commit=True,
     # twophase=True,
     autoflush=False,
     autocommit=False,
-    bind=testing_engine
 )
 
-AsyncTestingSessionLocal = sessionmaker(
+AsyncTestingSessionLocal = LazySessionMaker(
+    get_test_async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     # twophase=True,
     autoflush=False,
     autocommit=False,
-    bind=test_async_engine,
     future=True,
 )
@@ -68,3 +68,10 @@ log_data = {
     "port": port,
 }
 print(json.dumps(log_data))
+
+
+def child_exit(server, worker):
+    # Drop live gauges of the exited worker from the multiprocess metrics
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
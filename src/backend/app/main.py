@@ -1,35 +1,32 @@
 import aioredis
 import uvicorn
-import sentry_sdk
 
 from typing import Optional
 from fastapi import HTTPException, Depends, APIRouter
 from fastapi.responses import ORJSONResponse
 from starlette.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.conf.config import settings
 from app.core.app import FastAPI
+from app.core.compression import CompressionMiddleware
+from app.core.enums import render_choices_labels
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.staticfiles import PrecompressedStaticFiles
+from app.core.tracing import TracingMiddleware, init_sentry
+from app.db.profiling import QueryStatsMiddleware
 from app.routers.dependency import get_language
 from app.utils.translation import (
     LANGUAGE_COOKIE,
     LANGUAGE_HEADER,
-    LocaleFromCookieMiddleware,
-    LocaleFromHeaderMiddleware,
+    CatalogWatcher,
+    LocaleMiddleware,
     load_gettext_translations,
-    LocaleFromQueryParamsMiddleware,
 )
 from app.routers.api import api
 from app.routers.router import router
 
-sentry_sdk.init(
-    dsn=settings.SENTRY_DSN,
-    # Set traces_sample_rate to 1.0 to capture 100%
-    # of transactions for performance monitoring.
-    # We recommend adjusting this value in production,
-    traces_sample_rate=1.0,
-)
+init_sentry()
 
 
 def get_application(
@@ -38,7 +35,10 @@ def get_application(
         root_path: Optional[str] = None,
         root_path_in_servers: Optional[bool] = False,
 ) -> FastAPI:
-    load_gettext_translations(directory=settings.LOCALE.get('DIR', 'app/locale'), domain='messages')
+    gettext_translations = load_gettext_translations(
+        directory=settings.LOCALE.get('DIR', 'app/locale'), domain='messages',
+    )
+    render_choices_labels(gettext_translations.supported_locales)
 
     application = FastAPI(
         dependencies=[Depends(get_language)],
@@ -47,18 +47,13 @@ def get_application(
         debug=settings.DEBUG,
         version=settings.VERSION,
         middleware=[
-            # Middleware(
-            #     LocaleFromHeaderMiddleware,
-            #     language_header=LANGUAGE_HEADER,
-            #     default_code=settings.LANGUAGE_CODE
-            # ),
-            # Middleware(
-            #     LocaleFromCookieMiddleware,
-            #     language_cookie=LANGUAGE_COOKIE,
-            #     default_code=settings.LANGUAGE_CODE
-            # ),
-            Middleware(LocaleFromQueryParamsMiddleware, default_code=settings.LANGUAGE_CODE),
-
+            Middleware(
+                LocaleMiddleware,
+                default_code=settings.LANGUAGE_CODE,
+                sources=settings.LANGUAGE_SOURCES,
+                language_cookie=LANGUAGE_COOKIE,
+                language_header=LANGUAGE_HEADER,
+            ),
         ],
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         root_path=root_path,
@@ -66,6 +61,16 @@ def get_application(
 
     )
 
+    if settings.SENTRY_DSN:
+        application.add_middleware(TracingMiddleware)
+    if settings.DB_QUERY_STATS_ENABLED:
+        application.add_middleware(QueryStatsMiddleware)
+    if settings.COMPRESSION_ENABLED:
+        application.add_middleware(CompressionMiddleware)
+    if settings.METRICS_ENABLED:
+        application.add_middleware(MetricsMiddleware)
+        application.add_route('/metrics', metrics, include_in_schema=False)
+
     # Set all CORS enabled origins
     if settings.BACKEND_CORS_ORIGINS:
         application.add_middleware(
@@ -95,9 +100,23 @@ def get_application(
 
         await application.configure(
             aioredis_instance=aioredis_instance,
+            cache_redis=aioredis.from_url(settings.REDIS_URL),
         )
 
-    application.mount("/static", StaticFiles(directory="static", html=True), name="static")
+        if settings.LOCALE_RELOAD:
+            application.state.catalog_watcher = CatalogWatcher(
+                interval=settings.LOCALE_RELOAD_INTERVAL,
+                on_reload=(lambda: render_choices_labels(gettext_translations.supported_locales),),
+            )
+            application.state.catalog_watcher.start()
+
+    @application.on_event('shutdown')
+    async def shutdown():
+        catalog_watcher = getattr(application.state, 'catalog_watcher', None)
+        if catalog_watcher is not None:
+            catalog_watcher.stop()
+
+    application.mount("/static", PrecompressedStaticFiles(directory="static", html=True), name="static")
 
     application.include_router(app_api, prefix=settings.API_V1_STR)
     application.include_router(app_router, )
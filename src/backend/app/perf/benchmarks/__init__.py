@@ -0,0 +1,11 @@
+"""
+Microbenchmarks of the hot helpers in `app.utils`.
+
+    pytest app/perf/benchmarks
+    pytest app/perf/benchmarks --benchmark-compare=0001 --benchmark-storage=app/perf/benchmarks/reference
+    pytest app/perf/benchmarks --benchmark-save=reference --benchmark-storage=app/perf/benchmarks/reference
+
+Requires pytest-benchmark. The suite is kept out of the default test run
+(see `testpaths` in pytest.ini). Reference numbers are committed under
+`reference/`, compare against them on the same machine and Python only.
+"""
@@ -0,0 +1,9 @@
+import pytest
+
+from app.conf.config import settings
+from app.utils.translation import load_gettext_translations
+
+
+@pytest.fixture(scope='session', autouse=True)
+def translations():
+    return load_gettext_translations(directory=settings.LOCALE.get('DIR', 'app/locale'), domain='messages')
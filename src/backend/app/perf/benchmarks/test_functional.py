@@ -0,0 +1,41 @@
+import pytest
+
+from app.utils.functional import SimpleLazyObject, cached_property, lazy
+
+pytest.importorskip('pytest_benchmark')
+
+
+class Account:
+    @cached_property
+    def display_name(self):
+        return 'Account'
+
+
+def test_lazy_str_resolve(benchmark):
+    lazy_upper = lazy(str.upper, str)
+    benchmark(lambda: str(lazy_upper('wallet')))
+
+
+def test_lazy_proxy_create(benchmark):
+    lazy_upper = lazy(str.upper, str)
+    benchmark(lazy_upper, 'wallet')
+
+
+def test_simple_lazy_object_attribute(benchmark):
+    obj = SimpleLazyObject(lambda: Account())
+    obj.display_name
+    benchmark(getattr, obj, 'display_name')
+
+
+def test_simple_lazy_object_setup(benchmark):
+    benchmark(lambda: SimpleLazyObject(Account).display_name)
+
+
+def test_cached_property_hit(benchmark):
+    account = Account()
+    account.display_name
+    benchmark(getattr, account, 'display_name')
+
+
+def test_cached_property_miss(benchmark):
+    benchmark(lambda: Account().display_name)
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+from app.utils.prices import FastMoney, Money, TaxedMoney, flat_tax, percentage_discount
+
+pytest.importorskip('pytest_benchmark')
+
+AMOUNTS = [Decimal(i) / 100 for i in range(1, 1001)]
+CURRENCIES = ['USD', 'EUR', 'JPY', 'BHD']
+
+
+def test_money_add(benchmark):
+    a, b = Money(Decimal('10.25'), 'USD'), Money(Decimal('3.10'), 'USD')
+    benchmark(a.__add__, b)
+
+
+def test_money_compare(benchmark):
+    a, b = Money(Decimal('10.25'), 'USD'), Money(Decimal('3.10'), 'USD')
+    benchmark(a.__lt__, b)
+
+
+def test_money_quantize(benchmark):
+    money = Money(Decimal('10.256'), 'USD')
+    benchmark(money.quantize)
+
+
+def test_money_sum(benchmark):
+    values = [Money(amount, 'USD') for amount in AMOUNTS]
+    benchmark(sum, values[1:], values[0])
+
+
+def test_fast_money_sum(benchmark):
+    values = [FastMoney.from_money(Money(amount, 'USD')) for amount in AMOUNTS]
+    benchmark(sum, values[1:], values[0])
+
+
+def test_percentage_discount(benchmark):
+    money = Money(Decimal('99.99'), 'USD')
+    benchmark(percentage_discount, money, 15)
+
+
+def test_flat_tax(benchmark):
+    money = Money(Decimal('99.99'), 'USD')
+    benchmark(flat_tax, money, Decimal('0.18'), keep_gross=True)
+
+
+def test_taxed_money_add(benchmark):
+    a = TaxedMoney(net=Money(Decimal('10'), 'USD'), gross=Money(Decimal('12'), 'USD'))
+    b = TaxedMoney(net=Money(Decimal('5'), 'USD'), gross=Money(Decimal('6'), 'USD'))
+    benchmark(a.__add__, b)
+
+
+def test_money_column_group_sum(benchmark):
+    np = pytest.importorskip('numpy')
+    from app.utils.prices.money_column import MoneyColumn
+
+    column = MoneyColumn(
+        np.arange(100_000, dtype=np.int64),
+        np.array([CURRENCIES[i % len(CURRENCIES)] for i in range(100_000)]),
+    )
+    benchmark(column.group_sum)
+
+
+def test_money_column_flat_tax(benchmark):
+    np = pytest.importorskip('numpy')
+    from app.utils.prices.money_column import MoneyColumn
+
+    column = MoneyColumn(
+        np.arange(100_000, dtype=np.int64),
+        np.array([CURRENCIES[i % len(CURRENCIES)] for i in range(100_000)]),
+    )
+    benchmark(column.flat_tax, Decimal('0.18'))
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.datetime import timezone
+
+pytest.importorskip('pytest_benchmark')
+
+
+def test_now(benchmark):
+    benchmark(timezone.now)
+
+
+def test_localtime(benchmark):
+    value = timezone.now().replace(tzinfo=timezone.get_fixed_timezone(0))
+    benchmark(timezone.localtime, value)
+
+
+def test_make_aware(benchmark):
+    value = datetime(2022, 12, 1, 12, 30)
+    benchmark(timezone.make_aware, value)
+
+
+def test_override(benchmark):
+    tz = timezone.get_fixed_timezone(180)
+
+    def run():
+        with timezone.override(tz):
+            return timezone.get_current_timezone()
+
+    benchmark(run)
@@ -0,0 +1,45 @@
+import pytest
+
+from app.contrib.transaction import TransactionStatusChoices
+from app.utils.translation import gettext, gettext_lazy, override_locale, set_locale
+from app.utils.translation.helpers import get_header_locale_code, parse_language_header
+
+pytest.importorskip('pytest_benchmark')
+
+LANGUAGE_HEADER = 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'
+
+
+def test_gettext(benchmark, translations):
+    set_locale('ru')
+    benchmark(gettext, 'Transaction successfully created')
+
+
+def test_gettext_lazy_resolve(benchmark, translations):
+    set_locale('ru')
+    message = gettext_lazy('Transaction successfully created')
+    benchmark(str, message)
+
+
+def test_set_locale(benchmark, translations):
+    benchmark(set_locale, 'ru')
+
+
+def test_override_locale(benchmark, translations):
+    def run():
+        with override_locale('en'):
+            pass
+
+    benchmark(run)
+
+
+def test_parse_language_header(benchmark):
+    benchmark(parse_language_header, LANGUAGE_HEADER)
+
+
+def test_header_locale_code(benchmark, translations):
+    benchmark(get_header_locale_code, LANGUAGE_HEADER, translations.supported_locales)
+
+
+def test_choices_label(benchmark, translations):
+    set_locale('ru')
+    benchmark(TransactionStatusChoices.get_label, TransactionStatusChoices.COMPLETED)
@@ -0,0 +1,26 @@
+"""
+Load test of the account, wallet and money-movement flows.
+
+    python -m app.perf.load
+    python -m app.perf.load --flow transfer --concurrency 32 --duration 30
+    python -m app.perf.load --celery worker --json load.json
+    python -m app.perf.load --compare load.json --fail-threshold 15
+    python -m app.perf.load --base-url http://localhost:8000
+
+By default requests go straight through the ASGI interface of `app.main`
+in this process, with the Celery tasks executed eagerly inside the
+request (`--celery eager`). With `--celery worker` the tasks are sent to
+the broker and must be run by a real worker, and the time until a
+transaction is settled is reported as `<flow>:settled`; each virtual
+user waits for settling before its next iteration. `--base-url` targets
+a running server instead, settling is measured as in worker mode.
+
+Postgres from the settings is always required, run migrations first or
+pass `--create-schema`. `--discard-events` replaces the Redis client the
+tasks publish status events with, so eager runs work without Redis.
+In-process runs switch rate limiting off unless `--rate-limit` is given,
+a server must be started with `RATE_LIMIT_ENABLED=false` for that.
+
+Every flow reports throughput and p50/p95/p99 latency of its timed part.
+Saved JSON reports are baselines for later runs.
+"""
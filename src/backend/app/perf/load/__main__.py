@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import typing as t
+
+from httpx import AsyncClient
+
+from app.perf.startup import get_revision
+
+from . import __doc__ as usage
+from .flows import FLOWS, FlowError, Recorder, VirtualUser
+
+PERCENTILES = (50, 95, 99)
+
+
+class NullRedis:
+    """Stand-in for the Redis client of the tasks, events and cache invalidations are dropped"""
+
+    def pipeline(self, *args, **kwargs) -> 'NullRedis':
+        return self
+
+    def __enter__(self) -> 'NullRedis':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def publish(self, *args, **kwargs) -> int:
+        return 0
+
+    def incr(self, *args, **kwargs) -> 'NullRedis':
+        return self
+
+    def expire(self, *args, **kwargs) -> 'NullRedis':
+        return self
+
+    def delete(self, *args, **kwargs) -> 'NullRedis':
+        return self
+
+    def execute(self) -> list:
+        return []
+
+
+def percentile(sorted_values: t.List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(samples: t.List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(samples)
+    result = {
+        'count': len(values),
+        'errors': errors,
+        'rps': len(values) / elapsed if elapsed else 0.0,
+    }
+    for pct in PERCENTILES:
+        result[f'p{pct}_ms'] = percentile(values, pct) * 1000
+    return result
+
+
+async def run_flow(
+        name: str,
+        users: t.List[VirtualUser],
+        recorder: Recorder,
+        duration: float,
+        warmup: int,
+) -> float:
+    """Run the flow with one worker per user for `duration` seconds, return elapsed time"""
+    flow = FLOWS[name]
+
+    recorder.enabled = False
+    await asyncio.gather(*(flow(user) for user in users for _ in range(warmup)))
+    recorder.enabled = True
+
+    deadline = time.perf_counter() + duration
+
+    async def worker(user: VirtualUser) -> None:
+        while time.perf_counter() < deadline:
+            try:
+                await flow(user)
+            except FlowError as e:
+                print(f'  {name}: {e}', file=sys.stderr)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users))
+    return time.perf_counter() - started
+
+
+def configure(args: argparse.Namespace) -> None:
+    from app.core.celery_app import DatabaseTask, celery_app
+
+    if args.celery == 'eager':
+        celery_app.conf.task_always_eager = True
+    if args.discard_events:
+        DatabaseTask._redis = NullRedis()
+    if not args.rate_limit:
+        from app.core.ratelimit import rate_limiter
+        rate_limiter.enabled = False
+    if args.create_schema:
+        from app.db.models import PlainBase
+        from app.db.session import get_engine
+        PlainBase.metadata.create_all(bind=get_engine())
+
+
+async def run(args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    report: dict = {
+        'revision': get_revision(),
+        'python': sys.version.split()[0],
+        'target': args.base_url or 'asgi',
+        'celery': args.celery,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'flows': {},
+    }
+
+    async def run_all(client: AsyncClient) -> None:
+        users = [
+            VirtualUser(client=client, recorder=recorder, settle=args.celery == 'worker',
+                        settle_timeout=args.settle_timeout, poll_interval=args.poll_interval)
+            for _ in range(args.concurrency)
+        ]
+        recorder.enabled = False
+        await asyncio.gather(*(user.setup() for user in users))
+        for user, peer in zip(users, users[1:] + users[:1]):
+            user.peer = peer
+
+        for name in args.flows:
+            elapsed = await run_flow(name, users, recorder, args.duration, args.warmup)
+            for sample_name in (name, f'{name}:settled'):
+                if sample_name in recorder.samples or sample_name in recorder.errors:
+                    report['flows'][sample_name] = summarize(
+                        recorder.samples.get(sample_name, []), recorder.errors.get(sample_name, 0), elapsed,
+                    )
+
+    if args.base_url:
+        async with AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+            await run_all(client)
+    else:
+        from asgi_lifespan import LifespanManager
+        from app.main import app
+        async with LifespanManager(app):
+            async with AsyncClient(app=app, base_url='http://testserver', timeout=args.timeout) as client:
+                await run_all(client)
+    return report
+
+
+def print_report(report: dict, baseline: t.Optional[dict] = None) -> None:
+    baseline_flows = (baseline or {}).get('flows', {})
+    print(f'target={report["target"]} celery={report["celery"]} concurrency={report["concurrency"]}')
+    print(f'  {"flow":<28} {"count":>7} {"errors":>6} {"rps":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+    for name, result in report['flows'].items():
+        line = (
+            f'  {name:<28} {result["count"]:>7} {result["errors"]:>6} {result["rps"]:>9.1f} '
+            f'{result["p50_ms"]:>9.1f} {result["p95_ms"]:>9.1f} {result["p99_ms"]:>9.1f}'
+        )
+        previous = baseline_flows.get(name)
+        if previous and previous['p95_ms']:
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            result['p95_change_pct'] = change
+            line += f'  p95 {change:+.1f}%'
+        print(line)
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=usage, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flow', dest='flows', action='append', choices=tuple(FLOWS),
+                        help='flow to run, may be repeated, all by default')
+    parser.add_argument('--concurrency', type=int, default=8, help='virtual users running each flow')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per flow')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed iterations per user before each flow')
+    parser.add_argument('--celery', choices=('eager', 'worker'), default='eager')
+    parser.add_argument('--base-url', help='run against a server instead of the in-process app')
+    parser.add_argument('--discard-events', action='store_true', help='drop status events instead of using Redis')
+    parser.add_argument('--rate-limit', action='store_true', help='keep rate limits of the in-process app')
+    parser.add_argument('--create-schema', action='store_true', help='create missing tables before the run')
+    parser.add_argument('--settle-timeout', type=float, default=30.0)
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--timeout', type=float, default=30.0, help='request timeout')
+    parser.add_argument('--json', dest='json_path', help='save the report to this file')
+    parser.add_argument('--compare', help='previously saved report to compare against')
+    parser.add_argument('--fail-threshold', type=float,
+                        help='exit with status 1 when p95 of a flow grew by more percent than this')
+    args = parser.parse_args(argv)
+    args.flows = args.flows or list(FLOWS)
+
+    if args.base_url:
+        # The server runs the tasks, settling is measured as in worker mode
+        args.celery = 'worker'
+    else:
+        configure(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'comparing with {args.compare} ({baseline.get("revision")})')
+
+    report = asyncio.run(run(args))
+    print_report(report, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.fail_threshold is not None:
+        regressed = [
+            name for name, result in report['flows'].items()
+            if result.get('p95_change_pct', 0) > args.fail_threshold
+        ]
+        if regressed:
+            print(f'p95 regressed by more than {args.fail_threshold}%: {", ".join(regressed)}', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import asyncio
+import time
+import typing as t
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from httpx import AsyncClient, Response
+
+from app.conf.config import settings
+from app.contrib.transaction import TransactionStatusChoices
+
+PASSWORD = 'load-test-secret'
+FUNDING_AMOUNT = 1_000_000
+CURRENCIES = ('USD', 'EUR', 'GBP', 'CHF', 'JPY', 'RUB', 'TRY', 'CNY')
+
+
+class FlowError(Exception):
+    pass
+
+
+class Recorder:
+    """Latency samples and error counts by flow name"""
+
+    def __init__(self):
+        self.samples: t.Dict[str, t.List[float]] = {}
+        self.errors: t.Dict[str, int] = {}
+        self.enabled = True
+
+    def add(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def add_error(self, name: str) -> None:
+        if self.enabled:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+@dataclass
+class VirtualUser:
+    """Signed up user with a funded wallet, shared by the flows"""
+    client: AsyncClient
+    recorder: Recorder
+    settle: bool = False
+    settle_timeout: float = 30.0
+    poll_interval: float = 0.05
+    email: str = ''
+    headers: t.Dict[str, str] = field(default_factory=dict)
+    wallet_id: t.Optional[str] = None
+    transaction_id: t.Optional[str] = None
+    peer: t.Optional['VirtualUser'] = None
+
+    async def request(
+            self, method: str, url: str, expected: t.Tuple[int, ...] = (200, 201),
+            headers: t.Optional[t.Dict[str, str]] = None, **kwargs,
+    ) -> Response:
+        response = await self.client.request(
+            method, f'{settings.API_V1_STR}{url}', headers={**self.headers, **(headers or {})}, **kwargs,
+        )
+        if response.status_code not in expected:
+            raise FlowError(f'{method} {url}: {response.status_code} {response.text[:200]}')
+        return response
+
+    @asynccontextmanager
+    async def timed(self, name: str) -> t.AsyncIterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.recorder.add_error(name)
+            raise
+        self.recorder.add(name, time.perf_counter() - started)
+
+    async def sign_up(self) -> None:
+        self.email = f'load-{uuid.uuid4().hex}@example.com'
+        await self.request('POST', '/account/sign-up/', json={
+            'fullName': 'Load Test',
+            'email': self.email,
+            'password': PASSWORD,
+            'passwordConfirm': PASSWORD,
+        })
+
+    async def login(self) -> None:
+        response = await self.request('POST', '/account/token/', data={
+            'username': self.email,
+            'password': PASSWORD,
+        })
+        self.headers = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+    async def create_wallet(self, currency: str) -> str:
+        response = await self.request('POST', '/wallet/create/', json={'currency': currency})
+        return response.json()['id']
+
+    async def wait_settled(self, name: str, transaction_id: str) -> None:
+        """Poll the transaction until the task finished it"""
+        started = time.perf_counter()
+        etag = None
+        while time.perf_counter() - started < self.settle_timeout:
+            # Unchanged versions come back as empty 304 responses
+            response = await self.request(
+                'GET', f'/transaction/{transaction_id}/detail/', expected=(200, 304),
+                headers={'If-None-Match': etag} if etag else None,
+            )
+            if response.status_code == 304:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            etag = response.headers.get('etag')
+            if response.json()['status'] != TransactionStatusChoices.PROCESSING:
+                self.recorder.add(f'{name}:settled', time.perf_counter() - started)
+                return
+            await asyncio.sleep(self.poll_interval)
+        self.recorder.add_error(f'{name}:settled')
+        raise FlowError(f'transaction {transaction_id} is not settled in {self.settle_timeout}s')
+
+    async def setup(self) -> None:
+        await self.sign_up()
+        await self.login()
+        self.wallet_id = await self.create_wallet(settings.DEFAULT_CURRENCY_CODE)
+        response = await self.request('POST', '/transaction/replenish-wallet/', json={
+            'walletId': self.wallet_id, 'amount': FUNDING_AMOUNT,
+        })
+        self.transaction_id = response.json()['data']['id']
+        if self.settle:
+            await self.wait_settled('setup', self.transaction_id)
+
+    async def move_money(self, name: str, url: str, payload: dict) -> None:
+        async with self.timed(name):
+            response = await self.request('POST', url, json=payload)
+        transaction_id = response.json()['data']['id']
+        self.transaction_id = transaction_id
+        if self.settle:
+            await self.wait_settled(name, transaction_id)
+
+
+async def sign_up_token(user: VirtualUser) -> None:
+    guest = VirtualUser(client=user.client, recorder=user.recorder)
+    async with user.timed('sign_up_token'):
+        await guest.sign_up()
+        await guest.login()
+
+
+async def wallet_create(user: VirtualUser) -> None:
+    owner = VirtualUser(client=user.client, recorder=user.recorder)
+    await owner.sign_up()
+    await owner.login()
+    for currency in CURRENCIES:
+        async with user.timed('wallet_create'):
+            await owner.create_wallet(currency)
+
+
+async def wallet_list(user: VirtualUser) -> None:
+    async with user.timed('wallet_list'):
+        await user.request('GET', '/wallet/')
+
+
+async def replenish(user: VirtualUser) -> None:
+    await user.move_money('replenish', '/transaction/replenish-wallet/', {
+        'walletId': user.wallet_id, 'amount': 1,
+    })
+
+
+async def withdraw(user: VirtualUser) -> None:
+    await user.move_money('withdraw', '/transaction/withdraw-wallet/', {
+        'walletId': user.wallet_id, 'amount': 1,
+    })
+
+
+async def transfer(user: VirtualUser) -> None:
+    await user.move_money('transfer', '/transaction/transfer-money/', {
+        'fromWalletId': user.wallet_id, 'toWalletId': user.peer.wallet_id, 'amount': 1,
+    })
+
+
+async def transaction_list(user: VirtualUser) -> None:
+    async with user.timed('transaction_list'):
+        await user.request('GET', '/transaction/')
+
+
+async def transaction_detail(user: VirtualUser) -> None:
+    async with user.timed('transaction_detail'):
+        await user.request('GET', f'/transaction/{user.transaction_id}/detail/')
+
+
+FLOWS: t.Dict[str, t.Callable[[VirtualUser], t.Awaitable[None]]] = {
+    'sign_up_token': sign_up_token,
+    'wallet_create': wallet_create,
+    'wallet_list': wallet_list,
+    'replenish': replenish,
+    'withdraw': withdraw,
+    'transfer': transfer,
+    'transaction_list': transaction_list,
+    'transaction_detail': transaction_detail,
+}
@@ -0,0 +1,88 @@
+"""
+Compare request throughput of the locale middleware stacks.
+
+    python -m app.perf.locale_middleware
+
+Requests are sent straight through the ASGI interface, so the numbers
+only contain middleware and routing overhead.
+"""
+import asyncio
+import time
+from typing import Callable, Tuple
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+from app.conf.config import settings
+from app.utils.translation import LocaleMiddleware, get_locale_code, load_gettext_translations, set_locale
+
+REQUESTS = 20_000
+
+
+class LegacyLocaleFromQueryParamsMiddleware(BaseHTTPMiddleware):
+    """The `BaseHTTPMiddleware` implementation the app used before."""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        locale_code = request.query_params.get('lang', settings.LANGUAGE_CODE)
+        if locale_code:
+            set_locale(code=locale_code)
+        return await call_next(request)
+
+
+async def endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(get_locale_code())
+
+
+def build_app(*middleware: Middleware) -> Starlette:
+    return Starlette(routes=[Route('/', endpoint)], middleware=list(middleware))
+
+
+async def run(app: Callable, requests: int) -> float:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/', 'raw_path': b'/', 'root_path': '',
+        'query_string': b'lang=ru', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+        'headers': [
+            (b'host', b'testserver'),
+            (b'cookie', b'Language=en'),
+            (b'accept-language', b'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7'),
+        ],
+    }
+
+    async def send(message: dict) -> None:
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        messages = [{'type': 'http.disconnect'}, {'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive() -> dict:
+            return messages.pop() if len(messages) > 1 else messages[0]
+
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    load_gettext_translations(directory=settings.LOCALE.get('DIR', 'app/locale'), domain='messages')
+    stacks: Tuple[Tuple[str, Starlette], ...] = (
+        ('no middleware', build_app()),
+        ('BaseHTTPMiddleware (query)', build_app(Middleware(LegacyLocaleFromQueryParamsMiddleware))),
+        ('LocaleMiddleware (query)', build_app(
+            Middleware(LocaleMiddleware, default_code=settings.LANGUAGE_CODE, sources=('query',)))),
+        ('LocaleMiddleware (all)', build_app(
+            Middleware(LocaleMiddleware, default_code=settings.LANGUAGE_CODE,
+                       sources=('query', 'cookie', 'header')))),
+    )
+    for name, app in stacks:
+        asyncio.run(run(app, 1_000))
+        seconds = asyncio.run(run(app, REQUESTS))
+        print(f'{name:<28} {REQUESTS / seconds:10.0f} req/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Compare currency precision lookups in the pricing functions.
+
+    python -m app.perf.prices
+"""
+import timeit
+from decimal import ROUND_HALF_UP, Decimal
+
+from babel.numbers import get_currency_precision
+
+from app.utils.prices import Money, flat_tax, percentage_discount
+from app.utils.prices.currency import get_currency
+
+NUMBER = 100_000
+
+
+def babel_quantize(money: Money) -> Money:
+    digits = get_currency_precision(money.currency)
+    exp = Decimal('0.1') ** digits
+    return Money(money.amount.quantize(exp, rounding=ROUND_HALF_UP), money.currency)
+
+
+def main() -> None:
+    money = Money(Decimal('1234.5678'), 'USD')
+    get_currency(money.currency)
+    cases = (
+        ('quantize (babel lookup)', lambda: babel_quantize(money)),
+        ('quantize (registry)', lambda: money.quantize()),
+        ('percentage_discount', lambda: percentage_discount(money, 15)),
+        ('flat_tax', lambda: flat_tax(money, Decimal('0.23'))),
+    )
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f'{name:<28} {seconds / NUMBER * 1e6:8.3f} us/op')
+
+
+if __name__ == '__main__':
+    main()
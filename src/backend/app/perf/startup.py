@@ -0,0 +1,199 @@
+"""
+Startup-time and import-cost profiling for the API and the Celery worker.
+
+    python -m app.perf.startup
+    python -m app.perf.startup --target api --json startup.json
+    python -m app.perf.startup --compare startup.json
+
+Every target boots in a fresh interpreter started with `-X importtime`.
+The report contains import cost aggregated by package, time to import
+the entry point, time to the first served request (API) or executed task
+(worker), and RSS after boot. Saved JSON reports can be compared across
+commits.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+TARGETS = ('api', 'worker')
+IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+RESULT_PREFIX = 'STARTUP_RESULT '
+
+
+def get_rss_kb() -> int:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def probe_api() -> dict:
+    import asyncio
+    from asgi_lifespan import LifespanManager
+    from httpx import AsyncClient
+
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def first_request() -> int:
+        async with LifespanManager(app):
+            async with AsyncClient(app=app, base_url='http://testserver') as client:
+                response = await client.get('/')
+                return response.status_code
+
+    status_code = asyncio.run(first_request())
+    finished = time.perf_counter()
+    return {
+        'import_s': imported - started,
+        'first_request_s': finished - started,
+        'status': status_code,
+        'rss_kb': get_rss_kb(),
+    }
+
+
+def probe_worker() -> dict:
+    started = time.perf_counter()
+    from app.core.celery_app import celery_app
+    celery_app.loader.import_default_modules()
+    imported = time.perf_counter()
+
+    from app.worker import test_celery
+    result = test_celery.apply(args=('startup',)).get()
+    finished = time.perf_counter()
+    return {
+        'import_s': imported - started,
+        'first_request_s': finished - started,
+        'status': result,
+        'rss_kb': get_rss_kb(),
+    }
+
+
+PROBES = {
+    'api': probe_api,
+    'worker': probe_worker,
+}
+
+
+def group_name(module: str) -> str:
+    """Aggregate `app` modules by subpackage and others by top level package"""
+    parts = module.split('.')
+    if parts[0] == 'app' and len(parts) > 1:
+        return '.'.join(parts[:2])
+    return parts[0]
+
+
+def parse_import_times(stderr: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Return self time by package group and cumulative time by module, in us"""
+    groups: Dict[str, int] = defaultdict(int)
+    modules: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        groups[group_name(module)] += int(self_us)
+        modules[module] = int(cumulative_us)
+    return dict(groups), modules
+
+
+def run_target(target: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', __spec__.name, '--probe', target],
+        capture_output=True, text=True, cwd=os.getcwd(),
+    )
+    result: Optional[dict] = None
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+    if process.returncode != 0 or result is None:
+        raise RuntimeError(f'{target} probe failed:\n{process.stderr[-4000:]}')
+    groups, modules = parse_import_times(process.stderr)
+    result['import_groups_us'] = groups
+    result['import_modules_us'] = modules
+    return result
+
+
+def get_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def median_result(results: List[dict]) -> dict:
+    result = dict(results[len(results) // 2])
+    for key in ('import_s', 'first_request_s', 'rss_kb'):
+        values = sorted(item[key] for item in results)
+        result[key] = values[len(values) // 2]
+    return result
+
+
+def print_report(target: str, result: dict, top: int, baseline: Optional[dict] = None) -> None:
+    def delta(key: str, scale: float = 1.0, unit: str = '') -> str:
+        if not baseline or key not in baseline:
+            return ''
+        diff = (result[key] - baseline[key]) * scale
+        return f' ({diff:+.1f}{unit})'
+
+    print(f'== {target}')
+    print(f'  import          {result["import_s"] * 1000:9.1f} ms{delta("import_s", 1000, " ms")}')
+    print(f'  first request   {result["first_request_s"] * 1000:9.1f} ms{delta("first_request_s", 1000, " ms")}')
+    print(f'  rss after boot  {result["rss_kb"] / 1024:9.1f} MB{delta("rss_kb", 1 / 1024, " MB")}')
+    print(f'  import self time by package (top {top}):')
+    groups = sorted(result['import_groups_us'].items(), key=lambda item: item[1], reverse=True)
+    baseline_groups = (baseline or {}).get('import_groups_us', {})
+    for name, value in groups[:top]:
+        diff = ''
+        if name in baseline_groups:
+            diff = f' ({(value - baseline_groups[name]) / 1000:+.1f} ms)'
+        print(f'    {name:<32} {value / 1000:9.1f} ms{diff}')
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=(*TARGETS, 'all'), default='all')
+    parser.add_argument('--repeat', type=int, default=3, help='boots per target, the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='packages to show')
+    parser.add_argument('--json', dest='json_path', help='save the report to this file')
+    parser.add_argument('--compare', help='previously saved report to compare against')
+    parser.add_argument('--probe', choices=TARGETS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(RESULT_PREFIX + json.dumps(PROBES[args.probe](), default=str), flush=True)
+        return
+
+    baseline: dict = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'comparing with {args.compare} ({baseline.get("revision")})')
+
+    targets = TARGETS if args.target == 'all' else (args.target,)
+    report = {'revision': get_revision(), 'python': sys.version.split()[0], 'targets': {}}
+    for target in targets:
+        result = median_result([run_target(target) for _ in range(max(args.repeat, 1))])
+        report['targets'][target] = result
+        print_report(target, result, args.top, baseline.get('targets', {}).get(target))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
-from typing import Generator, Optional
+from typing import Awaitable, Callable, Generator, Optional
 from jose import jwt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 
 from starlette.status import HTTP_403_FORBIDDEN
 from pydantic import ValidationError
@@ -10,7 +10,8 @@ from app.conf.config import settings
 from app.contrib.account.repository import user_repo
 from app.contrib.account.schema import TokenPayload
 
-from app.core.exceptions import InvalidToken
+from app.core.exceptions import InvalidToken, TooManyRequests
+from app.core.ratelimit import parse_rate, rate_limiter
 
 from app.utils.security import OAuth2PasswordBearerWithCookie, lazy_jwt_settings
 from app.core.schema import CommonsModel
@@ -73,6 +74,33 @@ async def get_active_user(user: User = Depends(get_current_user)) -> User:
     return user
 
 
+async def get_client_ip_key(request: Request) -> str:
+    return f'ip:{request.client.host if request.client else "unknown"}'
+
+
+async def get_user_key(user: User = Depends(get_current_user)) -> str:
+    return f'user:{user.id}'
+
+
+def rate_limit(rule: str, key: Callable[..., Awaitable[str]] = get_client_ip_key) -> Callable:
+    """
+    Dependency which takes a token of the client's bucket of `rule`
+    :param rule: name in settings.RATE_LIMITS
+    :param key: dependency returning the client key, by IP by default
+    :return:
+    """
+
+    async def dependency(request: Request, client_key: str = Depends(key)) -> None:
+        rate = settings.RATE_LIMITS.get(rule)
+        if rate is None or not rate_limiter.enabled:
+            return
+        decision = await rate_limiter.hit(request.app.aioredis_instance, rule, client_key, parse_rate(rate))
+        if not decision.allowed:
+            raise TooManyRequests(retry_after=decision.retry_after)
+
+    return dependency
+
+
 async def get_commons(
         order_by: Optional[str] = None,
         limit: Optional[int] = settings.PAGINATION_MAX_SIZE,
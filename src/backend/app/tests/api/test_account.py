@@ -1,10 +1,12 @@
 import pytest
+from uuid import uuid4
 
 from faker import Faker
 from starlette import status
 from typing import TYPE_CHECKING, Callable
 
 from app.conf.config import settings
+from app.core.ratelimit import rate_limiter
 
 from app.contrib.account.repository import user_repo
 
@@ -30,6 +32,26 @@ async def test_get_token_api(
     assert 'access_token' in result
 
 
+@pytest.mark.asyncio
+async def test_get_token_rate_limit_api(
+        async_client: "AsyncClient",
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setitem(settings.RATE_LIMITS, 'account-token', '1/minute')
+    # Own buckets, so other tests are not limited
+    monkeypatch.setattr(rate_limiter, 'prefix', f'ratelimit-test-{uuid4().hex}')
+    data = {
+        'username': 'nobody@example.com',
+        'password': 'secret'
+    }
+    response = await async_client.post(f'{settings.API_V1_STR}/account/token/', data=data)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await async_client.post(f'{settings.API_V1_STR}/account/token/', data=data)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers['retry-after']) > 0
+
+
 @pytest.mark.asyncio
 async def test_sign_up_api(
         async_db: "AsyncSession",
@@ -1,11 +1,14 @@
+from datetime import date
+
+import orjson
 import pytest
 
 from starlette import status
 from typing import TYPE_CHECKING, Callable
 
 from app.conf.config import jwt_settings, settings
-from app.contrib.transaction.repository import transaction_repo
-from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction.repository import transaction_repo, transaction_summary_repo
+from app.contrib.transaction import TransactionDirectionChoices, TransactionStatusChoices, TransactionTypeChoices
 
 if TYPE_CHECKING:
     from httpx import AsyncClient
@@ -47,6 +50,112 @@ async def test_get_transaction_list_api(
     assert len(result.get('rows')) > 0
 
 
+@pytest.mark.asyncio
+async def test_get_transaction_detail_not_modified_api(
+        async_client: "AsyncClient",
+        get_simple_user: Callable,
+        async_db: "AsyncSession",
+        get_token_headers: Callable,
+        get_wallet: Callable,
+) -> None:
+    user = await get_simple_user()
+    wallet = await get_wallet(user=user, )
+    transaction = await transaction_repo.create(async_db, obj_in={
+        'to_wallet_id': wallet.id,
+        'transaction_type': TransactionTypeChoices.REPLENISHMENT.value,
+        'total_amount': 200,
+        'currency': 'USD',
+        'status': TransactionStatusChoices.PROCESSING.value,
+    })
+
+    token_headers = get_token_headers(user, jwt_settings.JWT_AUDIENCE)
+    url = f'{settings.API_V1_STR}/transaction/{transaction.id}/detail/'
+    response = await async_client.get(url, headers=token_headers)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers['etag']
+
+    response = await async_client.get(url, headers={**token_headers, 'If-None-Match': etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+
+    await transaction_repo.update(async_db, db_obj=transaction, obj_in={
+        'status': TransactionStatusChoices.COMPLETED.value,
+    })
+    response = await async_client.get(url, headers={**token_headers, 'If-None-Match': etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['etag'] != etag
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_api(
+        async_client: "AsyncClient",
+        get_simple_user: Callable,
+        async_db: "AsyncSession",
+        get_token_headers: Callable,
+        get_wallet: Callable,
+) -> None:
+    user = await get_simple_user()
+
+    wallet = await get_wallet(user=user, )
+    transaction = await transaction_repo.create(async_db, obj_in={
+        'to_wallet_id': wallet.id,
+        'transaction_type': TransactionTypeChoices.REPLENISHMENT.value,
+        'total_amount': 200,
+        'currency': 'USD',
+        'status': TransactionStatusChoices.COMPLETED.value,
+    })
+
+    token_headers = get_token_headers(user, jwt_settings.JWT_AUDIENCE)
+    response = await async_client.get(f'{settings.API_V1_STR}/transaction/export/', headers=token_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+
+    rows = [orjson.loads(line) for line in response.text.splitlines()]
+    assert str(transaction.id) in {row['id'] for row in rows}
+
+
+@pytest.mark.asyncio
+async def test_get_transaction_summary_api(
+        async_client: "AsyncClient",
+        get_simple_user: Callable,
+        async_db: "AsyncSession",
+        get_token_headers: Callable,
+        get_wallet: Callable,
+) -> None:
+    user = await get_simple_user()
+
+    wallet = await get_wallet(user=user, )
+    await transaction_summary_repo.create(async_db, obj_in={
+        'wallet_id': wallet.id,
+        'period': date(2022, 11, 1),
+        'currency': 'USD',
+        'transaction_type': TransactionTypeChoices.REPLENISHMENT.value,
+        'direction': TransactionDirectionChoices.INFLOW.value,
+        'count': 2,
+        'total_amount': 400,
+    })
+
+    token_headers = get_token_headers(user, jwt_settings.JWT_AUDIENCE)
+    response = await async_client.get(
+        f'{settings.API_V1_STR}/transaction/summary/', headers=token_headers, params={'period': 'year'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+    result = response.json()
+    assert len(result) == 1
+    assert result[0]['period'] == '2022-01-01'
+    assert result[0]['count'] == 2
+
+    response = await async_client.get(
+        f'{settings.API_V1_STR}/transaction/summary/', headers=token_headers, params={'period': 'month'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [row['period'] for row in response.json()] == ['2022-11-01']
+
+
 @pytest.mark.asyncio
 async def test_replenish_wallet_api(
         async_client: "AsyncClient",
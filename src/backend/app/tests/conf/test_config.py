@@ -0,0 +1,14 @@
+import pytest
+
+from app.conf.config import get_settings, settings
+
+
+def test_lazy_settings_forwards_setattr(monkeypatch: pytest.MonkeyPatch) -> None:
+    default = settings.RATE_LIMIT_ENABLED
+
+    monkeypatch.setattr(settings, 'RATE_LIMIT_ENABLED', not default)
+    assert settings.RATE_LIMIT_ENABLED is (not default)
+    assert get_settings().RATE_LIMIT_ENABLED is (not default)
+
+    monkeypatch.undo()
+    assert settings.RATE_LIMIT_ENABLED is default
@@ -16,6 +16,8 @@ from app.utils.security import lazy_jwt_settings
 
 if TYPE_CHECKING:
     from faker import Faker
+    from fakeredis import FakeRedis, FakeServer
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
     from fastapi import FastAPI
     from sqlalchemy.ext.asyncio import AsyncSession
     from sqlalchemy.orm import Session
@@ -71,6 +73,25 @@ async def app_settings() -> Any:
     return settings
 
 
+@pytest.fixture
+def redis_server() -> "FakeServer":
+    """In-memory Redis of the test, shared by the sync and async clients"""
+    from fakeredis import FakeServer
+    return FakeServer()
+
+
+@pytest.fixture
+def redis(redis_server: "FakeServer") -> "FakeRedis":
+    from fakeredis import FakeRedis
+    return FakeRedis(server=redis_server)
+
+
+@pytest.fixture
+async def async_redis(redis_server: "FakeServer") -> "AsyncFakeRedis":
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
+    return AsyncFakeRedis(server=redis_server)
+
+
 @pytest.fixture
 def db():
     """
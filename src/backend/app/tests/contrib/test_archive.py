@@ -0,0 +1,278 @@
+import orjson
+import pytest
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterator, List
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.conf.config import settings
+from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction.archive import (
+    COLUMNS,
+    WRITERS,
+    ArchiveError,
+    Manifest,
+    NdjsonWriter,
+    archive_dir,
+    archive_month,
+    delete_month,
+    detached_table,
+    file_sha256,
+    manifest_path,
+    month_bounds,
+    read_file,
+    serialize_row,
+    verify_month,
+    write_month,
+)
+from app.contrib.transaction import export
+from app.contrib.transaction.export import export_transaction_history
+from app.contrib.transaction.models import Transaction
+from app.contrib.transaction.partitions import TABLE, create_partition, list_partitions, partition_name
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SavepointEngine:
+    """Engine whose transactions are savepoints of the test connection"""
+
+    def __init__(self, conn: "Connection"):
+        self.conn = conn
+        self.transactions = 0
+
+    @contextmanager
+    def begin(self):
+        self.transactions += 1
+        with self.conn.begin_nested():
+            yield self.conn
+
+
+@pytest.fixture(autouse=True)
+def archive_settings(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, 'TRANSACTION_ARCHIVE_DIR', str(tmp_path))
+
+
+@pytest.fixture
+async def conn(async_db: "AsyncSession") -> Iterator["Connection"]:
+    """
+    Sync connection to the test database, like the archive command uses,
+    in a transaction rolled back at the end of the test
+    """
+    from app.db.session import get_testing_engine
+    # Release the locks of the shared session, partitions are dropped below
+    await async_db.commit()
+    with get_testing_engine().connect() as conn:
+        transaction = conn.begin()
+        yield conn
+        transaction.rollback()
+
+
+def make_rows(month: date, count: int) -> List[dict]:
+    places = Decimal(1).scaleb(-settings.DEFAULT_DECIMAL_PLACES)
+    return [
+        {
+            'id': uuid4(),
+            'created_at': datetime(month.year, month.month, day + 1, 12, tzinfo=timezone.utc),
+            'updated_at': datetime(month.year, month.month, day + 1, 13, tzinfo=timezone.utc),
+            'private_metadata': {'note': 'private'},
+            'public_metadata': {'day': day},
+            'to_wallet_id': uuid4(),
+            'from_wallet_id': None,
+            'currency': 'USD',
+            'total_amount': Decimal(f'{day + 1}.25').quantize(places),
+            'transaction_type': TransactionTypeChoices.TRANSFER.value,
+            'status': TransactionStatusChoices.COMPLETED.value,
+        }
+        for day in range(count)
+    ]
+
+
+def insert_rows(conn: "Connection", month: date, count: int) -> List[dict]:
+    rows = make_rows(month, count)
+    # Wallets are left out, the foreign keys are not what is archived
+    conn.execute(Transaction.__table__.insert(), [{**row, 'to_wallet_id': None} for row in rows])
+    return rows
+
+
+def count_rows(conn: "Connection", month: date) -> int:
+    start, end = month_bounds(month)
+    return conn.execute(text(
+        f'SELECT count(*) FROM public."{TABLE}" WHERE created_at >= :start AND created_at < :end'
+    ), {'start': start, 'end': end}).scalar()
+
+
+def write_archive(month: date, rows: List[dict]) -> Manifest:
+    """Ndjson archive of the rows with its manifest"""
+    path = archive_dir() / f'{month.year:04d}-{month.month:02d}.ndjson.gz'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = NdjsonWriter(path)
+    writer.write(rows)
+    writer.close()
+    manifest = Manifest(
+        month=path.name[:7],
+        format='ndjson',
+        file=path.name,
+        rows=len(rows),
+        total_amount=str(sum(row['total_amount'] for row in rows)),
+        sha256=file_sha256(path),
+        archived_at=datetime.now(timezone.utc).isoformat(),
+    )
+    manifest.dump(manifest_path(month))
+    return manifest
+
+
+def partition_names(conn: "Connection") -> List[str]:
+    return [partition.name for partition in list_partitions(conn)]
+
+
+
+
+@pytest.mark.parametrize('fmt', ['ndjson', 'parquet'])
+def test_writer_round_trip(tmp_path: Path, fmt: str) -> None:
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    rows = make_rows(date(2001, 1, 1), 5)
+    path = tmp_path / f'2001-01.{fmt}'
+    writer = WRITERS[fmt](path)
+    writer.write(rows[:3])
+    writer.write(rows[3:])
+    writer.close()
+
+    assert list(read_file(path, fmt)) == [serialize_row(row) for row in rows]
+
+
+@pytest.mark.parametrize('changes, error', [
+    ({'sha256': '0' * 64}, 'checksum does not match'),
+    ({'rows': 4}, '3 rows of 6.75 in the file, 4 of 6.75 expected'),
+    ({'total_amount': '7.00'}, '3 rows of 6.75 in the file, 3 of 7.00 expected'),
+])
+def test_verify_month_rejects_manifest_mismatch(changes: dict, error: str) -> None:
+    month = date(2001, 2, 1)
+    manifest = write_archive(month, make_rows(month, 3))
+    assert verify_month(month) == manifest
+
+    Manifest(**{**asdict(manifest), **changes}).dump(manifest_path(month))
+    with pytest.raises(ArchiveError, match=error):
+        verify_month(month)
+
+
+def test_verify_month_not_archived() -> None:
+    with pytest.raises(ArchiveError, match='2001-02 is not archived'):
+        verify_month(date(2001, 2, 1))
+
+
+def test_archive_month_resumes_deletion(conn: "Connection") -> None:
+    month = date(2001, 7, 1)
+    create_partition(conn, month, has_default=True)
+    rows = insert_rows(conn, month, 4)
+    manifest = write_month(conn, month, fmt='ndjson', chunk_size=10)
+    # Interrupted after the first batch
+    conn.execute(text(f'DELETE FROM public."{TABLE}" WHERE id = ANY(:ids)'), {
+        'ids': [row['id'] for row in rows[:2]],
+    })
+
+    # The file is not written again, the engine could not even connect
+    assert archive_month(SavepointEngine(conn), month, batch_size=10) == manifest
+    assert file_sha256(archive_dir() / manifest.file) == manifest.sha256
+    assert count_rows(conn, month) == 0
+    assert partition_name(month) not in partition_names(conn)
+
+
+def test_delete_month_batches_and_drops_partition(conn: "Connection") -> None:
+    month = date(2001, 3, 1)
+    create_partition(conn, month, has_default=True)
+    insert_rows(conn, month, 5)
+    write_month(conn, month, fmt='ndjson', chunk_size=2)
+    engine = SavepointEngine(conn)
+
+    assert delete_month(engine, month, verify_month(month), batch_size=2) == 5
+    # Detached table lookup, three batches and the partition drop
+    assert engine.transactions == 5
+    assert count_rows(conn, month) == 0
+    assert partition_name(month) not in partition_names(conn)
+
+
+def test_delete_month_keeps_rows_missing_from_archive(conn: "Connection") -> None:
+    month = date(2001, 4, 1)
+    create_partition(conn, month, has_default=True)
+    insert_rows(conn, month, 3)
+    write_month(conn, month, fmt='ndjson', chunk_size=10)
+    manifest = verify_month(month)
+    # Created after the manifest was written
+    late = insert_rows(conn, month, 2)
+
+    with pytest.raises(ArchiveError, match='3 of 3 archived rows deleted, 2 rows missing'):
+        delete_month(SavepointEngine(conn), month, manifest, batch_size=10)
+    kept = conn.execute(text(f'SELECT id FROM public."{TABLE}" WHERE id = ANY(:ids)'), {
+        'ids': [row['id'] for row in late],
+    }).scalars().all()
+    assert set(kept) == {row['id'] for row in late}
+    assert count_rows(conn, month) == 2
+    assert partition_name(month) in partition_names(conn)
+
+
+def test_delete_month_detached_table(conn: "Connection") -> None:
+    month = date(2001, 5, 1)
+    schema, name = settings.TRANSACTION_ARCHIVE_SCHEMA, partition_name(month)
+    create_partition(conn, month, has_default=True)
+    insert_rows(conn, month, 3)
+    conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+    conn.execute(text(f'ALTER TABLE public."{TABLE}" DETACH PARTITION public."{name}"'))
+    conn.execute(text(f'ALTER TABLE public."{name}" SET SCHEMA "{schema}"'))
+    write_month(conn, month, fmt='ndjson', chunk_size=10)
+    manifest = verify_month(month)
+    engine = SavepointEngine(conn)
+
+    columns = ', '.join(column for column in COLUMNS if column != 'id')
+    late_id = conn.execute(text(f'''
+        INSERT INTO "{schema}"."{name}" (id, {columns})
+        SELECT gen_random_uuid(), {columns} FROM "{schema}"."{name}" LIMIT 1 RETURNING id
+    ''')).scalar()
+    with pytest.raises(ArchiveError, match='4 rows, 3 archived, table kept'):
+        delete_month(engine, month, manifest, batch_size=10)
+    assert detached_table(conn, month) is not None
+
+    conn.execute(text(f'DELETE FROM "{schema}"."{name}" WHERE id = :id'), {'id': late_id})
+    assert delete_month(engine, month, manifest, batch_size=10) == 0
+    assert detached_table(conn, month) is None
+
+
+@pytest.mark.asyncio
+async def test_export_archived_month_in_chunks(
+        monkeypatch: pytest.MonkeyPatch,
+        get_simple_user: Callable,
+        get_wallet: Callable,
+        async_db: "AsyncSession",
+) -> None:
+    month = date(2001, 6, 1)
+    user = await get_simple_user()
+    wallet = await get_wallet(user=user)
+    rows = [{**row, 'to_wallet_id': wallet.id} for row in make_rows(month, 5)]
+    write_archive(month, rows)
+
+    chunks = []
+    iterate_in_threadpool = export.iterate_in_threadpool
+
+    async def counting_iterate(iterator: Iterator[list]) -> AsyncIterator[list]:
+        async for chunk in iterate_in_threadpool(iterator):
+            chunks.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(export, 'READ_CHUNK_SIZE', 2)
+    monkeypatch.setattr(export, 'iterate_in_threadpool', counting_iterate)
+    start, end = month_bounds(month)
+    lines = [
+        line async for line in export_transaction_history(
+            async_db, user_id=user.id, created_from=start, created_to=end, include_archived=True,
+        )
+    ]
+
+    assert [orjson.loads(line)['id'] for line in lines] == [str(row['id']) for row in rows]
+    assert chunks == [2, 2, 1]
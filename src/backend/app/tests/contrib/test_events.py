@@ -0,0 +1,180 @@
+import asyncio
+
+import orjson
+import pytest
+from typing import TYPE_CHECKING, Callable
+from uuid import uuid4
+
+from app.conf.config import jwt_settings, settings
+from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction.events import get_user_channel, publish_transaction_status, stream_transaction_events
+from app.contrib.transaction.models import Transaction
+
+if TYPE_CHECKING:
+    from fakeredis import FakeRedis, FakeServer
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
+    from fastapi import FastAPI
+    from httpx import AsyncClient
+
+
+class DisconnectingRequest:
+    """Request which reports a disconnect once `disconnected` is set"""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def get_transaction(**kwargs) -> Transaction:
+    return Transaction(
+        id=uuid4(),
+        status=TransactionStatusChoices.COMPLETED.value,
+        transaction_type=TransactionTypeChoices.TRANSFER.value,
+        **kwargs,
+    )
+
+
+async def get_numsub(redis: "AsyncFakeRedis", channel: str) -> int:
+    return dict(await redis.pubsub_numsub(channel)).get(channel.encode(), 0)
+
+
+def test_publish_transaction_status(redis: "FakeRedis") -> None:
+    sender, receiver = uuid4(), uuid4()
+    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(get_user_channel(sender), get_user_channel(receiver))
+    transaction = get_transaction(from_wallet_id=uuid4(), to_wallet_id=uuid4())
+
+    publish_transaction_status(redis, transaction, user_ids=(sender, receiver, sender, None))
+
+    # Subscribe confirmations are read as None
+    messages = [message for message in (pubsub.get_message(timeout=0.1) for _ in range(5)) if message]
+    assert sorted(message['channel'].decode() for message in messages) == sorted(
+        (get_user_channel(sender), get_user_channel(receiver))
+    )
+    assert orjson.loads(messages[0]['data']) == {
+        'id': str(transaction.id),
+        'status': 'completed',
+        'transactionType': 'transfer',
+        'toWalletId': str(transaction.to_wallet_id),
+        'fromWalletId': str(transaction.from_wallet_id),
+    }
+
+
+def test_publish_transaction_status_redis_error(redis: "FakeRedis", redis_server: "FakeServer") -> None:
+    redis_server.connected = False
+
+    # Called after the commit, the task must not fail
+    publish_transaction_status(redis, get_transaction(), user_ids=(uuid4(),))
+
+
+@pytest.mark.asyncio
+async def test_stream_transaction_events(redis: "FakeRedis", async_redis: "AsyncFakeRedis") -> None:
+    user_id = uuid4()
+    channel = get_user_channel(user_id)
+    request = DisconnectingRequest()
+    events = stream_transaction_events(request, async_redis, user_id=user_id, heartbeat=0)
+
+    assert await events.__anext__() == ': keep-alive\n\n'
+    assert await get_numsub(async_redis, channel) == 1
+
+    transaction = get_transaction()
+    publish_transaction_status(redis, transaction, user_ids=(user_id,))
+    event = await events.__anext__()
+    assert event.startswith('event: transaction\ndata: {')
+    assert event.endswith('}\n\n')
+    assert orjson.loads(event.split('data: ', 1)[1])['id'] == str(transaction.id)
+
+    request.disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await events.__anext__()
+    assert await get_numsub(async_redis, channel) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_transaction_events_heartbeat(async_redis: "AsyncFakeRedis") -> None:
+    request = DisconnectingRequest()
+    events = stream_transaction_events(request, async_redis, user_id=uuid4(), heartbeat=60)
+
+    async def disconnect() -> None:
+        await asyncio.sleep(1.5)
+        request.disconnected = True
+
+    task = asyncio.create_task(disconnect())
+    # Nothing is sent before the heartbeat is due
+    assert [event async for event in events] == []
+    await task
+
+
+@pytest.mark.asyncio
+async def test_transaction_events_api(
+        application: "FastAPI",
+        async_client: "AsyncClient",
+        redis: "FakeRedis",
+        redis_server: "FakeServer",
+        get_simple_user: Callable,
+        get_token_headers: Callable,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
+
+    # Like the application client, with decoded responses
+    async_redis = AsyncFakeRedis(server=redis_server, decode_responses=True)
+    monkeypatch.setattr(application, 'aioredis_instance', async_redis)
+    user = await get_simple_user()
+    channel = get_user_channel(user.id)
+    token_headers = get_token_headers(user, jwt_settings.JWT_AUDIENCE)
+    transaction = get_transaction()
+
+    messages = []
+    event_received = asyncio.Event()
+
+    async def publish() -> None:
+        # Once the stream subscribed
+        while dict(await async_redis.pubsub_numsub(channel)).get(channel, 0) == 0:
+            await asyncio.sleep(0.01)
+        publish_transaction_status(redis, transaction, user_ids=(user.id,))
+
+    async def receive() -> dict:
+        if not messages:
+            messages.append(None)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await event_received.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+        if message.get('body', b'').startswith(b'event: transaction'):
+            event_received.set()
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'server': ('test', 80),
+        'path': f'{settings.API_V1_STR}/transaction/events/',
+        'raw_path': f'{settings.API_V1_STR}/transaction/events/'.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in token_headers.items()],
+    }
+    publisher = asyncio.create_task(publish())
+    await asyncio.wait_for(application(scope, receive, send), timeout=10)
+    await publisher
+
+    start = messages[1]
+    assert start['status'] == 200
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in start['headers']
+    bodies = [message['body'] for message in messages[2:] if message.get('body')]
+    assert bodies[0] == b'event: transaction\ndata: ' + orjson.dumps({
+        'id': str(transaction.id),
+        'status': 'completed',
+        'transactionType': 'transfer',
+        'toWalletId': None,
+        'fromWalletId': None,
+    }) + b'\n\n'
+    # Unsubscribed after the client went away
+    assert dict(await async_redis.pubsub_numsub(channel)).get(channel, 0) == 0
@@ -0,0 +1,48 @@
+import pytest
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.contrib.transaction import TransactionTypeChoices
+from app.contrib.transaction.models import Transaction
+from app.contrib.transaction.partitions import DEFAULT_PARTITION, create_partition, list_partitions, partition_name
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+
+@pytest.mark.asyncio
+async def test_create_partition_moves_default_rows(async_db: "AsyncSession") -> None:
+    month = date(2100, 1, 1)
+    name = partition_name(month)
+    row_id = uuid4()
+
+    def run(session: "Session") -> list:
+        conn = session.connection()
+        # No partition of the month yet, the row lands in the default one
+        conn.execute(Transaction.__table__.insert().values(
+            id=row_id,
+            created_at=datetime(2100, 1, 15, tzinfo=timezone.utc),
+            total_amount=10,
+            transaction_type=TransactionTypeChoices.TRANSFER,
+        ))
+        create_partition(conn, month, has_default=True)
+        return [
+            [partition.name for partition in list_partitions(conn)],
+            conn.execute(text(f'select count(*) from public."{name}" where id = :id'), {'id': row_id}).scalar(),
+            conn.execute(text(f'select count(*) from public."{DEFAULT_PARTITION}" where id = :id'), {'id': row_id}).scalar(),
+        ]
+
+    savepoint = await async_db.begin_nested()
+    try:
+        partitions, in_partition, in_default = await async_db.run_sync(run)
+    finally:
+        await savepoint.rollback()
+
+    assert name in partitions
+    assert DEFAULT_PARTITION in partitions
+    assert in_partition == 1
+    assert in_default == 0
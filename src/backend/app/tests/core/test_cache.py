@@ -0,0 +1,100 @@
+import pytest
+from typing import TYPE_CHECKING, Callable
+from uuid import uuid4
+
+from starlette.requests import Request
+
+from app.core.cache import ResponseCache
+
+if TYPE_CHECKING:
+    from fakeredis import FakeRedis
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
+
+
+def get_request(headers: dict = None) -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/api/v1/wallet/',
+        'query_string': b'limit=10&offset=0',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+def get_render(content: dict, before: Callable = None) -> Callable:
+    async def render() -> dict:
+        render.calls += 1
+        if before is not None:
+            await before()
+        return content
+
+    render.calls = 0
+    return render
+
+
+@pytest.fixture
+def cache() -> ResponseCache:
+    return ResponseCache(f'cache:test:{uuid4().hex}', ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_hit_after_store(cache: ResponseCache, async_redis: "AsyncFakeRedis") -> None:
+    render = get_render({'rows': [1, 2]})
+
+    response = await cache.response(get_request(), async_redis, user_id=1, render=render)
+    cached = await cache.response(get_request(), async_redis, user_id=1, render=render)
+
+    assert render.calls == 1
+    assert cached.body == response.body == b'{"rows":[1,2]}'
+    assert cached.headers['etag'] == response.headers['etag']
+
+    not_modified = await cache.response(
+        get_request({'If-None-Match': response.headers['etag']}), async_redis, user_id=1, render=render,
+    )
+    assert not_modified.status_code == 304
+    assert render.calls == 1
+
+    # Other users have their own entries
+    await cache.response(get_request(), async_redis, user_id=2, render=render)
+    assert render.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_miss_after_invalidate(
+        cache: ResponseCache, redis: "FakeRedis", async_redis: "AsyncFakeRedis",
+) -> None:
+    render = get_render({'rows': []})
+    await cache.response(get_request(), async_redis, user_id=1, render=render)
+    await cache.response(get_request(), async_redis, user_id=2, render=render)
+
+    cache.invalidate(redis, [1])
+    await cache.response(get_request(), async_redis, user_id=1, render=render)
+    await cache.response(get_request(), async_redis, user_id=2, render=render)
+    assert render.calls == 3
+
+    await cache.ainvalidate(async_redis, [1, 2, None])
+    await cache.response(get_request(), async_redis, user_id=1, render=render)
+    await cache.response(get_request(), async_redis, user_id=2, render=render)
+    assert render.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_store_skipped_after_generation_change(
+        cache: ResponseCache, redis: "FakeRedis", async_redis: "AsyncFakeRedis",
+) -> None:
+    async def write() -> None:
+        # A write commits while the stale content is rendered
+        cache.invalidate(redis, [1])
+
+    stale = get_render({'status': 'processing'}, before=write)
+    response = await cache.response(get_request(), async_redis, user_id=1, render=stale)
+    assert response.body == b'{"status":"processing"}'
+    assert not await async_redis.hgetall(f'{cache.namespace}:1')
+
+    fresh = get_render({'status': 'completed'})
+    response = await cache.response(get_request(), async_redis, user_id=1, render=fresh)
+    assert response.body == b'{"status":"completed"}'
+    assert fresh.calls == 1
+    # Stored under the new generation
+    await cache.response(get_request(), async_redis, user_id=1, render=fresh)
+    assert fresh.calls == 1
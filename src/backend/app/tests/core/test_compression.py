@@ -0,0 +1,187 @@
+import gzip
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.testclient import TestClient
+
+from app.core.compression import ENCODINGS, CompressionMiddleware, is_compressible, negotiate
+from app.core.staticfiles import PrecompressedStaticFiles, precompress
+
+BODY = '{"rows": [%s]}' % ', '.join(['{"id": 1, "status": "completed"}'] * 100)
+
+
+def get_client(routes: list, **kwargs) -> TestClient:
+    app = Starlette(routes=routes)
+    return TestClient(CompressionMiddleware(app, encodings=['gzip'], minimum_size=512, **kwargs))
+
+
+async def json_endpoint(request):
+    return Response(BODY, media_type='application/json', headers={'ETag': '"v1"'})
+
+
+async def small_endpoint(request):
+    return Response('{"id": 1}', media_type='application/json')
+
+
+async def stream_endpoint(request):
+    async def rows():
+        for _ in range(10):
+            yield BODY
+
+    return StreamingResponse(rows(), media_type='application/x-ndjson')
+
+
+async def events_endpoint(request):
+    async def events():
+        yield 'data: ' + 'x' * 1024 + '\n\n'
+
+    return StreamingResponse(events(), media_type='text/event-stream')
+
+
+async def encoded_endpoint(request):
+    return Response(gzip.compress(BODY.encode()), media_type='application/json', headers={'Content-Encoding': 'gzip'})
+
+
+ROUTES = [
+    Route('/json', json_endpoint),
+    Route('/small', small_endpoint),
+    Route('/stream', stream_endpoint),
+    Route('/events', events_endpoint),
+    Route('/encoded', encoded_endpoint),
+    Route('/static/file', json_endpoint),
+]
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, br, zstd', 'zstd'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0.8, zstd;q=0.8', 'zstd'),
+    ('*', 'zstd'),
+    ('*;q=0.5, zstd;q=0', 'br'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('', None),
+])
+def test_negotiate(accept_encoding: str, expected: str) -> None:
+    if expected is not None and expected not in ENCODINGS:
+        pytest.skip(f'{expected} is not installed')
+    encodings = [ENCODINGS[name] for name in ('zstd', 'br', 'gzip') if name in ENCODINGS]
+
+    encoding = negotiate(accept_encoding, encodings)
+
+    assert (encoding and encoding.name) == expected
+
+
+@pytest.mark.parametrize('content_type, expected', [
+    ('application/json', True),
+    ('text/html; charset=utf-8', True),
+    ('application/problem+json', True),
+    ('text/event-stream', False),
+    ('image/png', False),
+    ('', False),
+])
+def test_is_compressible(content_type: str, expected: bool) -> None:
+    assert is_compressible(content_type) is expected
+
+
+def test_compresses_response() -> None:
+    client = get_client(ROUTES)
+
+    response = client.get('/json', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < len(BODY)
+    assert response.text == BODY
+    # The encoded bytes differ from the identity ones, the version does not
+    assert response.headers['etag'] == 'W/"v1"'
+
+
+@pytest.mark.parametrize('path, accept_encoding', [
+    ('/small', 'gzip'),
+    ('/json', 'gzip;q=0'),
+    ('/json', 'identity'),
+    ('/events', 'gzip'),
+    ('/static/file', 'gzip'),
+])
+def test_passes_through(path: str, accept_encoding: str) -> None:
+    client = get_client(ROUTES, exclude_paths=['/static'])
+
+    response = client.get(path, headers={'Accept-Encoding': accept_encoding})
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers.get('etag') in (None, '"v1"')
+
+
+def test_keeps_encoded_response() -> None:
+    client = get_client(ROUTES)
+
+    response = client.get('/encoded', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.text == BODY
+
+
+def test_compresses_streaming_response() -> None:
+    client = get_client(ROUTES)
+
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert response.text == BODY * 10
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("compressed");\n' * 100)
+    (tmp_path / 'logo.png').write_bytes(os.urandom(1024))
+    list(precompress(tmp_path, minimum_size=256))
+    return tmp_path
+
+
+def get_static_client(directory) -> TestClient:
+    return TestClient(Starlette(routes=[
+        Mount('/static', PrecompressedStaticFiles(directory=directory, encodings=['gzip']), name='static'),
+    ]))
+
+
+def test_precompress(static_dir) -> None:
+    assert (static_dir / 'app.js.gz').exists()
+    # Not compressible
+    assert not (static_dir / 'logo.png.gz').exists()
+    assert gzip.decompress((static_dir / 'app.js.gz').read_bytes()) == (static_dir / 'app.js').read_bytes()
+
+
+def test_static_files_serve_precompressed(static_dir) -> None:
+    client = get_static_client(static_dir)
+
+    response = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) == (static_dir / 'app.js.gz').stat().st_size
+    assert response.text == (static_dir / 'app.js').read_text()
+
+    etag = response.headers['etag']
+    response = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    response = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['etag'] != etag
+
+
+def test_static_files_skip_stale_variant(static_dir) -> None:
+    source = static_dir / 'app.js'
+    stat_result = source.stat()
+    os.utime(static_dir / 'app.js.gz', (stat_result.st_atime, stat_result.st_mtime - 10))
+    client = get_static_client(static_dir)
+
+    response = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'content-encoding' not in response.headers
+    assert response.text == source.read_text()
@@ -0,0 +1,160 @@
+import pytest
+from typing import TYPE_CHECKING
+
+from app.core.exceptions import ImproperlyConfigured
+from app.core.ratelimit import LocalAllowance, Rate, RateLimiter, parse_rate
+
+if TYPE_CHECKING:
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeRedis as AsyncFakeRedis
+
+
+class CountingRedis:
+    """Counts the script calls which reach Redis"""
+
+    def __init__(self, redis: "AsyncFakeRedis"):
+        self.redis = redis
+        self.calls = []
+
+    async def eval(self, script: str, numkeys: int, *args):
+        self.calls.append(args)
+        return await self.redis.eval(script, numkeys, *args)
+
+
+@pytest.fixture
+def counting_redis(async_redis: "AsyncFakeRedis") -> CountingRedis:
+    return CountingRedis(async_redis)
+
+
+async def get_tokens(redis: "AsyncFakeRedis", key: str) -> float:
+    return float(await redis.hget(key, 'tokens'))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('10/minute', Rate(10, 60)),
+    ('100/hours', Rate(100, 3600)),
+    ('5 / Second', Rate(5, 1)),
+])
+def test_parse_rate(value: str, expected: Rate) -> None:
+    assert parse_rate(value) == expected
+
+
+@pytest.mark.parametrize('value', ['10', 'ten/minute', '10/fortnight', '0/minute'])
+def test_parse_rate_invalid(value: str) -> None:
+    with pytest.raises(ImproperlyConfigured):
+        parse_rate(value)
+
+
+@pytest.mark.asyncio
+async def test_limit(counting_redis: CountingRedis) -> None:
+    limiter = RateLimiter(local_share=0)
+    rate = Rate(count=2, period=60)
+
+    decisions = [await limiter.hit(counting_redis, 'login', 'ip:1', rate) for _ in range(3)]
+
+    assert [decision.allowed for decision in decisions] == [True, True, False]
+    assert [decision.remaining for decision in decisions] == [1, 0, 0]
+    # One token refills in 30 seconds, rounded up to whole seconds
+    assert 29 <= decisions[2].retry_after <= 30
+    assert len(counting_redis.calls) == 3
+    # Other clients have their own buckets
+    assert (await limiter.hit(counting_redis, 'login', 'ip:2', rate)).allowed
+
+
+@pytest.mark.asyncio
+async def test_retry_after_rounds_up(counting_redis: CountingRedis) -> None:
+    limiter = RateLimiter(local_share=0)
+    rate = Rate(count=10, period=1)
+    await limiter.hit(counting_redis, 'api', 'ip:1', rate, cost=10)
+
+    decision = await limiter.hit(counting_redis, 'api', 'ip:1', rate)
+
+    # A token refills in 100 milliseconds, reported as a second
+    assert not decision.allowed
+    assert decision.retry_after == 1
+
+
+@pytest.mark.asyncio
+async def test_local_spending_and_debt(counting_redis: CountingRedis, async_redis: "AsyncFakeRedis") -> None:
+    limiter = RateLimiter(prefix='rl', local_share=0.1, local_ttl=60)
+    rate = Rate(count=100, period=3600)
+    key = 'rl:api:user:1'
+
+    decision = await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    assert decision.allowed and decision.remaining == 99
+    # A tenth of the remaining tokens is spent without Redis
+    assert limiter._local[key].budget == 9
+
+    for remaining in range(8, -1, -1):
+        decision = await limiter.hit(counting_redis, 'api', 'user:1', rate)
+        assert decision.allowed and decision.remaining == remaining
+    assert len(counting_redis.calls) == 1
+    assert limiter._local[key].pending == 9
+    assert round(await get_tokens(async_redis, key)) == 99
+
+    # The budget is used up, the next call charges the tokens spent locally
+    decision = await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    assert len(counting_redis.calls) == 2
+    assert counting_redis.calls[1][-1] == 9
+    assert decision.remaining == 89
+    assert round(await get_tokens(async_redis, key)) == 89
+    assert limiter._local[key].pending == 0
+
+
+@pytest.mark.asyncio
+async def test_no_local_budget_for_small_rates(counting_redis: CountingRedis) -> None:
+    limiter = RateLimiter(local_share=0.1, local_ttl=60)
+    rate = Rate(count=5, period=60)
+
+    for _ in range(3):
+        await limiter.hit(counting_redis, 'account-token', 'ip:1', rate)
+
+    # floor(4 * 0.1) == 0, every request goes to Redis
+    assert len(counting_redis.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_local_allowance_expires(counting_redis: CountingRedis) -> None:
+    limiter = RateLimiter(prefix='rl', local_share=0.5, local_ttl=0)
+    rate = Rate(count=100, period=60)
+
+    await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    await limiter.hit(counting_redis, 'api', 'user:1', rate)
+
+    assert len(counting_redis.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_allow_on_redis_error(
+        counting_redis: CountingRedis, async_redis: "AsyncFakeRedis", redis_server: "FakeServer",
+) -> None:
+    limiter = RateLimiter(prefix='rl', local_share=0.5, local_ttl=60)
+    rate = Rate(count=10, period=60)
+    key = 'rl:api:user:1'
+    await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    for _ in range(4):
+        await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    assert limiter._local[key].pending == 4
+
+    redis_server.connected = False
+    decision = await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    assert decision.allowed and decision.remaining == rate.count
+    # The debt is kept for the next call which reaches Redis
+    assert limiter._local[key].pending == 4
+
+    redis_server.connected = True
+    decision = await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    assert counting_redis.calls[-1][-1] == 4
+    assert decision.remaining == 4
+
+
+@pytest.mark.asyncio
+async def test_prune(counting_redis: CountingRedis) -> None:
+    limiter = RateLimiter(local_share=0.5, local_ttl=60, max_local_entries=2)
+    limiter._local['expired'] = LocalAllowance(budget=1, pending=0, expires=0)
+    rate = Rate(count=10, period=60)
+
+    await limiter.hit(counting_redis, 'api', 'user:1', rate)
+    await limiter.hit(counting_redis, 'api', 'user:2', rate)
+
+    assert set(limiter._local) == {'ratelimit:api:user:1', 'ratelimit:api:user:2'}
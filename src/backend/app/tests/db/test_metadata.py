@@ -0,0 +1,74 @@
+import pytest
+from typing import TYPE_CHECKING, Callable
+from uuid import uuid4
+
+from app.contrib.transaction import TransactionStatusChoices, TransactionTypeChoices
+from app.contrib.transaction.repository import transaction_repo
+from app.contrib.wallet.repository import wallet_repo
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.mark.asyncio
+async def test_store_value_in_metadata(
+        async_db: "AsyncSession",
+        get_simple_user: Callable,
+        get_wallet: Callable,
+) -> None:
+    wallet = await get_wallet(user=await get_simple_user())
+
+    await wallet_repo.store_value_in_metadata(async_db, obj_id=wallet.id, items={'a': 1, 'b': {'c': 2}})
+    await wallet_repo.store_value_in_metadata(async_db, obj_id=wallet.id, items={'a': 3})
+    await wallet_repo.store_value_in_metadata(async_db, obj_id=wallet.id, items={'secret': 1}, private=True)
+    await async_db.refresh(wallet)
+
+    assert wallet.public_metadata == {'a': 3, 'b': {'c': 2}}
+    assert wallet.private_metadata == {'secret': 1}
+
+
+@pytest.mark.asyncio
+async def test_set_and_delete_metadata_value(
+        async_db: "AsyncSession",
+        get_simple_user: Callable,
+        get_wallet: Callable,
+) -> None:
+    wallet = await get_wallet(user=await get_simple_user())
+    transaction = await transaction_repo.create(async_db, obj_in={
+        'to_wallet_id': wallet.id,
+        'transaction_type': TransactionTypeChoices.REPLENISHMENT.value,
+        'total_amount': 200,
+        'currency': 'USD',
+        'status': TransactionStatusChoices.PROCESSING.value,
+    })
+
+    await transaction_repo.store_value_in_metadata(async_db, obj_id=transaction.id, items={'a': 1, 'b': {'c': 2}})
+    await transaction_repo.set_metadata_value(async_db, obj_id=transaction.id, path=['b', 'c'], value=[5])
+    await transaction_repo.set_metadata_value(async_db, obj_id=transaction.id, path=['d'], value='x')
+    await transaction_repo.delete_value_from_metadata(async_db, obj_id=transaction.id, key='a')
+    await transaction_repo.delete_value_from_metadata(async_db, obj_id=transaction.id, key='missing')
+    await async_db.refresh(transaction)
+
+    assert transaction.public_metadata == {'b': {'c': [5]}, 'd': 'x'}
+    assert transaction.private_metadata == {}
+
+
+@pytest.mark.asyncio
+async def test_filter_by_metadata(
+        async_db: "AsyncSession",
+        get_simple_user: Callable,
+        get_wallet: Callable,
+) -> None:
+    tag = uuid4().hex
+    wallet = await get_wallet(user=await get_simple_user())
+    other = await get_wallet(user=await get_simple_user())
+    await wallet_repo.store_value_in_metadata(async_db, obj_id=wallet.id, items={'tag': tag, 'n': 1})
+    await wallet_repo.store_value_in_metadata(async_db, obj_id=other.id, items={'tag': tag, 'n': 2})
+
+    wallets = await wallet_repo.filter_by_metadata(async_db, items={'tag': tag})
+    assert {item.id for item in wallets} == {wallet.id, other.id}
+
+    wallets = await wallet_repo.filter_by_metadata(async_db, items={'tag': tag, 'n': 2})
+    assert [item.id for item in wallets] == [other.id]
+
+    assert await wallet_repo.filter_by_metadata(async_db, items={'tag': tag}, private=True) == []
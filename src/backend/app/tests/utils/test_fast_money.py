@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+import pytest
+
+from app.utils.prices import FastMoney, Money
+
+AMOUNTS = [Decimal('0.01'), Decimal('10.25'), Decimal('-3.10'), Decimal('90000000000.00'), Decimal('0')]
+
+
+@pytest.mark.parametrize('amount', AMOUNTS)
+def test_money_round_trip(amount: Decimal) -> None:
+    money = Money(amount, 'USD').quantize()
+
+    fast = FastMoney.from_money(money)
+
+    assert fast.to_money() == money
+    assert fast.amount == money.amount
+
+
+@pytest.mark.parametrize('currency, amount, minor', [('USD', '12.34', 1234), ('JPY', '1234', 1234), ('BHD', '1.234', 1234)])
+def test_minor_units(currency: str, amount: str, minor: int) -> None:
+    assert FastMoney.from_money(Money(Decimal(amount), currency)).minor == minor
+
+
+def test_from_money_lost_digits() -> None:
+    with pytest.raises(ValueError):
+        FastMoney.from_money(Money(Decimal('1.005'), 'USD'))
+
+
+def test_requires_int() -> None:
+    with pytest.raises(TypeError):
+        FastMoney(Decimal('1.5'), 'USD')
+
+
+def test_arithmetic_matches_money() -> None:
+    values = [Money(amount, 'USD') for amount in AMOUNTS]
+    fast = [FastMoney.from_money(value) for value in values]
+
+    assert sum(fast[1:], fast[0]).to_money() == sum(values[1:], values[0])
+    for a, b, fast_a, fast_b in zip(values, values[1:], fast, fast[1:]):
+        assert (fast_a - fast_b).to_money() == a - b
+        assert (fast_a < fast_b) == (a < b)
+        assert (fast_a <= fast_b) == (a <= b)
+        assert (fast_a * 3).to_money() == a * 3
+        assert fast_a * Decimal('0.5') == a * Decimal('0.5')
+
+
+def test_currency_mismatch() -> None:
+    usd, eur = FastMoney(100, 'USD'), FastMoney(100, 'EUR')
+    with pytest.raises(ValueError):
+        usd + eur
+    with pytest.raises(ValueError):
+        usd - eur
+    with pytest.raises(ValueError):
+        usd < eur
+    assert usd != eur
+
+
+def test_division() -> None:
+    assert FastMoney(300, 'USD') / FastMoney(100, 'USD') == Decimal(3)
+    assert FastMoney(300, 'USD') / 4 == Money(Decimal('0.75'), 'USD')
+
+
+def test_quantize() -> None:
+    fast = FastMoney(1234, 'USD')
+
+    assert fast.quantize() is fast
+    assert fast.quantize(Decimal('1')) == FastMoney(1200, 'USD')
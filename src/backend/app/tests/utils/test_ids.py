@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid1, uuid4
+
+from app.utils.ids import uuid7, uuid7_time
+
+
+def test_uuid7_version() -> None:
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == 'specified in RFC 4122'
+
+
+def test_uuid7_time_round_trip() -> None:
+    before = datetime.now(timezone.utc) - timedelta(milliseconds=1)
+    value = uuid7()
+    after = datetime.now(timezone.utc) + timedelta(milliseconds=1)
+
+    created_at = uuid7_time(value)
+    assert before <= created_at <= after
+    assert created_at.microsecond % 1000 == 0
+    assert uuid7_time(str(value)) == created_at
+
+
+def test_uuid7_sorts_by_time() -> None:
+    values = [uuid7() for _ in range(100)]
+
+    assert [uuid7_time(value) for value in values] == sorted(uuid7_time(value) for value in values)
+
+
+def test_uuid7_time_other_versions() -> None:
+    assert uuid7_time(uuid4()) is None
+    assert uuid7_time(str(uuid1())) is None
@@ -0,0 +1,94 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.utils.prices import Money, flat_tax, percentage_discount
+from app.utils.prices.money_column import MoneyColumn
+
+np = pytest.importorskip('numpy')
+
+CURRENCIES = ['USD', 'EUR', 'JPY', 'BHD']
+LARGE_AMOUNTS = [Decimal('90000000000.00'), Decimal('-90000000000.00'), Decimal('92233720368547758.07')]
+PERCENTAGES = [0, 15, 100, Decimal('12.5'), Decimal('12.3456789'), Decimal('0.0000001'), Decimal('99.9999999')]
+TAX_RATES = [Decimal('0'), Decimal('0.18'), Decimal('0.0725'), Decimal('0.123456789')]
+
+
+def get_amounts(count: int = 200) -> list:
+    rng = random.Random(0)
+    amounts = []
+    for _ in range(count):
+        currency = rng.choice(CURRENCIES)
+        minor = rng.randint(0, 10 ** rng.randint(1, 12))
+        digits = {'JPY': 0, 'BHD': 3}.get(currency, 2)
+        amounts.append(Money(Decimal(minor).scaleb(-digits), currency))
+    return amounts
+
+
+@pytest.mark.parametrize('percentage', PERCENTAGES)
+def test_percentage_discount_matches_scalar(percentage) -> None:
+    values = get_amounts() + [Money(amount, 'USD') for amount in LARGE_AMOUNTS if amount > 0]
+    column = MoneyColumn.from_money(values)
+
+    result = column.percentage_discount(percentage).to_money()
+
+    assert result == [percentage_discount(value, percentage) for value in values]
+
+
+@pytest.mark.parametrize('tax_rate', TAX_RATES)
+@pytest.mark.parametrize('keep_gross', [False, True])
+def test_flat_tax_matches_scalar(tax_rate: Decimal, keep_gross: bool) -> None:
+    values = get_amounts() + [Money(Decimal('90000000000.00'), 'USD'), Money(Decimal('-12.35'), 'USD')]
+    column = MoneyColumn.from_money(values)
+
+    net, gross = column.flat_tax(tax_rate, keep_gross=keep_gross)
+
+    expected = [flat_tax(value, tax_rate, keep_gross=keep_gross) for value in values]
+    assert net.to_money() == [value.net for value in expected]
+    assert gross.to_money() == [value.gross for value in expected]
+
+
+def test_large_amount_discount_does_not_overflow() -> None:
+    column = MoneyColumn.from_amounts([Decimal('90000000000.00')], ['USD'])
+
+    result = column.percentage_discount(Decimal('12.3456789'))
+
+    assert result[0] == Money(Decimal('78888888990.00'), 'USD')
+
+
+def test_result_out_of_int64_raises() -> None:
+    column = MoneyColumn.from_amounts([Decimal('92233720368547758.07')], ['USD'])
+
+    with pytest.raises(OverflowError):
+        column.flat_tax(Decimal('0.5'))
+
+
+def test_group_aggregates() -> None:
+    values = get_amounts()
+    column = MoneyColumn.from_money(values)
+
+    for currency in CURRENCIES:
+        amounts = [value for value in values if value.currency == currency]
+        assert column.group_sum()[currency] == sum(amounts[1:], amounts[0])
+        assert column.group_min()[currency] == min(amounts)
+        assert column.group_max()[currency] == max(amounts)
+
+
+def test_from_amounts_lost_digits() -> None:
+    with pytest.raises(ValueError):
+        MoneyColumn.from_amounts([Decimal('1.005')], ['USD'])
+
+
+def test_from_amounts_unequal_lengths() -> None:
+    with pytest.raises(ValueError):
+        MoneyColumn.from_amounts([Decimal('1.00'), Decimal('2.00')], ['USD'])
+
+
+def test_group_sum_beyond_int64() -> None:
+    amount = Decimal('92233720368547758.07')
+    column = MoneyColumn.from_amounts([amount, amount, Decimal('-1.00'), Decimal('5')], ['USD', 'USD', 'USD', 'JPY'])
+
+    assert column.group_sum() == {
+        'USD': Money(amount * 2 - 1, 'USD'),
+        'JPY': Money(Decimal('5'), 'JPY'),
+    }
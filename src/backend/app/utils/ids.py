@@ -0,0 +1,33 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+from uuid import UUID
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def uuid7() -> UUID:
+    """
+    Time-ordered UUID (version 7): 48 bits of unix time in milliseconds
+    followed by random bits, so consecutive ids sort by creation time.
+    """
+    milliseconds = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    value = (milliseconds & (1 << 48) - 1) << 80
+    value |= 0x7 << 76
+    value |= (random_bits >> 62 & 0xfff) << 64
+    value |= 0b10 << 62
+    value |= random_bits & (1 << 62) - 1
+    return UUID(int=value)
+
+
+def uuid7_time(value: Union[UUID, str]) -> Optional[datetime]:
+    """
+    Creation time encoded in a version 7 UUID, None for other versions
+    """
+    if isinstance(value, str):
+        value = UUID(value)
+    if value.version != 7:
+        return None
+    return EPOCH + timedelta(milliseconds=value.int >> 80)
@@ -3,8 +3,10 @@
 Provides a Pythonic interface to deal with money types such as money amounts,
 prices, discounts and taxes.
 """
+from .currency import CurrencyInfo, get_currency
 from .discount import (
     fixed_discount, fractional_discount, percentage_discount)
+from .fast_money import FastMoney
 from .money import Money
 from .money_range import MoneyRange
 from .tax import flat_tax
@@ -13,5 +15,6 @@ from .taxed_money_range import TaxedMoneyRange
 from .utils import sum
 
 __all__ = [
-    'Money', 'MoneyRange', 'TaxedMoney', 'TaxedMoneyRange', 'fixed_discount',
-    'flat_tax', 'fractional_discount', 'percentage_discount', 'sum']
+    'CurrencyInfo', 'FastMoney', 'Money', 'MoneyRange', 'TaxedMoney',
+    'TaxedMoneyRange', 'fixed_discount', 'flat_tax', 'fractional_discount',
+    'get_currency', 'percentage_discount', 'sum']
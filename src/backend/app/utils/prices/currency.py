@@ -0,0 +1,45 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, NamedTuple
+
+from babel.numbers import get_currency_precision, get_currency_symbol
+
+DEFAULT_ROUNDING = ROUND_HALF_UP
+SYMBOL_LOCALE = 'en_US'
+
+
+class CurrencyInfo(NamedTuple):
+    """Currency metadata needed by the pricing functions."""
+
+    code: str
+    digits: int
+    exponent: Decimal
+    rounding: str
+    symbol: str
+
+
+_registry: Dict[str, CurrencyInfo] = {}
+
+
+def _build_currency(code: str) -> CurrencyInfo:
+    digits = get_currency_precision(code)
+    return CurrencyInfo(
+        code=code,
+        digits=digits,
+        exponent=Decimal(1).scaleb(-digits),
+        rounding=DEFAULT_ROUNDING,
+        symbol=get_currency_symbol(code, locale=SYMBOL_LOCALE),
+    )
+
+
+def get_currency(code: str) -> CurrencyInfo:
+    """Return metadata of the currency, built from Babel on first access."""
+    try:
+        return _registry[code]
+    except KeyError:
+        info = _registry[code] = _build_currency(code)
+        return info
+
+
+def get_currency_exponent(code: str) -> int:
+    """Return the number of minor unit digits of the currency."""
+    return get_currency(code).digits
@@ -0,0 +1,132 @@
+from __future__ import division, unicode_literals
+
+from decimal import Decimal
+from typing import Union, overload
+
+from .currency import get_currency_exponent
+from .money import Money
+
+Numeric = Union[int, Decimal]
+
+
+class FastMoney:
+    """An amount of a particular currency stored as integer minor units.
+
+    Addition, subtraction and comparison only touch integers, which makes
+    the type suitable for aggregating balances in tight loops. Operations
+    that can produce fractions of a minor unit (multiplication by a
+    non-integer, division) return `Money` instead.
+    """
+
+    __slots__ = ('minor', 'currency')
+
+    def __init__(self, minor: int, currency: str) -> None:
+        if not isinstance(minor, int):
+            raise TypeError(
+                'FastMoney requires an integer amount of minor units, got %r' % (
+                    minor,))
+        self.minor = minor
+        self.currency = currency
+
+    @classmethod
+    def from_money(cls, money: Money) -> 'FastMoney':
+        """Convert `Money` without loss, raise ValueError otherwise."""
+        digits = get_currency_exponent(money.currency)
+        scaled = money.amount.scaleb(digits)
+        minor = int(scaled)
+        if minor != scaled:
+            raise ValueError(
+                'Cannot represent %r in minor units of %r' % (
+                    money, money.currency))
+        return cls(minor, money.currency)
+
+    def to_money(self) -> Money:
+        """Return an equal `Money` quantized to the currency exponent."""
+        digits = get_currency_exponent(self.currency)
+        return Money(Decimal(self.minor).scaleb(-digits), self.currency)
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-get_currency_exponent(self.currency))
+
+    def __repr__(self) -> str:
+        return 'FastMoney(%r, %r)' % (self.minor, self.currency)
+
+    def __str__(self):
+        return f'{self.amount} {self.currency}'
+
+    def __lt__(self, other: 'FastMoney') -> bool:
+        if isinstance(other, FastMoney):
+            if self.currency != other.currency:
+                raise ValueError(
+                    'Cannot compare amounts in %r and %r' % (
+                        self.currency, other.currency))
+            return self.minor < other.minor
+        return NotImplemented
+
+    def __le__(self, other: 'FastMoney') -> bool:
+        if self == other:
+            return True
+        return self < other
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FastMoney):
+            return (
+                    self.minor == other.minor and
+                    self.currency == other.currency)
+        return False
+
+    def __mul__(self, other: Numeric):
+        if isinstance(other, int) and not isinstance(other, bool):
+            return FastMoney(self.minor * other, self.currency)
+        return self.to_money() * other
+
+    def __rmul__(self, other: Numeric):
+        return self * other
+
+    @overload
+    def __truediv__(self, other: 'FastMoney') -> Decimal:
+        ...  # pragma: no cover
+
+    @overload
+    def __truediv__(self, other: Numeric) -> Money:
+        ...  # pragma: no cover
+
+    def __truediv__(self, other):
+        if isinstance(other, FastMoney):
+            if self.currency != other.currency:
+                raise ValueError(
+                    'Cannot divide amounts in %r and %r' % (
+                        self.currency, other.currency))
+            return Decimal(self.minor) / Decimal(other.minor)
+        return self.to_money() / other
+
+    def __add__(self, other: 'FastMoney') -> 'FastMoney':
+        if isinstance(other, FastMoney):
+            if other.currency != self.currency:
+                raise ValueError(
+                    'Cannot add amount in %r to %r' % (
+                        self.currency, other.currency))
+            return FastMoney(self.minor + other.minor, self.currency)
+        return NotImplemented
+
+    def __sub__(self, other: 'FastMoney') -> 'FastMoney':
+        if isinstance(other, FastMoney):
+            if other.currency != self.currency:
+                raise ValueError(
+                    'Cannot subtract amount in %r from %r' % (
+                        other.currency, self.currency))
+            return FastMoney(self.minor - other.minor, self.currency)
+        return NotImplemented
+
+    def __bool__(self) -> bool:
+        return bool(self.minor)
+
+    def quantize(self, exp=None, rounding=None) -> 'FastMoney':
+        """Return self, minor units are always quantized to the currency.
+
+        An explicit `exp` is delegated to `Money.quantize` and converted back.
+        """
+        if exp is None:
+            return self
+        return FastMoney.from_money(self.to_money().quantize(exp, rounding=rounding))
@@ -1,10 +1,10 @@
 from __future__ import division, unicode_literals
 
 import warnings
-from decimal import ROUND_HALF_UP, Decimal
+from decimal import Decimal
 from typing import Union, overload
 
-from babel.numbers import get_currency_precision
+from .currency import get_currency
 
 Numeric = Union[int, Decimal]
 
@@ -113,11 +113,11 @@ class Money:
         of the currency if it's known and to default (two decimal places)
         otherwise.
         """
-        if rounding is None:
-            rounding = ROUND_HALF_UP
-        if exp is None:
-            digits = get_currency_precision(self.currency)
-            exp = Decimal('0.1') ** digits
+        if exp is None or rounding is None:
+            currency = get_currency(self.currency)
+            if rounding is None:
+                rounding = currency.rounding
+            exp = currency.exponent if exp is None else Decimal(exp)
         else:
             exp = Decimal(exp)
         return Money(
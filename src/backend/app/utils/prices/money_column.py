@@ -0,0 +1,162 @@
+from __future__ import division, unicode_literals
+
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .currency import get_currency_exponent
+from .money import Money
+
+Numeric = Union[int, Decimal]
+
+
+def _as_fraction(value: Numeric) -> Tuple[int, int]:
+    fraction = Fraction(Decimal(value))
+    return fraction.numerator, fraction.denominator
+
+
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+
+def _exact_operand(minor: np.ndarray, numerator: int, denominator: int) -> np.ndarray:
+    """Absolute amounts, as Python ints when the products could overflow int64."""
+    magnitude = np.abs(minor)
+    largest = int(magnitude.max()) if len(magnitude) else 0
+    if 2 * largest * numerator + denominator <= INT64_MAX and 2 * denominator <= INT64_MAX:
+        return magnitude
+    return np.abs(minor.astype(object))
+
+
+def _to_int64(values: np.ndarray) -> np.ndarray:
+    """Convert the scaled amounts, raise OverflowError when one does not fit."""
+    if values.dtype == object:
+        return np.array(values.tolist(), dtype=np.int64)
+    return values
+
+
+def _scale_round_down(minor: np.ndarray, numerator: int, denominator: int) -> np.ndarray:
+    """Return `minor * numerator / denominator` rounded towards zero."""
+    magnitude = _exact_operand(minor, numerator, denominator)
+    return np.sign(minor) * _to_int64(magnitude * numerator // denominator)
+
+
+def _scale_round_half_up(minor: np.ndarray, numerator: int, denominator: int) -> np.ndarray:
+    """Return `minor * numerator / denominator` with ties away from zero."""
+    magnitude = _exact_operand(minor, numerator, denominator)
+    return np.sign(minor) * _to_int64((2 * magnitude * numerator + denominator) // (2 * denominator))
+
+
+class MoneyColumn:
+    """A batch of amounts stored as int64 minor units next to currency codes.
+
+    Aggregates are exact integer operations grouped by currency, so large
+    transaction batches are summed without building intermediate `Money`
+    objects. Results are converted back to `Money` only at the boundary.
+    """
+
+    __slots__ = ('minor', 'currencies')
+
+    def __init__(self, minor: np.ndarray, currencies: np.ndarray) -> None:
+        if minor.shape != currencies.shape:
+            raise ValueError(
+                'Amounts and currencies have different shapes: %r and %r' % (
+                    minor.shape, currencies.shape))
+        self.minor = minor.astype(np.int64, copy=False)
+        self.currencies = currencies
+
+    @classmethod
+    def from_amounts(
+            cls, amounts: Iterable[Numeric], currencies: Iterable[str]) -> 'MoneyColumn':
+        """Build a column from decimal amounts, raise ValueError on lost digits or unequal lengths."""
+        minor: List[int] = []
+        codes: List[str] = []
+        for amount, currency in zip(amounts, currencies, strict=True):
+            scaled = Decimal(amount).scaleb(get_currency_exponent(currency))
+            value = int(scaled)
+            if value != scaled:
+                raise ValueError(
+                    'Cannot represent %r in minor units of %r' % (
+                        amount, currency))
+            minor.append(value)
+            codes.append(currency)
+        return cls(np.array(minor, dtype=np.int64), np.array(codes, dtype=str))
+
+    @classmethod
+    def from_money(cls, values: Iterable[Money]) -> 'MoneyColumn':
+        values = list(values)
+        return cls.from_amounts(
+            (value.amount for value in values),
+            (value.currency for value in values))
+
+    def __repr__(self) -> str:
+        return 'MoneyColumn(%r, %r)' % (self.minor, self.currencies)
+
+    def __len__(self) -> int:
+        return len(self.minor)
+
+    def __getitem__(self, index: int) -> Money:
+        return self._to_money(int(self.minor[index]), str(self.currencies[index]))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MoneyColumn):
+            return (
+                    np.array_equal(self.minor, other.minor) and
+                    np.array_equal(self.currencies, other.currencies))
+        return False
+
+    @staticmethod
+    def _to_money(minor: int, currency: str) -> Money:
+        return Money(Decimal(minor).scaleb(-get_currency_exponent(currency)), currency)
+
+    def to_money(self) -> List[Money]:
+        """Return every amount as `Money`."""
+        return [
+            self._to_money(minor, currency)
+            for minor, currency in zip(self.minor.tolist(), self.currencies.tolist())]
+
+    def _group(self, ufunc: np.ufunc, initial: int, values: Optional[np.ndarray] = None) -> Dict[str, Money]:
+        codes, inverse = np.unique(self.currencies, return_inverse=True)
+        values = self.minor if values is None else values
+        result = np.full(len(codes), initial, dtype=values.dtype)
+        ufunc.at(result, inverse, values)
+        return {
+            currency: self._to_money(value, currency)
+            for currency, value in zip(codes.tolist(), result.tolist())}
+
+    def group_sum(self) -> Dict[str, Money]:
+        """Return the sum of amounts for every currency, exact beyond int64."""
+        largest = int(np.abs(self.minor).max()) if len(self.minor) else 0
+        if largest * len(self.minor) <= INT64_MAX:
+            return self._group(np.add, 0)
+        return self._group(np.add, 0, self.minor.astype(object))
+
+    def group_min(self) -> Dict[str, Money]:
+        """Return the smallest amount for every currency."""
+        return self._group(np.minimum, np.iinfo(np.int64).max)
+
+    def group_max(self) -> Dict[str, Money]:
+        """Return the largest amount for every currency."""
+        return self._group(np.maximum, np.iinfo(np.int64).min)
+
+    def percentage_discount(self, percentage: Numeric) -> 'MoneyColumn':
+        """Apply `percentage_discount` to every amount.
+
+        The discount is rounded down and amounts never go below zero, as in
+        `fractional_discount`.
+        """
+        numerator, denominator = _as_fraction(Decimal(percentage) / 100)
+        discount = _scale_round_down(self.minor, numerator, denominator)
+        return MoneyColumn(np.maximum(self.minor - discount, 0), self.currencies)
+
+    def flat_tax(
+            self, tax_rate: Decimal, *,
+            keep_gross: bool = False) -> Tuple['MoneyColumn', 'MoneyColumn']:
+        """Apply `flat_tax` to every amount and return net and gross columns."""
+        numerator, denominator = _as_fraction(Decimal(1) + tax_rate)
+        if keep_gross:
+            net = _scale_round_half_up(self.minor, denominator, numerator)
+            return MoneyColumn(net, self.currencies), self
+        gross = _scale_round_half_up(self.minor, numerator, denominator)
+        return self, MoneyColumn(gross, self.currencies)
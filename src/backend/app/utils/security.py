@@ -68,9 +68,13 @@ def jwt_encode(payload) -> str:
 
 
 def jwt_decode(
-        token, issuer: Optional[str] = jwt_settings.JWT_ISSUER,
-        audience: Optional[str] = jwt_settings.JWT_AUDIENCE,
+        token, issuer: Optional[str] = None,
+        audience: Optional[str] = None,
 ) -> dict:
+    if issuer is None:
+        issuer = jwt_settings.JWT_ISSUER
+    if audience is None:
+        audience = jwt_settings.JWT_AUDIENCE
     return jwt.decode(
         token=token,
         key=jwt_settings.JWT_PUBLIC_KEY or jwt_settings.JWT_SECRET_KEY,
@@ -128,10 +132,17 @@ def generate_rsa_certificate():
 class JWTSettings:
 
     def __init__(self, defaults, import_strings):
-        self.defaults = defaults
+        # Mapping or a callable returning it, resolved on first access
+        self._defaults = defaults
         self.import_strings = import_strings
         self._cached_attrs = set()
 
+    @property
+    def defaults(self):
+        if callable(self._defaults):
+            self._defaults = self._defaults()
+        return self._defaults
+
     def __getattr__(self, attr):
         if attr not in self.defaults:
             raise AttributeError('Invalid setting: `{}`'.format(attr))
@@ -159,7 +170,7 @@ class JWTSettings:
             delattr(self, '_user_settings')
 
 
-lazy_jwt_settings = JWTSettings(jwt_settings.dict(), IMPORT_STRINGS)
+lazy_jwt_settings = JWTSettings(jwt_settings.dict, IMPORT_STRINGS)
 
 
 class OAuth2PasswordBearerWithCookie(OAuth2):
@@ -1,13 +1,24 @@
 from .constants import DEFAULT_LOCALE, LANGUAGE_COOKIE, LANGUAGE_HEADER
-from .i18n import get_locale, get_locale_code, gettext_lazy, load_gettext_translations, set_locale, gettext
+from .i18n import (
+    get_locale,
+    get_locale_code,
+    gettext_lazy,
+    load_gettext_translations,
+    set_locale,
+    gettext,
+    override_locale,
+)
+from .reloader import CatalogWatcher
 from .middleware import (
     LocaleDefaultMiddleware,
     LocaleFromCookieMiddleware,
     LocaleFromHeaderMiddleware,
     LocaleFromQueryParamsMiddleware,
+    LocaleMiddleware,
 )
 
 __all__ = [
+    "CatalogWatcher",
     "DEFAULT_LOCALE",
     "LANGUAGE_HEADER",
     "LANGUAGE_COOKIE",
@@ -15,10 +26,12 @@ __all__ = [
     "LocaleFromCookieMiddleware",
     "LocaleFromHeaderMiddleware",
     "LocaleFromQueryParamsMiddleware",
+    "LocaleMiddleware",
     "gettext_lazy",
     "get_locale",
     "get_locale_code",
     "set_locale",
     "load_gettext_translations",
-    "gettext"
+    "gettext",
+    "override_locale",
 ]
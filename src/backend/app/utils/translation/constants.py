@@ -1,3 +1,5 @@
 LANGUAGE_HEADER = "Accept-Language"
 LANGUAGE_COOKIE = "Language"
 DEFAULT_LOCALE = "en"
+# Distinct Accept-Language values remembered by the header negotiation
+LANGUAGE_HEADER_CACHE_SIZE = 256
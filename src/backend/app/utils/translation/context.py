@@ -1,4 +1,4 @@
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
 from typing import Any
 
 
@@ -13,5 +13,9 @@ class ContextStorage:
     def get(self) -> Any:
         return self._values.get()
 
-    def set(self, value: Any):
+    def set(self, value: Any) -> Token:
         self._token_id = self._values.set(value)
+        return self._token_id
+
+    def reset(self, token: Token):
+        self._values.reset(token)
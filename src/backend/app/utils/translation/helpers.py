@@ -1,8 +1,10 @@
 import typing as t
 from dataclasses import dataclass, field
+from functools import lru_cache
 
-from starlette.requests import Request
+from starlette.requests import Request, cookie_parser
 
+from . import constants
 from .locale import gettext_translations
 
 
@@ -40,11 +42,45 @@ def parse_language_header(language_header: str) -> t.List[LocaleInfo]:
     return locales
 
 
+def get_cookie_locale_code(
+        cookie_header: t.Optional[str], name: str, supported_codes: t.AbstractSet[str],
+) -> t.Optional[str]:
+    if not cookie_header:
+        return None
+    locale_code = cookie_parser(cookie_header).get(name)
+    if locale_code in supported_codes:
+        return str(locale_code)
+    return None
+
+
+def get_header_locale_code(
+        language_header: t.Optional[str], supported_codes: t.AbstractSet[str],
+) -> t.Optional[str]:
+    if not language_header:
+        return None
+    if not isinstance(supported_codes, frozenset):
+        supported_codes = frozenset(supported_codes)
+    return _negotiate_language_header(language_header, supported_codes)
+
+
+@lru_cache(maxsize=constants.LANGUAGE_HEADER_CACHE_SIZE)
+def _negotiate_language_header(language_header: str, supported_codes: t.FrozenSet[str]) -> t.Optional[str]:
+    max_weight = 0.0
+    locale_code = None
+
+    for locale_info in parse_language_header(language_header):
+        if locale_info.code in supported_codes and locale_info.weight > max_weight:
+            max_weight = locale_info.weight
+            locale_code = locale_info.code
+
+    return str(locale_code) if locale_code else None
+
+
 @dataclass
 class BaseLocaleCode:
     name: str
     request: Request
-    supported_codes: t.Set[str] = field(init=False)
+    supported_codes: t.FrozenSet[str] = field(init=False)
 
     def __post_init__(self):
         self.supported_codes = gettext_translations.supported_locales
@@ -54,26 +90,11 @@ class BaseLocaleCode:
 class CookieLocale(BaseLocaleCode):
     @property
     def code(self) -> t.Optional[str]:
-        locale_code = self.request.cookies.get(self.name)
-        if locale_code in self.supported_codes:
-            return str(locale_code)
-        return None
+        return get_cookie_locale_code(self.request.headers.get('cookie'), self.name, self.supported_codes)
 
 
 @dataclass
 class HeaderLocale(BaseLocaleCode):
     @property
     def code(self) -> t.Optional[str]:
-        max_weight = 0.0
-        locale_code = None
-
-        language_header = self.request.headers.get(self.name)
-        if not language_header:
-            return locale_code
-
-        for locale_info in parse_language_header(language_header):
-            if locale_info.code in self.supported_codes and locale_info.weight > max_weight:
-                max_weight = locale_info.weight
-                locale_code = locale_info.code
-
-        return str(locale_code) if locale_code else None
+        return get_header_locale_code(self.request.headers.get(self.name), self.supported_codes)
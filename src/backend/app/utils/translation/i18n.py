@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import typing as t
+from contextlib import contextmanager
 
 from babel.support import LazyProxy
 
 from . import constants
 from .context import ContextStorage
-from .locale import Locale, gettext_translations
+from .locale import Locale, _GettextTranslations, gettext_translations
 
 
 class LanguageCtx(ContextStorage):
@@ -52,8 +53,9 @@ gettext_lazy = _make_lazy_gettext(_lookup_func)
 gettext = _lookup_func
 
 
-def load_gettext_translations(directory: str, domain: str):
+def load_gettext_translations(directory: str, domain: str) -> _GettextTranslations:
     gettext_translations.load_translations(directory, domain)
+    return gettext_translations
 
 
 def set_locale(code: str) -> None:
@@ -67,4 +69,14 @@ def get_locale() -> Locale:
 
 
 def get_locale_code() -> str:
-    return str(get_locale())
+    return get_locale().code
+
+
+@contextmanager
+def override_locale(code: str) -> t.Iterator[Locale]:
+    locale = Locale.get(code)
+    token = _language_ctx.set(locale)
+    try:
+        yield locale
+    finally:
+        _language_ctx.reset(token)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import os
 import typing as t
+from types import MappingProxyType
 
 from babel.core import Locale as _Locale
 from babel.support import NullTranslations, Translations
@@ -13,57 +14,113 @@ logger = logging.getLogger(__name__)
 
 
 class _GettextTranslations:
-    _translations: t.Dict[str, t.Union[Translations, NullTranslations]] = {}
+    _translations: t.Mapping[str, t.Union[Translations, NullTranslations]] = MappingProxyType({})
     _default_locale: str = constants.DEFAULT_LOCALE
-    _supported_locales: t.Set[str] = set()
+    _supported_locales: t.FrozenSet[str] = frozenset()
+    _locales: t.Mapping[str, Locale] = MappingProxyType({})
+    _sources: t.Tuple[t.Tuple[str, str], ...] = ()
 
     @property
     def translations(
         self,
-    ) -> t.Dict[str, t.Union[Translations, NullTranslations]]:
+    ) -> t.Mapping[str, t.Union[Translations, NullTranslations]]:
         return self._translations
 
     @property
-    def supported_locales(self) -> t.Set[str]:
+    def supported_locales(self) -> t.FrozenSet[str]:
         return self._supported_locales
 
     @property
     def default_locale(self) -> str:
         return self._default_locale
 
-    def load_translations(self, directory: str, domain: str) -> None:
+    @property
+    def locales(self) -> t.Mapping[str, Locale]:
+        return self._locales
+
+    @property
+    def sources(self) -> t.Tuple[t.Tuple[str, str], ...]:
+        return self._sources
+
+    @staticmethod
+    def _read_translations(
+        directory: str,
+        domain: str,
+        translations: t.Dict[str, t.Union[Translations, NullTranslations]],
+    ) -> None:
         for lang in os.listdir(directory):
             if os.path.isfile(os.path.join(directory, lang)):
                 continue
 
             try:
                 translation = Translations.load(directory, [lang], domain)
-                if lang in self._translations:
-                    self._translations[lang].merge(translation)
+                if not isinstance(translation, Translations):
+                    # Not a catalog directory, e.g. __pycache__
+                    continue
+                if lang in translations:
+                    translations[lang].merge(translation)
                 else:
-                    self._translations[lang] = translation
+                    translations[lang] = translation
             except Exception as e:
                 logger.error("Cannot load translation for '%s': %s", lang, str(e))
                 continue
 
-        self._supported_locales = set(self._translations.keys())
-        self._supported_locales.add(self.default_locale)
+    def _publish(self, translations: t.Dict[str, t.Union[Translations, NullTranslations]]) -> None:
+        # Everything is built before the attributes are swapped, so readers
+        # never need a lock and never see a half loaded catalog.
+        supported_locales = frozenset((*translations.keys(), self.default_locale))
+        locales = MappingProxyType({code: Locale.build(code, translations) for code in supported_locales})
+        self._translations = MappingProxyType(translations)
+        self._supported_locales = supported_locales
+        self._locales = locales
 
         logger.info("Supported locales: %s", sorted(self._supported_locales))
 
+    def load_translations(self, directory: str, domain: str) -> None:
+        translations = dict(self._translations)
+        self._read_translations(directory, domain, translations)
+        self._sources = (*self._sources, (directory, domain))
+        self._publish(translations)
+
+    def reload_translations(self) -> None:
+        """Read all loaded catalogs again from disk and swap them in"""
+        translations: t.Dict[str, t.Union[Translations, NullTranslations]] = {}
+        for directory, domain in self._sources:
+            self._read_translations(directory, domain, translations)
+        self._publish(translations)
+
 
 gettext_translations = _GettextTranslations()
 
 
 class Locale(_Locale):
+    code: str
+
+    @classmethod
+    def build(
+        cls,
+        code: str,
+        translations: t.Optional[t.Mapping[str, t.Union[Translations, NullTranslations]]] = None,
+    ) -> Locale:
+        if translations is None:
+            translations = gettext_translations.translations
+        locale: Locale = cls.parse(code)
+        locale.translations = translations.get(code, NullTranslations())
+        locale.code = code
+        return locale
+
     @classmethod
     def get(cls, code: str) -> Locale:
+        locale = gettext_translations.locales.get(code)
+        if locale is not None:
+            return locale
+
         if code not in gettext_translations.supported_locales:
             code = gettext_translations.default_locale
-
-        translations = gettext_translations.translations.get(code, NullTranslations())
-        locale: Locale = cls.parse(code)
-        locale.translations = translations
+        locale = gettext_translations.locales.get(code)
+        if locale is None:
+            # Translations are not loaded yet
+            locale = cls.build(code)
         return locale
 
     def translate(
@@ -1,91 +1,87 @@
-import logging
 import typing as t
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from urllib.parse import parse_qsl
 
-from starlette.middleware.base import BaseHTTPMiddleware, DispatchFunction, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.utils.translation import constants, helpers, i18n, get_locale_code
+from app.utils.translation import constants, helpers, i18n
+from .locale import gettext_translations
 
-logger = logging.getLogger(__name__)
+QUERY = 'query'
+COOKIE = 'cookie'
+HEADER = 'header'
 
 
 @dataclass
-class BaseLocaleMiddleware(BaseHTTPMiddleware):
+class LocaleMiddleware:
+    """
+    Pure ASGI middleware which resolves request locale from `scope`.
+
+    Sources are tried in `sources` order, the first supported code wins,
+    otherwise `default_code` is used.
+    """
     app: ASGIApp
-    default_code: t.Optional[str] = None
-    dispatch_func: DispatchFunction = field(init=False)
+    default_code: t.Optional[str] = constants.DEFAULT_LOCALE
+    sources: t.Sequence[str] = (QUERY, COOKIE, HEADER)
+    query_param: str = 'lang'
+    language_cookie: str = constants.LANGUAGE_COOKIE
+    language_header: str = constants.LANGUAGE_HEADER
 
     def __post_init__(self):
-        self.dispatch_func = self.dispatch
+        self._header_name = self.language_header.lower().encode('latin-1')
+
+    def get_locale_code(self, scope: Scope) -> t.Optional[str]:
+        supported_codes = gettext_translations.supported_locales
+        cookie_header = language_header = None
+        if COOKIE in self.sources or HEADER in self.sources:
+            for name, value in scope['headers']:
+                if name == b'cookie':
+                    cookie_header = value.decode('latin-1')
+                elif name == self._header_name:
+                    language_header = value.decode('latin-1')
+
+        for source in self.sources:
+            if source == QUERY:
+                query_string = scope.get('query_string')
+                if query_string:
+                    for key, value in parse_qsl(query_string.decode('latin-1')):
+                        if key == self.query_param and value in supported_codes:
+                            return value
+            elif source == COOKIE:
+                locale_code = helpers.get_cookie_locale_code(cookie_header, self.language_cookie, supported_codes)
+                if locale_code:
+                    return locale_code
+            elif source == HEADER:
+                locale_code = helpers.get_header_locale_code(language_header, supported_codes)
+                if locale_code:
+                    return locale_code
+        return self.default_code
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] in ('http', 'websocket'):
+            locale_code = self.get_locale_code(scope)
+            if locale_code:
+                i18n.set_locale(code=locale_code)
+        await self.app(scope, receive, send)
 
 
 @dataclass
-class LocaleDefaultMiddleware(BaseLocaleMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        logger.debug("LocaleDefaultMiddleware::dispatch")
-
-        if self.default_code:
-            logger.debug(f"LocaleDefaultMiddleware: set locale to: {self.default_code}")
-            i18n.set_locale(code=self.default_code)
-
-        response = await call_next(request)
-        return response
+class LocaleDefaultMiddleware(LocaleMiddleware):
+    sources: t.Sequence[str] = ()
 
 
 @dataclass
-class LocaleFromCookieMiddleware(BaseLocaleMiddleware):
-    language_cookie: str = constants.LANGUAGE_COOKIE
-
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        logger.debug("LocaleFromCookieMiddleware::dispatch")
-
-        cookie_locale = helpers.CookieLocale(name=self.language_cookie, request=request)
-        locale_code = cookie_locale.code or self.default_code
-
-        if locale_code:
-            logger.debug(f"LocaleFromCookieMiddleware: set locale to: {locale_code}")
-            i18n.set_locale(code=locale_code)
-
-        response = await call_next(request)
-        return response
+class LocaleFromCookieMiddleware(LocaleMiddleware):
+    default_code: t.Optional[str] = None
+    sources: t.Sequence[str] = (COOKIE,)
 
 
 @dataclass
-class LocaleFromHeaderMiddleware(BaseLocaleMiddleware):
-    language_header: str = constants.LANGUAGE_HEADER
-
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        logger.debug("LocaleFromHeaderMiddleware::dispatch")
-
-        header_locale = helpers.HeaderLocale(name=self.language_header, request=request)
-        locale_code = header_locale.code or self.default_code
-
-        if locale_code:
-            logger.debug(f"LocaleFromHeaderMiddleware: set locale to: {locale_code}")
-            i18n.set_locale(code=locale_code)
-
-        response = await call_next(request)
-        return response
+class LocaleFromHeaderMiddleware(LocaleMiddleware):
+    default_code: t.Optional[str] = None
+    sources: t.Sequence[str] = (HEADER,)
 
 
 @dataclass
-class LocaleFromQueryParamsMiddleware(BaseLocaleMiddleware):
-    default_code: str = constants.DEFAULT_LOCALE
-
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        logger.debug("LocaleFromQueryParamsMiddleware::dispatch")
-
-        locale_code = request.query_params.get('lang', self.default_code)
-        logger.info(locale_code, request.query_params, )
-
-        if locale_code:
-            logger.debug(f"LocaleFromQueryParamsMiddleware: set locale to: {locale_code}")
-            i18n.set_locale(code=locale_code)
-
-        response = await call_next(request)
-        return response
-
-
+class LocaleFromQueryParamsMiddleware(LocaleMiddleware):
+    sources: t.Sequence[str] = (QUERY,)
@@ -0,0 +1,113 @@
+import logging
+import os
+import tempfile
+import threading
+import typing as t
+
+from babel.messages.mofile import write_mo
+from babel.messages.pofile import read_po
+
+from .locale import gettext_translations
+
+logger = logging.getLogger(__name__)
+
+Snapshot = t.Dict[str, float]
+
+
+def compile_catalog(po_path: str, mo_path: str, locale: str, domain: str) -> None:
+    """
+    Compile `.po` file and atomically replace `.mo` file
+    :param po_path:
+    :param mo_path:
+    :param locale:
+    :param domain:
+    :return:
+    """
+    with open(po_path, 'rb') as f:
+        catalog = read_po(f, locale=locale, domain=domain)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(mo_path), suffix='.mo.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_mo(f, catalog)
+        os.replace(tmp_path, mo_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class CatalogWatcher(threading.Thread):
+    """
+    Poll catalog mtimes and hot reload translations.
+
+    A changed `.po` file is compiled to `.mo` first, then all catalogs are
+    read again and swapped in by `reload_translations`, so the request path
+    keeps reading plain attributes without locks.
+    """
+
+    def __init__(
+            self,
+            interval: float = 5.0,
+            on_reload: t.Iterable[t.Callable[[], None]] = (),
+    ):
+        super().__init__(name='catalog-watcher', daemon=True)
+        self.interval = interval
+        self.on_reload = tuple(on_reload)
+        self._stop_event = threading.Event()
+        self._snapshot = self.take_snapshot()
+
+    @staticmethod
+    def iter_catalogs() -> t.Iterator[t.Tuple[str, str, str, str]]:
+        """Yield (po path, mo path, locale, domain) of every loaded catalog"""
+        for directory, domain in gettext_translations.sources:
+            for lang in os.listdir(directory):
+                messages_dir = os.path.join(directory, lang, 'LC_MESSAGES')
+                if not os.path.isdir(messages_dir):
+                    continue
+                yield (
+                    os.path.join(messages_dir, f'{domain}.po'),
+                    os.path.join(messages_dir, f'{domain}.mo'),
+                    lang,
+                    domain,
+                )
+
+    def take_snapshot(self) -> Snapshot:
+        snapshot: Snapshot = {}
+        for po_path, mo_path, _, _ in self.iter_catalogs():
+            for path in (po_path, mo_path):
+                try:
+                    snapshot[path] = os.stat(path).st_mtime
+                except FileNotFoundError:
+                    continue
+        return snapshot
+
+    def check(self) -> bool:
+        """Compile and reload changed catalogs, return True when reloaded"""
+        snapshot = self.take_snapshot()
+        if snapshot == self._snapshot:
+            return False
+
+        for po_path, mo_path, lang, domain in self.iter_catalogs():
+            po_mtime = snapshot.get(po_path)
+            if po_mtime is None or po_mtime <= snapshot.get(mo_path, 0):
+                continue
+            try:
+                compile_catalog(po_path, mo_path, lang, domain)
+            except Exception as e:
+                logger.error("Cannot compile catalog '%s': %s", po_path, str(e))
+
+        gettext_translations.reload_translations()
+        for callback in self.on_reload:
+            callback()
+        self._snapshot = self.take_snapshot()
+        logger.info("Translations reloaded")
+        return True
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception("Catalog watcher failed: %s", str(e))
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -6,5 +6,8 @@ poetry run python -m app.backend_pre_start
 ## Run migrations
 poetry run alembic upgrade head
 #
+## Create upcoming partitions of the transaction table
+poetry run python -m app.contrib.transaction.partitions ensure
+#
 ## Create initial data in DB
 poetry run python -m app.initial_data
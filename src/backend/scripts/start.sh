@@ -31,6 +31,10 @@ else
     echo "There is no script $PRE_START_PATH"
 fi
 
+# Metrics of all gunicorn workers are aggregated through this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-api}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start Gunicorn
 #exec gunicorn -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE" -w 4
 #exec ./venv/bin/gunicorn -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE"
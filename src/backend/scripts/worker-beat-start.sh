@@ -0,0 +1,8 @@
+#! /usr/bin/env bash
+set -e
+
+# Let the DB start
+poetry run python -m app.celeryworker_pre_start
+
+# Only one beat may run, otherwise scheduled tasks are sent more than once
+poetry run celery -A app.worker beat -l info -s /tmp/celerybeat-schedule
@@ -4,4 +4,8 @@ set -e
 # Let the DB start
 poetry run python -m app.celeryworker_pre_start
 
-poetry run celery -A app.worker worker  -l info
+# Metrics of the pool processes are aggregated through this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-worker}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+poetry run celery -A app.worker worker -l info